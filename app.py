@@ -5,8 +5,8 @@ from streamlit_autorefresh import st_autorefresh
 
 # 프로젝트 모듈 임포트
 from ui import sidebar, header
-from data import fetcher
-from core import calculator, charting
+from data import fetcher, timeframes, intraday
+from core import charting, incremental
 from utils import settings
 import auth  # 인증 모듈 추가
 
@@ -49,7 +49,7 @@ def main():
 
     # 3. 메인 타이틀 및 주식 정보 가져오기
     stock_info = fetcher.get_stock_info(ticker)
-    company_name = stock_info.get('longName', stock_info.get('shortName', ticker))
+    company_name = stock_info.get('name', ticker)
     currency = stock_info.get('currency', 'USD') # 정보가 없을 경우 기본값 USD
 
     if company_name and company_name.lower() != ticker.lower():
@@ -60,28 +60,36 @@ def main():
 
     # 4. 데이터 로드 및 차트 생성 (앱 전체가 10초마다 자동 새로고침)
     try:
+        timeframe = user_inputs['timeframe']
         with st.spinner('데이터를 불러오는 중입니다...'):
-            data = fetcher.load_daily_data(ticker)
+            if timeframe in intraday.INTERVALS:
+                data = fetcher.load_intraday_data(ticker, timeframe)
+            else:
+                data = fetcher.load_daily_data(ticker)
 
         if data.empty:
             st.error(f"'{ticker}'에 대한 데이터를 찾을 수 없습니다. Ticker를 확인해주세요.")
             return
 
-        # 데이터 클리닝
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
-            data = data.loc[:,~data.columns.duplicated()]
+        # 주봉/월봉은 일봉 캐시를 묶어서 만듭니다. (추가 다운로드 없음)
+        if timeframe in timeframes.TIMEFRAMES:
+            data = timeframes.cache.get(ticker, data, timeframe)
+        state_key = ticker if timeframe == timeframes.DEFAULT_TIMEFRAME else f'{ticker}@{timeframe}'
 
-        # 보조지표 계산
-        df_with_indicators = calculator.calculate_all_indicators(data, user_inputs)
+        # 보조지표 계산 (차트 구간 + 워밍업만, 바뀐 마지막 봉만 다시 계산, 지표 컬럼만 반환)
+        indicators = incremental.engine.update(state_key, data, user_inputs, window=charting.CHART_BARS)
 
         # 차트 생성 (currency 정보 전달)
-        fig, axes = charting.create_stock_chart(df_with_indicators, user_inputs, company_name, currency)        
+        fig, axes = charting.create_stock_chart(data, indicators, user_inputs, company_name, currency)
         # Streamlit에 차트 표시
         st.pyplot(fig)
 
         # 데이터 테이블 표시
-        st.subheader('최근 10일 데이터')
+        if timeframe == timeframes.DEFAULT_TIMEFRAME:
+            st.subheader('최근 10일 데이터')
+        else:
+            label = intraday.INTERVALS[timeframe].label if timeframe in intraday.INTERVALS else timeframes.TIMEFRAMES[timeframe]
+            st.subheader(f'최근 10개 {label} 데이터')
         display_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
         for ma in user_inputs['selected_ma_periods']:
             if ma.startswith('EMA'):
@@ -90,8 +98,8 @@ def main():
             else:
                 period = int(ma.replace('MA', ''))
                 display_cols.append(f'MA_{period}')
-        chart_data = df_with_indicators.tail(200)
-        st.dataframe(chart_data.tail(10)[display_cols].style.format("{:.2f}"))
+        recent = pd.concat([data.tail(10), indicators.tail(10)], axis=1)
+        st.dataframe(recent[display_cols].style.format("{:.2f}"))
     except Exception as e:
         st.error("차트를 그리거나 데이터를 처리하는 중 오류가 발생했습니다.")
         st.exception(e)
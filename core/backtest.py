@@ -0,0 +1,271 @@
+"""
+신호 배열을 포지션으로 바꿔 수익 곡선, 거래 목록, 성과 지표를 계산하는 벡터화 백테스트.
+
+모든 계산은 시간축(0번 축) 배열 연산이므로 단일 종목(1차원)과 패널의 봉 축 배열
+(봉 x 종목, 2차원) 모두에 같은 함수를 사용합니다. 봉 단위 반복문은 없습니다.
+
+체결 규칙 (롱 온리):
+- 진입/청산 신호가 나온 봉의 종가에 체결하고, 다음 봉부터 수익에 반영합니다. (미래 참조 없음)
+- 같은 봉에 진입과 청산 신호가 함께 있으면 청산이 우선합니다.
+- 거래 비용 cost는 체결 금액 대비 비율로, 진입과 청산 때 각각 한 번씩 곱해집니다.
+- 마지막 봉까지 보유 중인 거래는 마지막 종가로 평가하고 Open=True로 표시합니다. (청산 비용 없음)
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from core import kernels, signals
+
+TRADING_DAYS = 252
+DEFAULT_COST = 0.001  # 편도 0.1%
+STATS_COLUMNS = ['Total Return', 'CAGR', 'Max Drawdown', 'Volatility', 'Sharpe', 'Exposure',
+                 'Trades', 'Hit Rate', 'Avg Trade', 'Buy & Hold']
+
+BacktestResult = namedtuple('BacktestResult', ['equity', 'trades', 'stats'])
+
+
+# --- 전략: 봉 축 High/Low/Close 배열 -> (진입 신호, 청산 신호) ---
+
+def squeeze_strategy(high, low, close, **params):
+    """스퀴즈 해제 + 양의 모멘텀 증가에서 진입, 모멘텀 제로 크로스(하락)에서 청산."""
+    sig = signals.squeeze_with_signals(high, low, close, **params)
+    return sig['SQZ_BUY'], sig['SQZ_SELL']
+
+
+def ma_cross_strategy(high, low, close, fast=50, slow=200, kind='SMA'):
+    """골든 크로스에서 진입, 데드 크로스에서 청산."""
+    average = kernels.rolling_mean if kind == 'SMA' else (lambda x, n: kernels.ema(x, span=n))
+    sig = signals.ma_cross_signals(average(close, fast), average(close, slow))
+    return sig['GOLDEN_CROSS'], sig['DEAD_CROSS']
+
+
+def rsi_divergence_strategy(high, low, close, **params):
+    """상승 다이버전스가 확정된 봉에서 진입, 하락 다이버전스가 확정된 봉에서 청산."""
+    sig = signals.rsi_divergence_signals(high, low, close, **params)
+    return sig['BULL_DIV_CONFIRMED'], sig['BEAR_DIV_CONFIRMED']
+
+
+STRATEGIES = {
+    'squeeze': squeeze_strategy,
+    'ma_cross': ma_cross_strategy,
+    'rsi_divergence': rsi_divergence_strategy,
+}
+
+
+# --- 배열 단위 계산 ---
+
+def positions(entries, exits):
+    """
+    진입/청산 신호에서 봉별 포지션(1=보유, 0=미보유)을 만듭니다.
+    신호가 있는 봉의 상태(진입 1, 청산 0)를 다음 신호 전까지 앞으로 채웁니다.
+    """
+    event = np.where(np.asarray(exits, dtype=bool), 0.0, np.where(np.asarray(entries, dtype=bool), 1.0, np.nan))
+    rows = np.arange(event.shape[0]).reshape((-1,) + (1,) * (event.ndim - 1))
+    last_event = np.maximum.accumulate(np.where(np.isnan(event), 0, rows), axis=0)
+    return np.nan_to_num(np.take_along_axis(event, last_event, axis=0), nan=0.0)
+
+
+def simulate(close, entries, exits, cost=DEFAULT_COST):
+    """
+    신호대로 매매했을 때의 봉별 포지션, 전략 수익률, 수익 곡선(시작 1.0)을 계산합니다.
+    close 뒤쪽의 NaN(패널에서 봉이 없는 칸)에서는 포지션 0, 수익률 0으로 둡니다.
+
+    Returns:
+        dict: 'position', 'returns', 'equity' 배열 (close와 같은 모양)
+    """
+    close = np.asarray(close, dtype=float)
+    valid = ~np.isnan(close)
+    position = positions(np.asarray(entries, dtype=bool) & valid, exits)
+    position[~valid] = 0.0
+    held = signals._previous(position, 0.0)
+    bar_return = np.nan_to_num(close / signals._previous(close, np.nan) - 1.0, nan=0.0)
+    turnover = np.where(valid, np.abs(position - held), 0.0)
+    factor = (1.0 + held * bar_return) * (1.0 - cost) ** turnover
+    return {'position': position, 'returns': factor - 1.0, 'equity': np.cumprod(factor, axis=0)}
+
+
+def _as_2d(values):
+    values = np.asarray(values)
+    return values.reshape(values.shape[0], -1)
+
+
+def _last_valid(valid):
+    """열별 마지막 유효 행 번호. (유효 행이 없으면 -1)"""
+    return np.where(valid.any(axis=0), valid.shape[0] - 1 - np.argmax(valid[::-1], axis=0), -1)
+
+
+def trade_list(close, position, cost=DEFAULT_COST):
+    """
+    포지션 배열에서 거래 목록을 뽑습니다. 포지션 변화 지점을 열 우선 순서로 찾아 진입과 청산을 짝짓습니다.
+
+    Returns:
+        DataFrame: Column(종목 열 번호), Entry Row, Exit Row, Entry Price, Exit Price, Return, Bars, Open
+    """
+    close, position = _as_2d(np.asarray(close, dtype=float)), _as_2d(position)
+    n, k = close.shape
+    edges = np.zeros((1, k))
+    change = np.diff(np.vstack([edges, position, edges]), axis=0)  # change[t] = pos[t] - pos[t-1]
+    entry_col, entry_row = np.nonzero(change.T > 0)
+    exit_col, exit_row = np.nonzero(change.T < 0)
+
+    valid = ~np.isnan(close)
+    is_open = (exit_row >= n) | ~valid[np.minimum(exit_row, n - 1), exit_col]
+    exit_row = np.where(is_open, _last_valid(valid)[exit_col], exit_row)
+    entry_price, exit_price = close[entry_row, entry_col], close[exit_row, exit_col]
+    return pd.DataFrame({
+        'Column': entry_col,
+        'Entry Row': entry_row,
+        'Exit Row': exit_row,
+        'Entry Price': entry_price,
+        'Exit Price': exit_price,
+        'Return': exit_price / entry_price * (1.0 - cost) ** np.where(is_open, 1, 2) - 1.0,
+        'Bars': exit_row - entry_row,
+        'Open': is_open,
+    })
+
+
+def summarize(close, result, trades, dates):
+    """
+    열(종목)별 성과 지표를 계산합니다.
+
+    Args:
+        close: 봉 축 종가 배열
+        result: simulate()의 반환값
+        trades: trade_list()의 반환값
+        dates: close와 같은 모양의 날짜(datetime64) 배열. CAGR 기간 계산에 사용
+
+    Returns:
+        DataFrame: STATS_COLUMNS 컬럼 (행은 열 번호 순서)
+    """
+    close, equity = _as_2d(np.asarray(close, dtype=float)), _as_2d(result['equity'])
+    returns, position, dates = _as_2d(result['returns']), _as_2d(result['position']), _as_2d(dates)
+    k = close.shape[1]
+    valid = ~np.isnan(close)
+    bars = valid.sum(axis=0)
+    has_bars = bars > 0
+    first, last = np.argmax(valid, axis=0), _last_valid(valid)
+    cols = np.arange(k)
+
+    final = equity[last, cols]
+    years = (dates[last, cols] - dates[first, cols]) / np.timedelta64(1, 'D') / 365.25
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where(years > 0, final ** (1.0 / years) - 1.0, np.nan)
+        drawdown = (equity / np.maximum.accumulate(equity, axis=0) - 1.0).min(axis=0)
+        mean = np.where(valid, returns, 0.0).sum(axis=0) / bars
+        std = np.sqrt(np.where(valid, (returns - mean) ** 2, 0.0).sum(axis=0) / (bars - 1))
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), np.nan)
+
+        col = trades['Column'].to_numpy()
+        closed = ~trades['Open'].to_numpy()
+        trade_return = trades['Return'].to_numpy()
+        closed_count = np.bincount(col, weights=closed, minlength=k)
+        hit_rate = np.bincount(col, weights=closed & (trade_return > 0), minlength=k) / closed_count
+        avg_trade = np.bincount(col, weights=np.where(closed, trade_return, 0.0), minlength=k) / closed_count
+
+        stats = pd.DataFrame({
+            'Total Return': final - 1.0,
+            'CAGR': cagr,
+            'Max Drawdown': drawdown,
+            'Volatility': std * np.sqrt(TRADING_DAYS),
+            'Sharpe': sharpe,
+            'Exposure': np.where(valid, position, 0.0).sum(axis=0) / bars,
+            'Trades': np.bincount(col, minlength=k),
+            'Hit Rate': hit_rate,
+            'Avg Trade': avg_trade,
+            'Buy & Hold': close[last, cols] / close[first, cols] - 1.0,
+        })
+    return stats[STATS_COLUMNS].where(pd.Series(has_bars), np.nan)
+
+
+def evaluate(high, low, close, dates, strategy='squeeze', cost=DEFAULT_COST, **params):
+    """
+    봉 축 배열에서 신호 -> 시뮬레이션 -> 거래 목록 -> 성과 지표까지 한 번에 계산합니다.
+
+    Returns:
+        tuple: (simulate() 결과, trade_list() 결과, summarize() 결과)
+    """
+    entries, exits = STRATEGIES[strategy](high, low, close, **params)
+    result = simulate(close, entries, exits, cost)
+    trades = trade_list(close, result['position'], cost)
+    return result, trades, summarize(close, result, trades, dates)
+
+
+# --- 패널 단위 실행 ---
+
+def run(panel, strategy='squeeze', cost=DEFAULT_COST, **params):
+    """
+    패널의 모든 종목에 전략을 한 번에 백테스트합니다.
+    지표, 신호, 포지션, 거래, 성과 지표 모두 패널의 봉 축 배열(종목별 실제 봉 순서)에서 계산합니다.
+
+    Args:
+        panel: core.panel.Panel
+        strategy: STRATEGIES의 키
+        cost: 편도 거래 비용 비율
+        **params: 전략 함수에 넘길 파라미터
+
+    Returns:
+        BacktestResult: equity(날짜 x 티커 수익 곡선 DataFrame), trades(거래 목록), stats(티커별 성과 지표)
+    """
+    dates = panel.bar_dates()
+    result, raw, stats = evaluate(panel.bars('High'), panel.bars('Low'), panel.bars('Close'), dates,
+                                  strategy, cost, **params)
+    tickers = np.asarray(panel.tickers, dtype=object)
+    col = raw['Column'].to_numpy()
+    trades = pd.DataFrame({
+        'Ticker': tickers[col],
+        'Entry Date': dates[raw['Entry Row'].to_numpy(), col],
+        'Exit Date': dates[raw['Exit Row'].to_numpy(), col],
+    }).join(raw.drop(columns=['Column', 'Entry Row', 'Exit Row']))
+    stats.index = pd.Index(panel.tickers, name='Ticker')
+    return BacktestResult(panel.frame(panel.to_dates(result['equity'])), trades, stats)
+
+
+if __name__ == "__main__":
+    # 반복문 기준 구현과의 일치 여부 확인 및 다종목 속도 측정 (python -m core.backtest)
+    import time
+    from core.panel import Panel
+
+    rng = np.random.default_rng(0)
+
+    def synthetic(n_bars, start='2015-01-01'):
+        c = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_bars)))
+        h = c * (1 + np.abs(rng.normal(0, 0.01, n_bars)))
+        l = c * (1 - np.abs(rng.normal(0, 0.01, n_bars)))
+        return pd.DataFrame({'Open': c, 'High': h, 'Low': l, 'Close': c, 'Volume': 1e6},
+                            index=pd.bdate_range(start, periods=n_bars))
+
+    def reference(df, cost, **params):
+        """봉 단위 반복문으로 같은 규칙을 그대로 따라가는 기준 구현."""
+        buy, sell = squeeze_strategy(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), **params)
+        close = df['Close'].to_numpy()
+        equity, pos, trades = [1.0], 0, []
+        for t in range(1, len(close)):
+            value = equity[-1] * (1 + pos * (close[t] / close[t - 1] - 1))
+            if pos == 0 and buy[t] and not sell[t]:
+                pos, entry = 1, t
+                value *= 1 - cost
+            elif pos == 1 and sell[t]:
+                pos = 0
+                value *= 1 - cost
+                trades.append(close[t] / close[entry] * (1 - cost) ** 2 - 1)
+            equity.append(value)
+        if pos == 1:
+            trades.append(close[-1] / close[entry] * (1 - cost) - 1)
+        return np.array(equity), np.array(trades)
+
+    frames = {f'T{i}': synthetic(int(rng.integers(300, 1500)), start=f'201{i % 5}-01-0{1 + i % 5}') for i in range(20)}
+    result = run(Panel.from_frames(frames), 'squeeze', cost=0.002)
+    for ticker, df in frames.items():
+        equity, trade_returns = reference(df, 0.002)
+        assert np.allclose(result.equity[ticker].dropna().to_numpy(), equity), ticker
+        assert np.allclose(result.trades.loc[result.trades['Ticker'] == ticker, 'Return'].to_numpy(), trade_returns), ticker
+    print("기준 구현과 일치:", len(frames), "종목,", len(result.trades), "거래")
+
+    universe = {f'T{i}': synthetic(10 * TRADING_DAYS) for i in range(500)}
+    panel = Panel.from_frames(universe)
+    for name in STRATEGIES:
+        started = time.perf_counter()
+        result = run(panel, name)
+        print(f"{name}: 500종목 x 10년 {time.perf_counter() - started:.2f}초, 거래 {len(result.trades)}건")
+    print(result.stats.describe().T[['mean', '50%']])
@@ -1,77 +1,419 @@
+import math
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
+
+from core import kernels
+
+OHLCV_COLS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+SQUEEZE_FLAG_COLS = ['SQZ_ON_CUSTOM', 'SQZ_OFF_CUSTOM', 'SQZ_NO_CUSTOM']  # SQZ_FLAGS의 비트 0, 1, 2
+
+# --- 출력 구간(window) 계산 설정 ---
+# 지수 가중 평균은 시작값의 가중치가 이 값 아래로 줄어들 때까지를 워밍업 구간으로 봅니다.
+EWM_CONVERGENCE_TOL = 1e-3
+
+# --- 지표 결과 메모이제이션 설정 ---
+INDICATOR_CACHE_SIZE = 256  # (티커, 데이터 지문, 지표, 파라미터) 조합 기준 최대 보관 개수
+
+
+# --- 지표 의존성 그래프 ---
+# 각 지표는 필요한 중간값을 노드로 선언합니다. 노드는 (연산, 입력 노드, 파라미터)로 식별되므로
+# 여러 지표가 같은 노드(예: SMA(Close,20), TR, STDEV(Close,20))를 선언하면 한 번만 계산됩니다.
+
+Node = namedtuple('Node', ['op', 'inputs', 'params'])
+
+
+def node(op, *inputs, **params):
+    return Node(op, tuple(inputs), tuple(sorted(params.items())))
+
+
+def source(column):
+    return node('SOURCE', column=column)
+
+
+HIGH, LOW, CLOSE = source('High'), source('Low'), source('Close')
+
+
+# 노드 연산: 입력 노드의 값(배열)을 위치 인자로, 파라미터를 키워드 인자로 받습니다.
+NODE_OPS = {
+    'SMA': kernels.rolling_mean,
+    'STDEV': kernels.rolling_std,
+    'MAX': kernels.rolling_max,
+    'MIN': kernels.rolling_min,
+    'TR': kernels.true_range,
+    'RANGE': lambda high, low: high - low,
+    'EWM': kernels.ema,
+    'RSI': kernels.rsi,
+    'MACD': kernels.macd,
+    'STOCH': kernels.stoch,
+    'SMA_RIBBON': kernels.sma_ribbon,
+    'EMA_RIBBON': kernels.ema_ribbon,
+}
+
+# 지표 정의: inputs(**params)는 {이름: 노드}, outputs(values, **params)는 {컬럼: 배열},
+# warmup(**params)은 값이 안정될 때까지 필요한 앞쪽 봉 수를 반환합니다.
+IndicatorDef = namedtuple('IndicatorDef', ['inputs', 'outputs', 'warmup'])
+
+
+def ewm_warmup(alpha):
+    """가중치 (1 - alpha)^k가 EWM_CONVERGENCE_TOL보다 작아지는 봉 수 k."""
+    return math.ceil(math.log(EWM_CONVERGENCE_TOL) / math.log(1 - alpha))
+
+
+def _bbands_outputs(v, length, std):
+    suffix = f"{length}_{float(std)}"
+    names = [f'BBL_{suffix}', f'BBM_{suffix}', f'BBU_{suffix}', f'BBB_{suffix}', f'BBP_{suffix}']
+    return dict(zip(names, kernels.bbands_from_parts(v['close'], v['mid'], v['stdev'], std)))
+
+
+def _macd_outputs(v, fast, slow, signal):
+    suffix = f"{fast}_{slow}_{signal}"
+    return dict(zip([f'MACD_{suffix}', f'MACDh_{suffix}', f'MACDs_{suffix}'], v['macd'].T))
+
+
+def _stoch_outputs(v, k, d, smooth_k):
+    suffix = f"{k}_{d}_{smooth_k}"
+    return dict(zip([f'STOCHk_{suffix}', f'STOCHd_{suffix}'], v['stoch'].T))
+
+
+def ribbon_columns(kind, periods):
+    """리본 지표의 컬럼 이름 (기간 순서대로)."""
+    return [f'RIBBON_{kind}_{p}' for p in periods]
+
+
+def _ribbon_outputs(v, kind, periods):
+    return dict(zip(ribbon_columns(kind, periods), v['ribbon'].T))
+
+
+def _squeeze_inputs(bb_length, kc_length, kc_mult, use_tr):
+    tr = node('TR', HIGH, LOW, CLOSE) if use_tr else node('RANGE', HIGH, LOW)
+    return {
+        'close': CLOSE,
+        'basis': node('SMA', CLOSE, length=bb_length),
+        'stdev': node('STDEV', CLOSE, length=bb_length, ddof=1),
+        'ma': node('SMA', CLOSE, length=kc_length),
+        'rangema': node('SMA', tr, length=kc_length),
+        'highest': node('MAX', HIGH, length=kc_length),
+        'lowest': node('MIN', LOW, length=kc_length),
+    }
+
+
+INDICATORS = {
+    'MA': IndicatorDef(
+        inputs=lambda period: {'ma': node('SMA', CLOSE, length=period)},
+        outputs=lambda v, period: {f'MA_{period}': v['ma']},
+        warmup=lambda period: period),
+    'EMA': IndicatorDef(
+        inputs=lambda period: {'ema': node('EWM', CLOSE, span=period)},
+        outputs=lambda v, period: {f'EMA_{period}': v['ema']},
+        warmup=lambda period: ewm_warmup(2 / (period + 1))),
+    'BBANDS': IndicatorDef(
+        inputs=lambda length, std: {'close': CLOSE, 'mid': node('SMA', CLOSE, length=length),
+                                    'stdev': node('STDEV', CLOSE, length=length, ddof=0)},
+        outputs=_bbands_outputs,
+        warmup=lambda length, std: length),
+    'RSI': IndicatorDef(
+        inputs=lambda length: {'rsi': node('RSI', CLOSE, length=length)},
+        outputs=lambda v, length: {f'RSI_{length}': v['rsi']},
+        warmup=lambda length: 1 + ewm_warmup(1 / length)),
+    'MACD': IndicatorDef(
+        inputs=lambda fast, slow, signal: {'macd': node('MACD', CLOSE, fast=fast, slow=slow, signal=signal)},
+        outputs=_macd_outputs,
+        warmup=lambda fast, slow, signal: slow + ewm_warmup(2 / (slow + 1)) + signal + ewm_warmup(2 / (signal + 1))),
+    'STOCH': IndicatorDef(
+        inputs=lambda k, d, smooth_k: {'stoch': node('STOCH', HIGH, LOW, CLOSE, k=k, d=d, smooth_k=smooth_k)},
+        outputs=_stoch_outputs,
+        warmup=lambda k, d, smooth_k: k + smooth_k + d),
+    'RIBBON': IndicatorDef(
+        inputs=lambda kind, periods: {'ribbon': node(f'{kind}_RIBBON', CLOSE, periods=periods)},
+        outputs=_ribbon_outputs,
+        warmup=lambda kind, periods: max(periods) if kind == 'SMA' else ewm_warmup(2 / (max(periods) + 1))),
+    'SQUEEZE': IndicatorDef(
+        inputs=_squeeze_inputs,
+        outputs=lambda v, bb_length, kc_length, kc_mult, use_tr: kernels.squeeze_from_parts(
+            **v, kc_length=kc_length, kc_mult=kc_mult),
+        warmup=lambda bb_length, kc_length, kc_mult, use_tr: 1 + max(bb_length, kc_length) + kc_length),
+}
+
+
+def warmup_bars(specs):
+    """스펙 목록의 지표가 안정된 값을 내기 위해 출력 구간 앞에 필요한 봉 수."""
+    return max((INDICATORS[name].warmup(**dict(params)) for name, params in specs), default=0)
+
+
+def plan(specs):
+    """스펙 목록에 필요한 노드를 중복 없이 의존성 순서(입력 노드가 먼저)로 나열합니다."""
+    order, seen = [], set()
+
+    def visit(n):
+        if n in seen:
+            return
+        seen.add(n)
+        for dependency in n.inputs:
+            visit(dependency)
+        order.append(n)
+
+    for name, params in specs:
+        for n in INDICATORS[name].inputs(**dict(params)).values():
+            visit(n)
+    return order
+
+
+def evaluate(df, specs):
+    """
+    스펙 목록의 지표를 그래프로 한 번에 계산합니다. 공유 노드는 한 번만 계산됩니다.
+
+    Returns:
+        dict: 스펙 -> 해당 지표 컬럼만 담은 DataFrame (df와 같은 인덱스)
+    """
+    values = {}
+    for n in plan(specs):
+        params = dict(n.params)
+        if n.op == 'SOURCE':
+            values[n] = df[params['column']].to_numpy(dtype=float)
+        else:
+            values[n] = NODE_OPS[n.op](*(values[i] for i in n.inputs), **params)
+
+    results = {}
+    for spec in specs:
+        name, params = spec
+        params = dict(params)
+        definition = INDICATORS[name]
+        inputs = {key: values[n] for key, n in definition.inputs(**params).items()}
+        results[spec] = pd.DataFrame(definition.outputs(inputs, **params), index=df.index)
+    return results
+
 
 def _calculate_squeeze_momentum(df, bb_length=20, kc_length=20, kc_mult=1.5, use_tr=True):
     """
     LazyBear의 Squeeze Momentum Indicator 로직을 기반으로 스퀴즈 모멘텀을 계산합니다.
-    pandas-ta의 기본 squeeze와 달라 직접 구현합니다.
+    pandas-ta의 기본 squeeze와 달라 직접 구현합니다. (계산은 kernels.squeeze_from_parts)
+
+    Returns:
+        DataFrame: BBU_LB, BBL_LB, KCU_LB, KCL_LB, SQZ_ON/OFF/NO/VAL_CUSTOM 컬럼 (df와 같은 인덱스)
     """
-    df_copy = df.copy()
-    
-    # 1. 볼린저 밴드 (켈트너 채널 승수 사용)
-    basis = ta.sma(df_copy['Close'], length=bb_length)
-    dev = kc_mult * ta.stdev(df_copy['Close'], length=bb_length)
-    df_copy['BBU_LB'] = basis + dev
-    df_copy['BBL_LB'] = basis - dev
-
-    # 2. 켈트너 채널 (True Range의 SMA 사용)
-    ma = ta.sma(df_copy['Close'], length=kc_length)
-    tr = ta.true_range(df_copy['High'], df_copy['Low'], df_copy['Close']) if use_tr else (df_copy['High'] - df_copy['Low'])
-    rangema = ta.sma(tr, length=kc_length)
-    df_copy['KCU_LB'] = ma + rangema * kc_mult
-    df_copy['KCL_LB'] = ma - rangema * kc_mult
-
-    # 3. 스퀴즈 ON/OFF/NO 조건
-    df_copy['SQZ_ON_CUSTOM'] = (df_copy['BBL_LB'] > df_copy['KCL_LB']) & (df_copy['BBU_LB'] < df_copy['KCU_LB'])
-    df_copy['SQZ_OFF_CUSTOM'] = (df_copy['BBL_LB'] < df_copy['KCL_LB']) & (df_copy['BBU_LB'] > df_copy['KCU_LB'])
-    df_copy['SQZ_NO_CUSTOM'] = ~df_copy['SQZ_ON_CUSTOM'] & ~df_copy['SQZ_OFF_CUSTOM']
-
-    # 4. 모멘텀 값 (Linear Regression)
-    highest_high = df_copy['High'].rolling(kc_length).max()
-    lowest_low = df_copy['Low'].rolling(kc_length).min()
-    sma_close = ta.sma(df_copy['Close'], length=kc_length)
-    mom_source = df_copy['Close'] - ((highest_high + lowest_low) / 2 + sma_close) / 2
-    df_copy['SQZ_VAL_CUSTOM'] = ta.linreg(close=mom_source, length=kc_length)
-
-    return df_copy
-
-
-def calculate_all_indicators(df, user_inputs):
+    spec = ('SQUEEZE', (('bb_length', bb_length), ('kc_length', kc_length), ('kc_mult', kc_mult), ('use_tr', use_tr)))
+    return evaluate(df, [spec])[spec]
+
+
+def ma_spec(ma_name):
+    """'MA20', 'EMA200' 같은 이동평균 이름을 지표 스펙으로 변환합니다."""
+    ma_name = str(ma_name)
+    if ma_name.startswith('EMA'):
+        return ('EMA', (('period', int(ma_name.replace('EMA', ''))),))
+    return ('MA', (('period', int(ma_name.replace('MA', ''))),))
+
+
+def indicator_specs(user_inputs):
     """
-    원본 데이터프레임과 사용자 입력을 받아 모든 필요한 보조지표를 계산하고 추가합니다.
+    사용자 입력을 (지표 이름, 파라미터) 스펙 목록으로 변환합니다.
+    파라미터는 해시 가능한 (이름, 값) 튜플이며 스펙 순서가 결과 컬럼 순서가 됩니다.
     """
-    df_copy = df.copy()
-    
-    # 데이터 클리닝 및 타입 변환
-    ohlcv_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-    for col in ohlcv_cols:
-        if col in df_copy.columns:
-            df_copy[col] = pd.to_numeric(df_copy[col], errors='coerce')
-    df_copy.dropna(subset=ohlcv_cols, inplace=True)
-
-    # 이동평균선 및 EMA 계산
+    specs = []
     for ma_name in user_inputs['selected_ma_periods']:
-        if str(ma_name).startswith('EMA'):
-            period = int(str(ma_name).replace('EMA', ''))
-            ema_col = f'EMA_{period}'
-            if ema_col not in df_copy.columns:
-                df_copy[ema_col] = df_copy['Close'].ewm(span=period, adjust=False).mean()
-        else:
-            period = int(str(ma_name).replace('MA', ''))
-            ma_col = f'MA_{period}'
-            if ma_col not in df_copy.columns:
-                df_copy[ma_col] = df_copy['Close'].rolling(period).mean()
-    
-    # 기타 보조지표 계산
+        spec = ma_spec(ma_name)
+        if spec not in specs:
+            specs.append(spec)
     if user_inputs['show_bbands']:
-        df_copy.ta.bbands(length=20, append=True)
+        specs.append(('BBANDS', (('length', 20), ('std', 2.0))))
     if user_inputs['show_rsi']:
-        df_copy.ta.rsi(append=True)
+        specs.append(('RSI', (('length', 14),)))
     if user_inputs['show_macd']:
-        df_copy.ta.macd(append=True)
+        specs.append(('MACD', (('fast', 12), ('slow', 26), ('signal', 9))))
     if user_inputs['show_stoch']:
-        df_copy.ta.stoch(append=True)
+        specs.append(('STOCH', (('k', 14), ('d', 3), ('smooth_k', 3))))
+    ribbon = user_inputs.get('ribbon')
+    if ribbon and ribbon['periods']:
+        specs.append(('RIBBON', (('kind', ribbon['kind']), ('periods', tuple(ribbon['periods'])))))
     if user_inputs['show_squeeze']:
-        df_copy = _calculate_squeeze_momentum(df_copy)
-        
-    return df_copy
+        specs.append(('SQUEEZE', (('bb_length', 20), ('kc_length', 20), ('kc_mult', 1.5), ('use_tr', True))))
+    return specs
+
+
+def data_fingerprint(df):
+    """
+    OHLCV 데이터의 지문: (행 수, 첫/마지막 봉 시각, 마지막 봉 값의 해시).
+    과거 봉은 바뀌지 않고 마지막 봉만 교체/추가된다는 캐시 데이터의 특성을 이용합니다.
+    """
+    if df.empty:
+        return (0,)
+    last_values = tuple(df[[c for c in OHLCV_COLS if c in df.columns]].iloc[-1].tolist())
+    return (len(df), df.index[0], df.index[-1], hash(last_values))
+
+
+class IndicatorCache:
+    """지표 결과를 보관하는 크기 제한 LRU 캐시 (스레드 안전)."""
+
+    def __init__(self, maxsize=INDICATOR_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+indicator_cache = IndicatorCache()
+
+
+def ensure_ohlcv(df):
+    """
+    OHLCV 컬럼이 이미 숫자형이고 결측이 없으면 df를 복사 없이 그대로 반환합니다.
+    (fetcher.load_daily_data가 적재 시점에 한 번 정리하므로 보통 이 경로입니다)
+    그렇지 않은 경우에만 숫자형으로 바꾸고 결측 행을 뺀 새 프레임을 만듭니다.
+    """
+    cols = [c for c in OHLCV_COLS if c in df.columns]
+    is_numeric = {c: pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c]) for c in cols}
+    if all(is_numeric.values()) and not df[cols].isna().to_numpy().any():
+        return df
+    df = df.assign(**{c: pd.to_numeric(df[c], errors='coerce') for c in cols if not is_numeric[c]})
+    return df[df[cols].notna().all(axis=1)]
+
+
+def assemble_columns(index, frames):
+    """지표별 컬럼 프레임을 가격 컬럼 없이 하나로 합칩니다. (지표가 없으면 빈 프레임)"""
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return pd.DataFrame(index=index)
+    return pd.concat(frames, axis=1)
+
+
+# --- 메모리 절약(compact) 모드: 다종목 스캔에서 지표를 메모리에 보관할 때 사용 ---
+
+def pack_squeeze_flags(frame):
+    """SQZ_ON/OFF/NO 불리언 컬럼을 비트 플래그 컬럼 하나(uint8 SQZ_FLAGS)로 합칩니다."""
+    present = [c for c in SQUEEZE_FLAG_COLS if c in frame.columns]
+    if not present:
+        return frame
+    flags = np.zeros(len(frame), dtype=np.uint8)
+    for bit, col in enumerate(SQUEEZE_FLAG_COLS):
+        if col in frame.columns:
+            flags |= frame[col].to_numpy(dtype=bool).astype(np.uint8) << bit
+    return frame.drop(columns=present).assign(SQZ_FLAGS=flags)
+
+
+def unpack_squeeze_flags(frame):
+    """pack_squeeze_flags의 역변환: SQZ_FLAGS를 다시 SQZ_ON/OFF/NO 불리언 컬럼으로 풉니다."""
+    if 'SQZ_FLAGS' not in frame.columns:
+        return frame
+    flags = frame['SQZ_FLAGS'].to_numpy()
+    return frame.drop(columns=['SQZ_FLAGS']).assign(
+        **{col: (flags >> bit) & 1 == 1 for bit, col in enumerate(SQUEEZE_FLAG_COLS)})
+
+
+def compact_indicators(frame):
+    """지표 컬럼을 float32로 줄이고 스퀴즈 불리언은 비트 플래그로 합친 사본을 반환합니다."""
+    float_cols = [c for c in frame.columns if pd.api.types.is_float_dtype(frame[c])]
+    return pack_squeeze_flags(frame.astype({c: np.float32 for c in float_cols}))
+
+
+def calculate_all_indicators(df, user_inputs, compact=False, window=None):
+    """
+    원본 데이터프레임과 사용자 입력을 받아 필요한 보조지표를 모두 계산합니다.
+    가격 컬럼은 복사하지 않고, 지표 컬럼만 담은 DataFrame(df와 같은 인덱스)을 반환합니다.
+
+    user_inputs에 'ticker'가 있으면 지표별 결과를 (티커, 데이터 지문, 지표, 파라미터)로
+    캐시합니다. 데이터가 그대로면 다시 계산하지 않고, 새로 켠 지표만 계산합니다.
+    반환된 DataFrame은 캐시와 공유되므로 수정하지 마세요.
+
+    compact=True이면 compact_indicators 형식(float32, SQZ_FLAGS)으로 반환합니다.
+    계산은 항상 float64로 하고 결과만 줄입니다.
+
+    window를 주면 마지막 window개 봉의 지표만 반환합니다. 계산도 window + 워밍업
+    (warmup_bars) 구간에서만 하므로 캐시된 이력이 길어져도 비용이 늘지 않습니다.
+    EMA/RSI/MACD는 전체 이력으로 계산한 값과 EWM_CONVERGENCE_TOL 수준에서 다를 수 있습니다.
+    """
+    ticker = user_inputs.get('ticker')
+    specs = indicator_specs(user_inputs)
+    if window is not None:
+        recent = df.iloc[-(window + warmup_bars(specs)):]
+        return calculate_all_indicators(recent, user_inputs, compact=compact).iloc[-window:]
+    fingerprint = data_fingerprint(df) if ticker is not None else None
+
+    if compact:
+        compact_key = (ticker, fingerprint, '__compact__', tuple(specs))
+        cached = indicator_cache.get(compact_key) if ticker is not None else None
+        if cached is None:
+            cached = compact_indicators(calculate_all_indicators(df, user_inputs))
+            if ticker is not None:
+                indicator_cache.put(compact_key, cached)
+        return cached
+
+    if ticker is not None:
+        result_key = (ticker, fingerprint, '__all__', tuple(specs))
+        cached = indicator_cache.get(result_key)
+        if cached is not None:
+            return cached
+
+    data = ensure_ohlcv(df)
+
+    cached_columns, missing = {}, []
+    for spec in specs:
+        columns = indicator_cache.get((ticker, fingerprint) + spec) if ticker is not None else None
+        if columns is None:
+            missing.append(spec)
+        else:
+            cached_columns[spec] = columns
+
+    # 캐시에 없는 지표만 하나의 계산 그래프로 묶어 공유 중간값을 한 번만 계산합니다.
+    computed = evaluate(data, missing)
+    if ticker is not None:
+        for spec, columns in computed.items():
+            indicator_cache.put((ticker, fingerprint) + spec, columns)
+
+    result = assemble_columns(data.index, [cached_columns.get(spec, computed.get(spec)) for spec in specs])
+    if ticker is not None:
+        indicator_cache.put(result_key, result)
+    return result
+
+
+if __name__ == "__main__":
+    # compact 모드의 정확도 확인: float32 가격으로 계산해 줄인 결과 vs float64 결과 (python -m core.calculator)
+    from data.fetcher import compact_ohlcv
+
+    rng = np.random.default_rng(0)
+    n = 2000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    df = pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, n)),
+        'High': close * (1 + np.abs(rng.normal(0, 0.01, n))),
+        'Low': close * (1 - np.abs(rng.normal(0, 0.01, n))),
+        'Close': close,
+        'Volume': rng.integers(1_000, 1_000_000, n).astype(float),
+    }, index=pd.date_range('2015-01-01', periods=n, freq='B'))
+    inputs = {'selected_ma_periods': ['MA5', 'MA20', 'MA60', 'MA120', 'MA200', 'EMA200'], 'show_bbands': True,
+              'show_rsi': True, 'show_macd': True, 'show_stoch': True, 'show_squeeze': True}
+
+    expected = calculate_all_indicators(df, inputs)
+    actual = calculate_all_indicators(compact_ohlcv(df), inputs, compact=True)
+    print(f"memory: {expected.memory_usage().sum():,} -> {actual.memory_usage().sum():,} bytes")
+
+    unpacked = unpack_squeeze_flags(actual)
+    for col in expected.columns:
+        if col in SQUEEZE_FLAG_COLS:
+            # 밴드가 거의 겹치는 경계 봉에서는 float32 반올림으로 판정이 바뀔 수 있습니다.
+            mismatch = (unpacked[col].to_numpy() != expected[col].to_numpy()).mean()
+            assert mismatch < 0.005, (col, mismatch)
+            continue
+        exp = expected[col].to_numpy(dtype=float)
+        err = np.nanmax(np.abs(unpacked[col].to_numpy(dtype=float) - exp)) / np.nanmax(np.abs(exp))
+        assert err < 1e-5, (col, err)
+    print("compact mode: OK")
@@ -1,13 +1,19 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import mplfinance as mpf
+from matplotlib.collections import LineCollection
 from matplotlib.ticker import FuncFormatter
 
-def _prepare_squeeze_plots(chart_data, panel_idx):
+from core import signals
+
+CHART_BARS = 200  # 차트에 그리는 최근 봉 수 (지표도 이 구간 + 워밍업만 계산)
+
+def _prepare_squeeze_plots(indicators, panel_idx):
     """스퀴즈 모멘텀 지표를 위한 addplot 리스트를 생성합니다."""
     plots = []
     
-    sqz_hist = chart_data['SQZ_VAL_CUSTOM']
+    sqz_hist = indicators['SQZ_VAL_CUSTOM']
     is_positive = sqz_hist >= 0
     momentum_increasing = sqz_hist.diff().fillna(0) >= 0
 
@@ -16,8 +22,8 @@ def _prepare_squeeze_plots(chart_data, panel_idx):
     sqz_neg_inc = sqz_hist.where(~is_positive & momentum_increasing)
     sqz_neg_dec = sqz_hist.where(~is_positive & ~momentum_increasing)
 
-    sqz_on_marker = pd.Series(0, index=chart_data.index).where(chart_data['SQZ_ON_CUSTOM'])
-    sqz_off_marker = pd.Series(0, index=chart_data.index).where(chart_data['SQZ_OFF_CUSTOM'])
+    sqz_on_marker = pd.Series(0, index=indicators.index).where(indicators['SQZ_ON_CUSTOM'])
+    sqz_off_marker = pd.Series(0, index=indicators.index).where(indicators['SQZ_OFF_CUSTOM'])
     
     # secondary_y=False를 명시하여 오른쪽 Y축이 생기지 않도록 합니다.
     plots.extend([
@@ -31,10 +37,14 @@ def _prepare_squeeze_plots(chart_data, panel_idx):
     return plots
 
 
-def create_stock_chart(df, user_inputs, company_name, currency='USD'):
-    """계산된 데이터와 사용자 입력을 바탕으로 mplfinance 차트를 생성합니다."""
-    
-    chart_data = df.tail(200)
+def create_stock_chart(df, indicators, user_inputs, company_name, currency='USD'):
+    """
+    가격 데이터, 지표 컬럼(df와 같은 인덱스), 사용자 입력을 바탕으로 mplfinance 차트를 생성합니다.
+    가격과 지표를 합친 프레임을 만들지 않고 각각 마지막 CHART_BARS개 봉만 잘라 사용합니다.
+    """
+
+    chart_data = df.tail(CHART_BARS)
+    ind = indicators.tail(CHART_BARS)
     add_plots = []
     fill_between_args = None
     panel_idx = 2
@@ -43,46 +53,50 @@ def create_stock_chart(df, user_inputs, company_name, currency='USD'):
     ylabel = f'Price ({currency})'
 
     # --- 보조지표 패널 생성 ---
-    if user_inputs['show_bbands'] and all(c in chart_data.columns for c in ['BBU_20_2.0', 'BBL_20_2.0']):
-        fill_between_args = dict(y1=chart_data['BBU_20_2.0'].values, y2=chart_data['BBL_20_2.0'].values, color='grey', alpha=0.2)
+    if user_inputs['show_bbands'] and all(c in ind.columns for c in ['BBU_20_2.0', 'BBL_20_2.0']):
+        fill_between_args = dict(y1=ind['BBU_20_2.0'].values, y2=ind['BBL_20_2.0'].values, color='grey', alpha=0.2)
         add_plots.extend([
-            mpf.make_addplot(chart_data['BBU_20_2.0'], color='grey', linestyle='--', width=0.7),
-            mpf.make_addplot(chart_data['BBL_20_2.0'], color='grey', linestyle='--', width=0.7)
+            mpf.make_addplot(ind['BBU_20_2.0'], color='grey', linestyle='--', width=0.7),
+            mpf.make_addplot(ind['BBL_20_2.0'], color='grey', linestyle='--', width=0.7)
         ])
 
-    if user_inputs['show_rsi'] and 'RSI_14' in chart_data.columns:
-        add_plots.append(mpf.make_addplot(chart_data['RSI_14'], panel=panel_idx, color='green', title='RSI(14)', secondary_y=False))
+    bull_div_prices = pd.Series(dtype=float)
+    bear_div_prices = pd.Series(dtype=float)
+    if user_inputs['show_rsi'] and 'RSI_14' in ind.columns:
+        add_plots.append(mpf.make_addplot(ind['RSI_14'], panel=panel_idx, color='green', title='RSI(14)', secondary_y=False))
+        if user_inputs.get('show_rsi_div'):
+            div = signals.rsi_divergence(chart_data['High'], chart_data['Low'], ind['RSI_14'])
+            for flags, color, marker in [(div['BULL_DIV'], 'lime', '^'), (div['BEAR_DIV'], 'red', 'v')]:
+                if flags.any():
+                    add_plots.append(mpf.make_addplot(ind['RSI_14'].where(flags), type='scatter', panel=panel_idx,
+                                                      color=color, marker=marker, markersize=80, secondary_y=False))
+            bull_div_prices = chart_data['Low'][div['BULL_DIV']] * 0.97
+            bear_div_prices = chart_data['High'][div['BEAR_DIV']] * 1.03
         panel_idx += 1
 
-    if user_inputs['show_macd'] and all(c in chart_data.columns for c in ['MACD_12_26_9', 'MACDs_12_26_9', 'MACDh_12_26_9']):
+    if user_inputs['show_macd'] and all(c in ind.columns for c in ['MACD_12_26_9', 'MACDs_12_26_9', 'MACDh_12_26_9']):
         add_plots.extend([
-            mpf.make_addplot(chart_data['MACD_12_26_9'], panel=panel_idx, color='blue', title='MACD', secondary_y=False),
-            mpf.make_addplot(chart_data['MACDs_12_26_9'], panel=panel_idx, color='red', linestyle='--', secondary_y=False),
-            mpf.make_addplot(chart_data['MACDh_12_26_9'], type='bar', panel=panel_idx, color='gray', alpha=0.5, secondary_y=False)
+            mpf.make_addplot(ind['MACD_12_26_9'], panel=panel_idx, color='blue', title='MACD', secondary_y=False),
+            mpf.make_addplot(ind['MACDs_12_26_9'], panel=panel_idx, color='red', linestyle='--', secondary_y=False),
+            mpf.make_addplot(ind['MACDh_12_26_9'], type='bar', panel=panel_idx, color='gray', alpha=0.5, secondary_y=False)
         ])
         panel_idx += 1
 
-    if user_inputs['show_stoch'] and all(c in chart_data.columns for c in ['STOCHk_14_3_3', 'STOCHd_14_3_3']):
+    if user_inputs['show_stoch'] and all(c in ind.columns for c in ['STOCHk_14_3_3', 'STOCHd_14_3_3']):
         add_plots.extend([
-            mpf.make_addplot(chart_data['STOCHk_14_3_3'], panel=panel_idx, color='blue', title='Stochastic', secondary_y=False),
-            mpf.make_addplot(chart_data['STOCHd_14_3_3'], panel=panel_idx, color='red', linestyle='--', secondary_y=False)
+            mpf.make_addplot(ind['STOCHk_14_3_3'], panel=panel_idx, color='blue', title='Stochastic', secondary_y=False),
+            mpf.make_addplot(ind['STOCHd_14_3_3'], panel=panel_idx, color='red', linestyle='--', secondary_y=False)
         ])
         panel_idx += 1
 
     buy_signal_prices = pd.Series(dtype=float)
     sell_signal_prices = pd.Series(dtype=float)
-    if user_inputs['show_squeeze'] and all(c in chart_data.columns for c in ['SQZ_VAL_CUSTOM', 'SQZ_ON_CUSTOM', 'SQZ_OFF_CUSTOM']):
-        add_plots.extend(_prepare_squeeze_plots(chart_data, panel_idx))
-        
-        squeeze_fired = (chart_data['SQZ_ON_CUSTOM'].shift(1) & chart_data['SQZ_OFF_CUSTOM'])
-        momentum_increasing = chart_data['SQZ_VAL_CUSTOM'].diff().fillna(0) >= 0
-        buy_signals = squeeze_fired & (chart_data['SQZ_VAL_CUSTOM'] > 0) & momentum_increasing
-        buy_signal_prices = chart_data['Low'][buy_signals] * 0.98
+    if user_inputs['show_squeeze'] and all(c in ind.columns for c in ['SQZ_VAL_CUSTOM', 'SQZ_ON_CUSTOM', 'SQZ_OFF_CUSTOM']):
+        add_plots.extend(_prepare_squeeze_plots(ind, panel_idx))
         
-        prev_momentum = chart_data['SQZ_VAL_CUSTOM'].shift(1)
-        current_momentum = chart_data['SQZ_VAL_CUSTOM']
-        sell_signals = (prev_momentum >= 0) & (current_momentum < 0)
-        sell_signal_prices = chart_data['High'][sell_signals] * 1.02
+        sig = signals.squeeze_signals(ind['SQZ_ON_CUSTOM'], ind['SQZ_OFF_CUSTOM'], ind['SQZ_VAL_CUSTOM'])
+        buy_signal_prices = chart_data['Low'][sig['SQZ_BUY']] * 0.98
+        sell_signal_prices = chart_data['High'][sig['SQZ_SELL']] * 1.02
         
         panel_idx += 1
 
@@ -105,7 +119,9 @@ def create_stock_chart(df, user_inputs, company_name, currency='USD'):
     ax_main = axes[0]
     ax_volume = axes[2]
 
-    fig.suptitle(f'{company_name} ({user_inputs["ticker"]}) Price', fontsize=24, y=0.95)
+    timeframe = user_inputs.get('timeframe', '1D')
+    title_suffix = '' if timeframe == '1D' else f' - {timeframe}'
+    fig.suptitle(f'{company_name} ({user_inputs["ticker"]}) Price{title_suffix}', fontsize=24, y=0.95)
     ax_main.set_ylabel(ylabel, fontsize=14)
     ax_volume.set_ylabel('Volume', fontsize=14)
     
@@ -125,13 +141,24 @@ def create_stock_chart(df, user_inputs, company_name, currency='USD'):
             period = int(ma_name.replace('MA', ''))
             ma_col = f'MA_{period}'
         style = st.session_state.ma_styles.get(ma_name, {'color':'#888','linewidth':1.5,'linestyle':'-'})
-        if ma_col in chart_data.columns:
-            ax_main.plot(range(len(chart_data.index)), chart_data[ma_col], 
+        if ma_col in ind.columns:
+            ax_main.plot(range(len(chart_data.index)), ind[ma_col], 
                          color=style['color'], label=ma_name, 
                          linewidth=style['linewidth'], linestyle=style['linestyle'])
     
+    # --- 이동평균 리본: (봉 수, 선 개수) 배열을 LineCollection 하나로 그립니다 ---
+    ribbon = user_inputs.get('ribbon')
+    ribbon_cols = [c for c in ind.columns if c.startswith('RIBBON_')]
+    if ribbon and ribbon_cols:
+        values = ind[ribbon_cols].to_numpy(dtype=float).T
+        x = np.broadcast_to(np.arange(values.shape[1]), values.shape)
+        lines = LineCollection(np.stack([x, values], axis=-1), cmap='viridis', linewidths=1.0, alpha=0.8,
+                               label=f"{ribbon['kind']} Ribbon ({ribbon['periods'][0]}-{ribbon['periods'][-1]})")
+        lines.set_array(np.asarray(ribbon['periods'], dtype=float))
+        ax_main.add_collection(lines, autolim=False)
+
+    date_to_loc = pd.Series(range(len(chart_data.index)), index=chart_data.index)
     if user_inputs['show_squeeze']:
-        date_to_loc = pd.Series(range(len(chart_data.index)), index=chart_data.index)
         buy_points = buy_signal_prices.dropna()
         if not buy_points.empty:
             ax_main.scatter(date_to_loc[buy_points.index], buy_points.values, marker='^', color='lime', s=120, zorder=10, label='SMI Buy (Squeeze Fire)')
@@ -139,6 +166,13 @@ def create_stock_chart(df, user_inputs, company_name, currency='USD'):
         if not sell_points.empty:
             ax_main.scatter(date_to_loc[sell_points.index], sell_points.values, marker='v', color='red', s=120, zorder=10, label='SMI Sell (Zero-Cross)')
 
+    if not bull_div_prices.empty:
+        ax_main.scatter(date_to_loc[bull_div_prices.index], bull_div_prices.values, marker='^', facecolors='none',
+                        edgecolors='lime', linewidths=2, s=150, zorder=10, label='RSI Bullish Divergence')
+    if not bear_div_prices.empty:
+        ax_main.scatter(date_to_loc[bear_div_prices.index], bear_div_prices.values, marker='v', facecolors='none',
+                        edgecolors='red', linewidths=2, s=150, zorder=10, label='RSI Bearish Divergence')
+
     # --- (핵심 수정) Latest close & percent change (regular session) only (우측 상단 고정) ---
     if len(chart_data) >= 2:
         latest_candle = chart_data.iloc[-1]
@@ -156,7 +190,8 @@ def create_stock_chart(df, user_inputs, company_name, currency='USD'):
             transform=ax_main.transAxes,
             bbox=dict(facecolor=price_label_color, alpha=0.9, pad=4, boxstyle='round,pad=0.4'))
 
-    if user_inputs['selected_ma_periods'] or (user_inputs['show_squeeze'] and (not buy_signal_prices.empty or not sell_signal_prices.empty)):
+    has_markers = not (buy_signal_prices.empty and sell_signal_prices.empty and bull_div_prices.empty and bear_div_prices.empty)
+    if user_inputs['selected_ma_periods'] or (ribbon and ribbon_cols) or has_markers:
         ax_main.legend(loc='upper left')
 
     return fig, axes
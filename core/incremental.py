@@ -0,0 +1,466 @@
+"""
+보조지표 증분 계산 엔진.
+
+자동 새로고침마다 바뀌는 것은 보통 마지막 봉(교체) 또는 새 봉(추가)뿐이므로,
+티커별로 지표 상태(롤링 윈도우, EMA/Wilder 평균 상태)를 보관해 두고
+바뀐 꼬리 구간만 다시 계산합니다. 결과는 calculator.calculate_all_indicators와 같은
+컬럼/값을 가집니다. (부동소수점 반올림 수준의 차이만 있음)
+"""
+import copy
+import math
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from core import calculator
+
+NAN = float('nan')
+EPS = np.finfo(float).eps
+
+
+# --- 스트리밍 기본 상태 ---
+
+class _EWMState:
+    """pandas Series.ewm(...).mean()의 점화식을 한 값씩 그대로 적용합니다. (ignore_na=False)"""
+
+    def __init__(self, span=None, alpha=None, adjust=True, min_periods=0):
+        # pandas와 같은 방식으로 com을 거쳐 alpha를 계산해야 결과가 일치합니다.
+        com = (span - 1) / 2.0 if span is not None else 1.0 / alpha - 1.0
+        alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.weighted = None
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x):
+        is_obs = x == x
+        if self.weighted is None:
+            self.weighted = x
+            self.nobs = int(is_obs)
+        else:
+            self.nobs += is_obs
+            if self.weighted == self.weighted:
+                self.old_wt *= self.old_wt_factor
+                if is_obs:
+                    if self.weighted != x:
+                        self.weighted = (self.old_wt * self.weighted + self.new_wt * x) / (self.old_wt + self.new_wt)
+                    self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+            elif is_obs:
+                self.weighted = x
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class _Window:
+    """고정 길이 롤링 윈도우. 윈도우가 모두 유효값으로 찼을 때만 통계를 반환합니다."""
+
+    def __init__(self, length):
+        self.length = length
+        self.values = deque(maxlen=length)
+
+    def push(self, x):
+        self.values.append(x)
+
+    @property
+    def full(self):
+        return len(self.values) == self.length and not any(v != v for v in self.values)
+
+    def mean(self):
+        return math.fsum(self.values) / self.length if self.full else NAN
+
+    def std(self, ddof):
+        if not self.full:
+            return NAN
+        return float(np.sqrt(np.var(np.fromiter(self.values, float, self.length), ddof=ddof)))
+
+    def max(self):
+        return max(self.values) if self.full else NAN
+
+    def min(self):
+        return min(self.values) if self.full else NAN
+
+
+class _SeededEMAState:
+    """pandas_ta.ema와 같이 첫 length개 평균(SMA)으로 시작하는 EMA (adjust=False)."""
+
+    def __init__(self, length):
+        self.length = length
+        self.seed = []
+        self.ewm = _EWMState(span=length, adjust=False)
+
+    def update(self, x):
+        if len(self.seed) < self.length:
+            self.seed.append(x)
+            if len(self.seed) < self.length:
+                return self.ewm.update(NAN)
+            x = math.fsum(v for v in self.seed if v == v) / max(sum(v == v for v in self.seed), 1)
+        return self.ewm.update(x)
+
+
+class _FromFirstValid:
+    """pandas_ta처럼 입력의 첫 유효값 이후부터 하위 지표를 적용합니다."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.started = False
+
+    def update(self, x):
+        if not self.started:
+            if x != x:
+                return NAN
+            self.started = True
+        return self.inner.update(x)
+
+
+class _SMAState:
+    def __init__(self, length):
+        self.window = _Window(length)
+
+    def update(self, x):
+        self.window.push(x)
+        return self.window.mean()
+
+
+def _non_zero(x):
+    return x + EPS if x == 0 else x
+
+
+# --- 지표별 스트리밍 계산기 (calculator.calculate_all_indicators와 같은 컬럼) ---
+
+class _MovingAverage:
+    def __init__(self, period, exponential):
+        self.columns = [f'EMA_{period}' if exponential else f'MA_{period}']
+        self.state = _EWMState(span=period, adjust=False) if exponential else _SMAState(period)
+
+    def update(self, o, h, l, c):
+        return (self.state.update(c),)
+
+
+class _BBands:
+    def __init__(self, length=20, std=2.0):
+        suffix = f'_{length}_{std}'
+        self.columns = [f'BBL{suffix}', f'BBM{suffix}', f'BBU{suffix}', f'BBB{suffix}', f'BBP{suffix}']
+        self.std = std
+        self.window = _Window(length)
+
+    def update(self, o, h, l, c):
+        self.window.push(c)
+        mid = self.window.mean()
+        dev = self.std * self.window.std(ddof=0)
+        lower, upper = mid - dev, mid + dev
+        width = _non_zero(upper - lower)
+        return lower, mid, upper, 100 * width / mid, _non_zero(c - lower) / width
+
+
+class _RSI:
+    def __init__(self, length=14):
+        self.columns = [f'RSI_{length}']
+        self.prev_close = NAN
+        self.pos = _EWMState(alpha=1.0 / length, min_periods=length)
+        self.neg = _EWMState(alpha=1.0 / length, min_periods=length)
+
+    def update(self, o, h, l, c):
+        diff = c - self.prev_close
+        self.prev_close = c
+        pos_avg = self.pos.update(max(diff, 0.0) if diff == diff else NAN)
+        neg_avg = self.neg.update(min(diff, 0.0) if diff == diff else NAN)
+        return (100 * pos_avg / (pos_avg + abs(neg_avg)),)
+
+
+class _MACD:
+    def __init__(self, fast=12, slow=26, signal=9):
+        suffix = f'_{fast}_{slow}_{signal}'
+        self.columns = [f'MACD{suffix}', f'MACDh{suffix}', f'MACDs{suffix}']
+        self.fast = _SeededEMAState(fast)
+        self.slow = _SeededEMAState(slow)
+        self.signal = _FromFirstValid(_SeededEMAState(signal))
+
+    def update(self, o, h, l, c):
+        macd = self.fast.update(c) - self.slow.update(c)
+        signal = self.signal.update(macd)
+        return macd, macd - signal, signal
+
+
+class _Stoch:
+    def __init__(self, k=14, d=3, smooth_k=3):
+        suffix = f'_{k}_{d}_{smooth_k}'
+        self.columns = [f'STOCHk{suffix}', f'STOCHd{suffix}']
+        self.highs = _Window(k)
+        self.lows = _Window(k)
+        self.smooth_k = _FromFirstValid(_SMAState(smooth_k))
+        self.smooth_d = _FromFirstValid(_SMAState(d))
+
+    def update(self, o, h, l, c):
+        self.highs.push(h)
+        self.lows.push(l)
+        lowest, highest = self.lows.min(), self.highs.max()
+        stoch = 100 * (c - lowest) / _non_zero(highest - lowest)
+        stoch_k = self.smooth_k.update(stoch)
+        return stoch_k, self.smooth_d.update(stoch_k)
+
+
+class _Squeeze:
+    """calculator._calculate_squeeze_momentum (LazyBear Squeeze Momentum)의 스트리밍 버전."""
+
+    def __init__(self, bb_length=20, kc_length=20, kc_mult=1.5, use_tr=True):
+        self.columns = ['BBU_LB', 'BBL_LB', 'KCU_LB', 'KCL_LB',
+                        'SQZ_ON_CUSTOM', 'SQZ_OFF_CUSTOM', 'SQZ_NO_CUSTOM', 'SQZ_VAL_CUSTOM']
+        self.kc_mult = kc_mult
+        self.use_tr = use_tr
+        self.bb_close = _Window(bb_length)
+        self.kc_close = _Window(kc_length)
+        self.ranges = _Window(kc_length)
+        self.highs = _Window(kc_length)
+        self.lows = _Window(kc_length)
+        self.mom = _Window(kc_length)
+        self.prev_close = None
+        n = kc_length
+        self.x = np.arange(1, n + 1, dtype=float)
+        self.x_sum = 0.5 * n * (n + 1)
+        self.divisor = n * (self.x_sum * (2 * n + 1) / 3) - self.x_sum * self.x_sum
+
+    def _true_range(self, h, l, c):
+        prev_close, self.prev_close = self.prev_close, c
+        if not self.use_tr:
+            return h - l
+        if prev_close is None:
+            return NAN
+        return max(abs(_non_zero(h - l)), abs(h - prev_close), abs(prev_close - l))
+
+    def _linreg(self):
+        if not self.mom.full:
+            return NAN
+        y = np.fromiter(self.mom.values, float, self.mom.length)
+        n = self.mom.length
+        y_sum, xy_sum = y.sum(), (self.x * y).sum()
+        m = (n * xy_sum - self.x_sum * y_sum) / self.divisor
+        b = (y_sum - m * self.x_sum) / n
+        return m * n + b
+
+    def update(self, o, h, l, c):
+        self.bb_close.push(c)
+        self.kc_close.push(c)
+        self.highs.push(h)
+        self.lows.push(l)
+        self.ranges.push(self._true_range(h, l, c))
+
+        basis = self.bb_close.mean()
+        dev = self.kc_mult * self.bb_close.std(ddof=1)
+        bbu, bbl = basis + dev, basis - dev
+        ma = self.kc_close.mean()
+        rangema = self.ranges.mean()
+        kcu, kcl = ma + rangema * self.kc_mult, ma - rangema * self.kc_mult
+
+        sqz_on = bool(bbl > kcl and bbu < kcu)
+        sqz_off = bool(bbl < kcl and bbu > kcu)
+
+        self.mom.push(c - ((self.highs.max() + self.lows.min()) / 2 + ma) / 2)
+        return bbu, bbl, kcu, kcl, sqz_on, sqz_off, (not sqz_on and not sqz_off), self._linreg()
+
+
+# 지표 스펙 이름 -> 스트리밍 계산기 (스펙은 calculator.indicator_specs와 공유)
+STREAMING_INDICATORS = {
+    'MA': lambda period: _MovingAverage(period, exponential=False),
+    'EMA': lambda period: _MovingAverage(period, exponential=True),
+    'BBANDS': _BBands,
+    'RSI': _RSI,
+    'MACD': _MACD,
+    'STOCH': _Stoch,
+    'SQUEEZE': _Squeeze,
+}
+
+
+class _TickerState:
+    """한 티커의 확정된 봉과, 지표 스펙별 스트리밍 상태 및 계산 결과."""
+
+    def __init__(self):
+        self.index = None              # 상태에 반영된(확정된) 봉의 인덱스
+        self.ohlc = np.empty((0, 4))   # 확정된 봉의 OHLC 값
+        self.indicators = {}           # spec -> 스트리밍 계산기
+        self.rows = {}                 # spec -> 확정된 봉의 지표 값 (행 단위 튜플 목록)
+
+    def add_indicator(self, spec):
+        """새로 켠 지표만 확정 구간 전체를 한 번 계산합니다. (다른 지표는 건드리지 않음)"""
+        name, params = spec
+        indicator = STREAMING_INDICATORS[name](**dict(params))
+        self.indicators[spec] = indicator
+        self.rows[spec] = _step(indicator, self.ohlc)
+
+    def overlap(self, index, ohlc):
+        """
+        새 데이터가 확정 구간에 그대로 이어지면, 새 데이터보다 앞서 있어 버릴 확정 봉 수를 반환합니다.
+        (window 구간이나 가득 찬 링 버퍼는 봉이 추가될 때마다 첫 봉이 뒤로 밀립니다)
+        확정 구간의 봉이 바뀌었거나 새 데이터가 확정 구간보다 앞에서 시작하면 None을 반환합니다.
+        """
+        n = len(self.ohlc)
+        if n == 0:
+            return 0
+        if len(index) == 0:
+            return None
+        drop = int(self.index.searchsorted(index[0]))
+        if drop >= n or self.index[drop] != index[0]:
+            return None
+        kept = n - drop
+        if len(index) < kept or not index[:kept].equals(self.index[drop:]):
+            return None
+        return drop if np.array_equal(ohlc[:kept], self.ohlc[drop:], equal_nan=True) else None
+
+    def drop_leading(self, count):
+        """앞쪽 확정 봉 count개를 버립니다. 스트리밍 상태는 그 봉들을 반영한 채로 유지합니다."""
+        if count:
+            self.index = self.index[count:]
+            self.ohlc = self.ohlc[count:]
+            for spec in self.rows:
+                del self.rows[spec][:count]
+
+
+def _step(indicator, bars):
+    return [indicator.update(o, h, l, c) for o, h, l, c in bars]
+
+
+class IncrementalIndicatorEngine:
+    """
+    티커별 지표 상태를 보관하고, 새 데이터에서 바뀐 꼬리 구간만 다시 계산합니다.
+
+    마지막 tail_rows개 봉은 아직 확정되지 않은 것으로 보고 상태에 반영하지 않습니다.
+    그래서 마지막 봉이 장중에 계속 바뀌어도 그 직전 상태에서 다시 이어 계산할 수 있습니다.
+    새 데이터의 첫 봉이 뒤로 밀린 경우(window 구간, 가득 찬 분봉 링 버퍼)에는 앞쪽 확정 봉만 버리고
+    상태는 그대로 이어 씁니다. 그래서 EMA/RSI/MACD는 window 구간만으로 새로 계산한 값과
+    EWM_CONVERGENCE_TOL 수준에서 다를 수 있습니다. (더 긴 이력을 반영한 값)
+    확정 구간의 과거 데이터가 바뀐 경우(분할/배당 조정 등)에는 처음부터 다시 계산합니다.
+    지표 결과는 calculator.indicator_cache에 지표 스펙별로 저장되어, 데이터가 그대로인
+    재실행은 캐시 조회만으로 끝납니다.
+    """
+
+    def __init__(self, tail_rows=5):
+        self.tail_rows = tail_rows
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def reset(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._states.clear()
+            else:
+                self._states.pop(ticker, None)
+
+    def update(self, ticker, df, user_inputs, window=None):
+        """calculate_all_indicators(df, user_inputs, window=window)와 같은 결과를 증분 방식으로 반환합니다."""
+        specs = calculator.indicator_specs(user_inputs)
+        if window is not None:
+            recent = df.iloc[-(window + calculator.warmup_bars(specs)):]
+            return self.update(ticker, recent, user_inputs).iloc[-window:]
+        fingerprint = calculator.data_fingerprint(df)
+        result_key = (ticker, fingerprint, '__all__', tuple(specs))
+        cached = calculator.indicator_cache.get(result_key)
+        if cached is not None:
+            return cached
+
+        data = calculator.ensure_ohlcv(df)
+        frames = []
+        missing = []
+        for spec in specs:
+            columns = calculator.indicator_cache.get((ticker, fingerprint) + spec)
+            frames.append(columns)
+            if columns is None:
+                missing.append(spec)
+
+        if missing:
+            # 스트리밍 계산기가 없는 지표(예: 리본)는 계산 그래프로 한 번에 계산합니다.
+            streaming = [spec for spec in missing if spec[0] in STREAMING_INDICATORS]
+            computed = self._compute(ticker, data, streaming) if streaming else {}
+            computed.update(calculator.evaluate(data, [spec for spec in missing if spec not in streaming]))
+            for spec, columns in computed.items():
+                calculator.indicator_cache.put((ticker, fingerprint) + spec, columns)
+            frames = [computed.get(spec, f) for spec, f in zip(specs, frames)]
+
+        result = calculator.assemble_columns(data.index, frames)
+        calculator.indicator_cache.put(result_key, result)
+        return result
+
+    def _compute(self, ticker, data, specs):
+        """지정한 지표 스펙만 상태를 이어서 계산해 스펙별 컬럼 DataFrame으로 반환합니다."""
+        ohlc = data[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=float)
+
+        with self._lock:
+            state = self._states.get(ticker)
+            drop = None if state is None else state.overlap(data.index, ohlc)
+            if drop is None:
+                state = _TickerState()
+                self._states[ticker] = state
+            else:
+                state.drop_leading(drop)
+
+            committed = len(state.ohlc)
+            commit_to = max(committed, len(data) - self.tail_rows)
+            # 1) 확정 구간을 모든 상태에 반영 (이미 켜진 지표들의 상태도 함께 전진)
+            for spec, indicator in state.indicators.items():
+                state.rows[spec].extend(_step(indicator, ohlc[committed:commit_to]))
+            state.index = data.index[:commit_to]
+            state.ohlc = ohlc[:commit_to]
+            for spec in specs:
+                if spec not in state.indicators:
+                    state.add_indicator(spec)
+
+            # 2) 미확정 꼬리는 상태 사본으로 계산
+            results = {}
+            for spec in specs:
+                indicator = state.indicators[spec]
+                rows = state.rows[spec] + _step(copy.deepcopy(indicator), ohlc[commit_to:])
+                results[spec] = pd.DataFrame(rows, index=data.index, columns=indicator.columns)
+
+        for columns in results.values():
+            for col in ('SQZ_ON_CUSTOM', 'SQZ_OFF_CUSTOM', 'SQZ_NO_CUSTOM'):
+                if col in columns.columns:
+                    columns[col] = columns[col].astype(bool)
+        return results
+
+
+engine = IncrementalIndicatorEngine()
+
+
+if __name__ == "__main__":
+    # 봉 추가/교체 재생: window 구간이 밀려도 상태를 다시 만들지 않는지, 결과가 일괄 계산과 맞는지 확인
+    # (python -m core.incremental)
+    import time
+
+    rng = np.random.default_rng(0)
+    n, window = 1200, 200
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    df = pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, n)),
+        'High': close * (1 + np.abs(rng.normal(0, 0.01, n))),
+        'Low': close * (1 - np.abs(rng.normal(0, 0.01, n))),
+        'Close': close,
+        'Volume': rng.integers(1_000, 1_000_000, n).astype(float),
+    }, index=pd.date_range('2015-01-01', periods=n, freq='B'))
+    inputs = {'ticker': 'T', 'selected_ma_periods': ['MA5', 'MA20', 'MA60', 'EMA200'], 'show_bbands': True,
+              'show_rsi': True, 'show_macd': True, 'show_stoch': True, 'show_squeeze': True}
+
+    test_engine = IncrementalIndicatorEngine()
+    test_engine.update('T', df.iloc[:1000], inputs, window=window)
+    state = test_engine._states['T']
+    started = time.perf_counter()
+    for stop in range(1001, n + 1):
+        live = df.iloc[:stop].copy()
+        live.iloc[-1, live.columns.get_loc('Close')] *= 1.01  # 장중 교체
+        test_engine.update('T', live, inputs, window=window)
+        result = test_engine.update('T', df.iloc[:stop], inputs, window=window)  # 새 봉 추가
+        assert test_engine._states['T'] is state, f"{stop}번째 봉 추가에서 상태를 다시 만듦"
+    elapsed = time.perf_counter() - started
+    assert len(state.ohlc) <= window + calculator.warmup_bars(calculator.indicator_specs(inputs))
+
+    # 상태는 처음 계산한 구간의 첫 봉부터 이어져 왔으므로, 같은 첫 봉부터 일괄 계산한 결과와 일치해야 합니다.
+    first = 1000 - (window + calculator.warmup_bars(calculator.indicator_specs(inputs)))
+    batch_inputs = {k: v for k, v in inputs.items() if k != 'ticker'}
+    expected = calculator.calculate_all_indicators(df.iloc[first:], batch_inputs).iloc[-window:]
+    for col in expected.columns:
+        if expected[col].dtype == bool:
+            assert expected[col].equals(result[col]), col
+            continue
+        assert np.allclose(result[col], expected[col], rtol=1e-9, atol=0, equal_nan=True), col
+    print(f"봉 추가/교체 {2 * (n - 1000)}회: 상태 재생성 없음, {elapsed / (2 * (n - 1000)) * 1e3:.2f}ms/회")
@@ -0,0 +1,335 @@
+"""
+보조지표 계산용 순수 NumPy 커널.
+
+pandas Series를 여러 번 거치는 대신 float 배열에서 바로 계산합니다. 시간축은 항상 0번 축이므로
+1차원(봉) 배열과 2차원(봉 x 종목) 배열 모두에 쓸 수 있습니다. (core.panel 참고)
+롤링 통계는 스트라이드 윈도우(sliding_window_view)로, 롤링 선형회귀 끝값은
+y와 x·y의 롤링 합으로 닫힌 형태로 계산합니다. 윈도우에 NaN이 하나라도 있으면
+결과는 NaN입니다. (pandas의 rolling(length, min_periods=length)와 같음)
+
+재귀/윈도우 지표(EWM, EMA, RSI, 스토캐스틱, 선형회귀)는 numba가 설치되어 있으면
+core.numba_kernels의 컴파일된 커널로 계산합니다. (BACKEND, set_backend 참고)
+numba 커널은 1차원 입력만 받으므로 2차원 입력은 항상 NumPy 경로로 계산합니다.
+"""
+import functools
+import inspect
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from core import numba_kernels
+except ImportError:
+    numba_kernels = None
+
+EPS = sys.float_info.epsilon
+
+BACKEND = 'numba' if numba_kernels is not None else 'numpy'
+
+
+def set_backend(name):
+    """계산 백엔드('numba' 또는 'numpy')를 바꿉니다. numba가 없으면 'numpy'만 가능합니다."""
+    global BACKEND
+    if name == 'numba' and numba_kernels is None:
+        raise ImportError("numba가 설치되어 있지 않습니다.")
+    if name not in ('numba', 'numpy'):
+        raise ValueError(f"알 수 없는 백엔드: {name}")
+    BACKEND = name
+
+
+def _accelerated(func):
+    """numba 백엔드가 선택되어 있으면 numba_kernels의 같은 이름 커널로 계산합니다."""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if BACKEND != 'numba':
+            return func(*args, **kwargs)
+        args = signature.bind(*args, **kwargs).args
+        args = [np.ascontiguousarray(a, dtype=float) if isinstance(a, (np.ndarray, pd.Series, list, tuple)) else a
+                for a in args]
+        if args[0].ndim != 1:
+            return func(*args)
+        return getattr(numba_kernels, func.__name__)(*args)
+    return wrapper
+
+
+def _as_float(x):
+    return np.asarray(x, dtype=float)
+
+
+def _rolling(x, length, reducer):
+    """시간축(0번 축) 길이 length의 윈도우마다 reducer(windows, axis=-1)를 적용하고 앞쪽을 NaN으로 채웁니다."""
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    if length <= x.shape[0]:
+        out[length - 1:] = reducer(sliding_window_view(x, length, axis=0), axis=-1)
+    return out
+
+
+def rolling_mean(x, length):
+    return _rolling(x, length, np.mean)
+
+
+def rolling_std(x, length, ddof=1):
+    return _rolling(x, length, lambda w, axis: np.std(w, axis=axis, ddof=ddof))
+
+
+def rolling_max(x, length):
+    return _rolling(x, length, np.max)
+
+
+def rolling_min(x, length):
+    return _rolling(x, length, np.min)
+
+
+def non_zero_range(high, low):
+    """pandas_ta.utils.non_zero_range와 같이, 0인 값이 있으면 (종목별로) 전체에 EPS를 더합니다."""
+    diff = _as_float(high) - _as_float(low)
+    return diff + EPS * (diff == 0).any(axis=0)
+
+
+def true_range(high, low, close):
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    # fmax는 NaN을 건너뛰므로 pandas의 max(axis=1, skipna=True)와 같습니다.
+    tr = np.fmax(np.fmax(np.abs(non_zero_range(high, low)), np.abs(high - prev_close)), np.abs(prev_close - low))
+    tr[:1] = np.nan
+    return tr
+
+
+@_accelerated
+def linreg_endpoint(y, length):
+    """
+    롤링 선형회귀 직선의 마지막 점(pandas_ta.linreg)을 닫힌 형태로 계산합니다.
+    x = 1..length 일 때 기울기 m = (n·Σxy − Σx·Σy) / (n·Σx² − (Σx)²), 절편 b = (Σy − m·Σx) / n,
+    끝값 = m·n + b 입니다.
+    """
+    n = length
+    x = np.arange(1, n + 1, dtype=float)
+    x_sum = 0.5 * n * (n + 1)
+    divisor = n * (x_sum * (2 * n + 1) / 3) - x_sum * x_sum
+
+    y_sum = _rolling(y, n, np.sum)
+    xy_sum = _rolling(y, n, lambda w, axis: w @ x)
+    m = (n * xy_sum - x_sum * y_sum) / divisor
+    b = (y_sum - m * x_sum) / n
+    return m * n + b
+
+
+@_accelerated
+def ewm_mean(x, alpha, adjust, min_periods):
+    """pandas의 ewm(alpha, adjust, min_periods).mean()."""
+    x = _as_float(x)
+    values = pd.Series(x) if x.ndim == 1 else pd.DataFrame(x)
+    return values.ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean().to_numpy()
+
+
+def ema(x, span):
+    """시작값 보정 없는 EMA. (pandas의 ewm(span=span, adjust=False).mean())"""
+    return ewm_mean(x, 2 / (span + 1), False, 0)
+
+
+@_accelerated
+def ema_seeded(x, length):
+    """첫 length개의 평균으로 시작하는 EMA(adjust=False). (pandas_ta.ema와 같음, x는 NaN 없이 시작해야 함)"""
+    x = _as_float(x).copy()
+    if x.shape[0] < length:
+        return np.full(x.shape, np.nan)
+    x[length - 1] = np.mean(x[:length], axis=0)
+    x[:length - 1] = np.nan
+    return ewm_mean(x, 2 / (length + 1), False, 0)
+
+
+@_accelerated
+def rsi(close, length):
+    """Wilder RSI. (pandas_ta.rsi와 같음)"""
+    close = _as_float(close)
+    diff = np.diff(close, axis=0, prepend=np.full((1,) + close.shape[1:], np.nan))
+    missing = np.isnan(diff)
+    gain = np.where(missing, np.nan, np.where(diff > 0, diff, 0.0))
+    loss = np.where(missing, np.nan, np.where(diff < 0, -diff, 0.0))
+    avg_gain = ewm_mean(gain, 1 / length, True, length)
+    avg_loss = ewm_mean(loss, 1 / length, True, length)
+    return 100 * avg_gain / (avg_gain + avg_loss)
+
+
+def macd(close, fast, slow, signal):
+    """MACD, 히스토그램, 시그널을 마지막 축에 쌓아 (..., 3) 배열로 반환합니다. (pandas_ta.macd와 같음)"""
+    close = _as_float(close)
+    line = ema_seeded(close, fast) - ema_seeded(close, slow)
+    signal_line = np.full(line.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(line).all(axis=tuple(range(1, line.ndim))))
+    if valid.size:
+        # 시그널은 MACD의 첫 유효값부터 계산합니다.
+        signal_line[valid[0]:] = ema_seeded(line[valid[0]:], signal)
+    return np.stack([line, line - signal_line, signal_line], axis=-1)
+
+
+@_accelerated
+def stoch(high, low, close, k, d, smooth_k):
+    """스토캐스틱 %K/%D를 마지막 축에 쌓아 (..., 2) 배열로 반환합니다. (pandas_ta.stoch와 같음)"""
+    highest, lowest = rolling_max(high, k), rolling_min(low, k)
+    raw = 100 * (_as_float(close) - lowest) / non_zero_range(highest, lowest)
+    smooth = rolling_mean(raw, smooth_k)
+    return np.stack([smooth, rolling_mean(smooth, d)], axis=-1)
+
+
+def bbands_from_parts(close, mid, stdev, std=2.0):
+    """이동평균과 표준편차(ddof=0)로 볼린저 밴드 (하단, 중심, 상단, 밴드폭, %B)를 만듭니다. (pandas_ta.bbands와 같음)"""
+    lower, upper = mid - std * stdev, mid + std * stdev
+    width = non_zero_range(upper, lower)
+    return lower, mid, upper, 100 * width / mid, non_zero_range(close, lower) / width
+
+
+def sma_ribbon(x, periods):
+    """
+    여러 기간의 SMA를 누적합 배열 하나로 한 번에 계산해 (n, len(periods)) 배열로 반환합니다.
+    기간이 늘어나도 누적합은 한 번만 만들고, 각 기간은 누적합의 차이로 구합니다.
+    (정밀도를 위해 첫 값을 뺀 뒤 누적합을 만듭니다. x에 NaN이 없어야 합니다)
+    """
+    x = _as_float(x)
+    periods = np.asarray(periods, dtype=int)
+    n = x.shape[0]
+    if n == 0:
+        return np.empty((0, periods.size))
+    csum = np.concatenate([[0.0], np.cumsum(x - x[0])])
+    end = np.arange(1, n + 1)[:, None]
+    start = end - periods[None, :]
+    out = (csum[end] - csum[np.maximum(start, 0)]) / periods + x[0]
+    out[start < 0] = np.nan
+    return out
+
+
+@_accelerated
+def ema_ribbon(x, periods):
+    """여러 기간의 EMA(adjust=False)를 (n, len(periods)) 배열로 반환합니다. (numba는 한 번의 패스로 계산)"""
+    return np.column_stack([ema(x, p) for p in periods]) if len(periods) else np.empty((len(x), 0))
+
+
+def squeeze_from_parts(close, basis, stdev, ma, rangema, highest, lowest, kc_length=20, kc_mult=1.5):
+    """
+    미리 계산된 중간값(SMA, 표준편차, TR의 SMA, 롤링 최고/최저)으로 스퀴즈 컬럼을 만듭니다.
+
+    Returns:
+        dict: 컬럼 이름 -> 배열 (calculator._calculate_squeeze_momentum과 같은 컬럼)
+    """
+    # 1. 볼린저 밴드 (켈트너 채널 승수 사용)
+    dev = kc_mult * stdev
+    bbu, bbl = basis + dev, basis - dev
+
+    # 2. 켈트너 채널 (True Range의 SMA 사용)
+    kcu, kcl = ma + rangema * kc_mult, ma - rangema * kc_mult
+
+    # 3. 스퀴즈 ON/OFF/NO 조건
+    sqz_on = (bbl > kcl) & (bbu < kcu)
+    sqz_off = (bbl < kcl) & (bbu > kcu)
+
+    # 4. 모멘텀 값 (Linear Regression)
+    mom_source = close - ((highest + lowest) / 2 + ma) / 2
+
+    return {
+        'BBU_LB': bbu,
+        'BBL_LB': bbl,
+        'KCU_LB': kcu,
+        'KCL_LB': kcl,
+        'SQZ_ON_CUSTOM': sqz_on,
+        'SQZ_OFF_CUSTOM': sqz_off,
+        'SQZ_NO_CUSTOM': ~sqz_on & ~sqz_off,
+        'SQZ_VAL_CUSTOM': linreg_endpoint(mom_source, kc_length),
+    }
+
+
+def squeeze_momentum(high, low, close, bb_length=20, kc_length=20, kc_mult=1.5, use_tr=True):
+    """
+    LazyBear Squeeze Momentum을 배열로 계산합니다.
+    bb_length와 kc_length가 같으면 Close의 SMA는 한 번만 계산해 볼린저 기준선,
+    켈트너 중심선, 모멘텀 기준값에 함께 사용합니다.
+    """
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    basis = rolling_mean(close, bb_length)
+    ma = basis if kc_length == bb_length else rolling_mean(close, kc_length)
+    tr = true_range(high, low, close) if use_tr else high - low
+    return squeeze_from_parts(
+        close, basis, rolling_std(close, bb_length, ddof=1), ma, rolling_mean(tr, kc_length),
+        rolling_max(high, kc_length), rolling_min(low, kc_length), kc_length=kc_length, kc_mult=kc_mult)
+
+
+if __name__ == "__main__":
+    # 기존 pandas_ta 구현과의 일치 여부 확인 및 백엔드별 속도 비교 (python -m core.kernels)
+    import time
+    import pandas_ta as ta
+
+    rng = np.random.default_rng(0)
+    n = 2000
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    h = c * (1 + np.abs(rng.normal(0, 0.01, n)))
+    l = c * (1 - np.abs(rng.normal(0, 0.01, n)))
+    df = pd.DataFrame({'High': h, 'Low': l, 'Close': c})
+
+    def assert_close(expected, actual, label):
+        assert np.allclose(np.asarray(expected, dtype=float), np.asarray(actual, dtype=float),
+                           rtol=1e-9, atol=1e-9, equal_nan=True), label
+
+    def reference(df, bb_length=20, kc_length=20, kc_mult=1.5, use_tr=True):
+        out = {}
+        basis = ta.sma(df['Close'], length=bb_length)
+        dev = kc_mult * ta.stdev(df['Close'], length=bb_length)
+        out['BBU_LB'], out['BBL_LB'] = basis + dev, basis - dev
+        ma = ta.sma(df['Close'], length=kc_length)
+        tr = ta.true_range(df['High'], df['Low'], df['Close']) if use_tr else (df['High'] - df['Low'])
+        rangema = ta.sma(tr, length=kc_length)
+        out['KCU_LB'], out['KCL_LB'] = ma + rangema * kc_mult, ma - rangema * kc_mult
+        out['SQZ_ON_CUSTOM'] = (out['BBL_LB'] > out['KCL_LB']) & (out['BBU_LB'] < out['KCU_LB'])
+        out['SQZ_OFF_CUSTOM'] = (out['BBL_LB'] < out['KCL_LB']) & (out['BBU_LB'] > out['KCU_LB'])
+        out['SQZ_NO_CUSTOM'] = ~out['SQZ_ON_CUSTOM'] & ~out['SQZ_OFF_CUSTOM']
+        mom = df['Close'] - ((df['High'].rolling(kc_length).max() + df['Low'].rolling(kc_length).min()) / 2 + ma) / 2
+        out['SQZ_VAL_CUSTOM'] = ta.linreg(close=mom, length=kc_length)
+        return out
+
+    backends = ['numpy'] + (['numba'] if numba_kernels is not None else [])
+    for backend in backends:
+        set_backend(backend)
+        for params in [{}, {'kc_length': 14, 'kc_mult': 2.0}, {'use_tr': False}]:
+            expected = reference(df, **params)
+            actual = squeeze_momentum(df['High'], df['Low'], df['Close'], **params)
+            for col, values in expected.items():
+                assert_close(values, actual[col], (backend, params, col))
+
+        assert_close(df['Close'].ewm(span=200, adjust=False).mean(), ema(c, 200), (backend, 'ema'))
+        assert_close(ta.ema(df['Close'], length=12), ema_seeded(c, 12), (backend, 'ema_seeded'))
+        assert_close(ta.rsi(df['Close'], length=14), rsi(c, 14), (backend, 'rsi'))
+        assert_close(ta.macd(df['Close'], fast=12, slow=26, signal=9), macd(c, 12, 26, 9), (backend, 'macd'))
+        assert_close(ta.stoch(df['High'], df['Low'], df['Close'], k=14, d=3, smooth_k=3).reindex(df.index),
+                     stoch(h, l, c, 14, 3, 3), (backend, 'stoch'))
+        assert_close(ta.linreg(df['Close'], length=20), linreg_endpoint(c, 20), (backend, 'linreg'))
+        periods = np.arange(5, 205, 10)
+        assert_close(np.column_stack([df['Close'].rolling(p).mean() for p in periods]), sma_ribbon(c, periods),
+                     (backend, 'sma_ribbon'))
+        assert_close(np.column_stack([df['Close'].ewm(span=p, adjust=False).mean() for p in periods]),
+                     ema_ribbon(c, periods), (backend, 'ema_ribbon'))
+        print(f"{backend}: parity OK")
+
+    # 벤치마크: 10,000봉 x 500종목에 EMA, RSI, 스토캐스틱, 선형회귀 계산
+    bars, tickers = 10_000, 500
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (tickers, bars)), axis=1))
+    highs = closes * (1 + np.abs(rng.normal(0, 0.01, (tickers, bars))))
+    lows = closes * (1 - np.abs(rng.normal(0, 0.01, (tickers, bars))))
+    timings = {}
+    for backend in backends:
+        set_backend(backend)
+        ema(closes[0], 200), rsi(closes[0], 14), stoch(highs[0], lows[0], closes[0], 14, 3, 3)  # JIT 컴파일 제외
+        t0 = time.perf_counter()
+        for hi, lo, cl in zip(highs, lows, closes):
+            ema(cl, 200)
+            rsi(cl, 14)
+            stoch(hi, lo, cl, 14, 3, 3)
+            linreg_endpoint(cl, 20)
+        timings[backend] = time.perf_counter() - t0
+        print(f"{backend}: {bars:,} bars x {tickers} tickers in {timings[backend]:.2f}s")
+    if len(timings) == 2:
+        print(f"numba speedup: {timings['numpy'] / timings['numba']:.1f}x")
@@ -0,0 +1,201 @@
+"""
+Numba로 컴파일하는 재귀/윈도우 지표 커널.
+
+numba가 설치되어 있을 때만 core.kernels가 이 모듈을 불러 사용합니다.
+(없으면 kernels의 NumPy/pandas 경로를 사용합니다)
+각 함수는 kernels의 같은 이름 함수와 같은 결과를 1차원 float64 배열로 반환합니다.
+"""
+import math
+import sys
+
+import numpy as np
+from numba import njit
+
+EPS = sys.float_info.epsilon
+
+
+@njit(cache=True)
+def ewm_mean(x, alpha, adjust, min_periods):
+    """pandas의 ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean() 재귀식 (ignore_na=False)."""
+    n = x.shape[0]
+    out = np.empty(n)
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    weighted = np.nan
+    old_wt = 1.0
+    nobs = 0
+    for i in range(n):
+        cur = x[i]
+        is_observation = not math.isnan(cur)
+        if is_observation:
+            nobs += 1
+        if not math.isnan(weighted):
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                if adjust:
+                    old_wt += new_wt
+                else:
+                    old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= max(min_periods, 1) else np.nan
+    return out
+
+
+@njit(cache=True)
+def ema_seeded(x, length):
+    """첫 length개의 평균으로 시작하는 EMA(adjust=False). (pandas_ta.ema와 같음, x는 NaN 없이 시작해야 함)"""
+    n = x.shape[0]
+    if n < length:
+        return np.full(n, np.nan)
+    seeded = x.copy()
+    seeded[:length - 1] = np.nan
+    seeded[length - 1] = np.mean(x[:length])
+    return ewm_mean(seeded, 2.0 / (length + 1), False, 0)
+
+
+@njit(cache=True)
+def rsi(close, length):
+    n = close.shape[0]
+    gain = np.full(n, np.nan)
+    loss = np.full(n, np.nan)
+    for i in range(1, n):
+        diff = close[i] - close[i - 1]
+        if math.isnan(diff):
+            continue
+        gain[i] = diff if diff > 0 else 0.0
+        loss[i] = -diff if diff < 0 else 0.0
+    avg_gain = ewm_mean(gain, 1.0 / length, True, length)
+    avg_loss = ewm_mean(loss, 1.0 / length, True, length)
+    return 100.0 * avg_gain / (avg_gain + avg_loss)
+
+
+@njit(cache=True)
+def rolling_extrema(x, length):
+    """길이 length 윈도우의 최댓값/최솟값. 윈도우에 NaN이 있으면 NaN."""
+    n = x.shape[0]
+    highest = np.full(n, np.nan)
+    lowest = np.full(n, np.nan)
+    for i in range(length - 1, n):
+        hi = -np.inf
+        lo = np.inf
+        valid = True
+        for j in range(i - length + 1, i + 1):
+            v = x[j]
+            if math.isnan(v):
+                valid = False
+                break
+            if v > hi:
+                hi = v
+            if v < lo:
+                lo = v
+        if valid:
+            highest[i] = hi
+            lowest[i] = lo
+    return highest, lowest
+
+
+@njit(cache=True)
+def rolling_mean(x, length):
+    """윈도우 합을 밀어가며 계산하는 이동평균. 윈도우에 NaN이 있으면 NaN."""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    nans = 0
+    for i in range(n):
+        v = x[i]
+        if math.isnan(v):
+            nans += 1
+        else:
+            total += v
+        if i >= length:
+            old = x[i - length]
+            if math.isnan(old):
+                nans -= 1
+            else:
+                total -= old
+        if i >= length - 1 and nans == 0:
+            out[i] = total / length
+    return out
+
+
+@njit(cache=True)
+def linreg_endpoint(y, length):
+    """롤링 선형회귀 끝값. Σy와 Σxy를 한 봉씩 밀어가며 갱신합니다. (Σxy는 Σxy − Σy + n·y_new)"""
+    n = y.shape[0]
+    out = np.full(n, np.nan)
+    x_sum = 0.5 * length * (length + 1)
+    divisor = length * (x_sum * (2 * length + 1) / 3) - x_sum * x_sum
+    y_sum = 0.0
+    xy_sum = 0.0
+    run = 0  # 연속으로 유효한 값의 개수
+    for i in range(n):
+        v = y[i]
+        if math.isnan(v):
+            run = 0
+            y_sum = 0.0
+            xy_sum = 0.0
+            continue
+        run += 1
+        if run <= length:
+            y_sum += v
+            xy_sum += run * v
+            if run < length:
+                continue
+        else:
+            xy_sum += length * v - y_sum
+            y_sum += v - y[i - length]
+        if run > length and run % length == 0:
+            # 누적 오차를 막기 위해 주기적으로 윈도우 합을 다시 계산합니다.
+            y_sum = 0.0
+            xy_sum = 0.0
+            for k in range(length):
+                w = y[i - length + 1 + k]
+                y_sum += w
+                xy_sum += (k + 1) * w
+        m = (length * xy_sum - x_sum * y_sum) / divisor
+        b = (y_sum - m * x_sum) / length
+        out[i] = m * length + b
+    return out
+
+
+@njit(cache=True)
+def stoch(high, low, close, k, d, smooth_k):
+    """스토캐스틱 %K/%D를 (n, 2) 배열로 반환합니다."""
+    highest, _ = rolling_extrema(high, k)
+    _, lowest = rolling_extrema(low, k)
+    width = highest - lowest
+    if np.any(width == 0):
+        width += EPS
+    raw = 100.0 * (close - lowest) / width
+    out = np.empty((close.shape[0], 2))
+    out[:, 0] = rolling_mean(raw, smooth_k)
+    out[:, 1] = rolling_mean(out[:, 0].copy(), d)
+    return out
+
+
+@njit(cache=True)
+def ema_ribbon(x, periods):
+    """여러 기간의 EMA(adjust=False)를 시간축 한 번의 패스로 함께 계산합니다. (ewm_mean과 같은 재귀식)"""
+    n = x.shape[0]
+    k = periods.shape[0]
+    out = np.empty((n, k))
+    alpha = 2.0 / (periods + 1.0)
+    weighted = np.full(k, np.nan)
+    old_wt = np.ones(k)
+    for i in range(n):
+        cur = x[i]
+        is_observation = not math.isnan(cur)
+        for j in range(k):
+            if not math.isnan(weighted[j]):
+                old_wt[j] *= 1.0 - alpha[j]
+                if is_observation:
+                    if weighted[j] != cur:
+                        weighted[j] = (old_wt[j] * weighted[j] + alpha[j] * cur) / (old_wt[j] + alpha[j])
+                    old_wt[j] = 1.0
+            elif is_observation:
+                weighted[j] = cur
+            out[i, j] = weighted[j]
+    return out
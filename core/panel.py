@@ -0,0 +1,166 @@
+"""
+여러 종목의 보조지표를 한 번에 계산하는 (날짜 x 티커) 패널.
+
+각 종목의 OHLCV를 날짜 합집합 기준의 2차원 배열로 정렬하고, 모든 지표를
+시간축(0번 축) 벡터 연산으로 종목 전체에 대해 한 번에 계산합니다.
+
+상장일이 다르거나 휴장일이 달라 봉이 없는 칸은 mask가 False입니다.
+지표는 종목별로 실제 봉만 위로 모은 배열에서 계산한 뒤 원래 날짜 위치로 되돌리므로,
+한국/미국 종목처럼 거래일이 다른 종목이 섞여 있어도 단일 종목 계산과 같은 값이 나옵니다.
+봉이 없는 칸의 결과는 NaN(불리언은 False)입니다.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from core import kernels
+
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class Panel:
+    """날짜 x 티커로 정렬된 OHLCV 배열 묶음과 그 위의 지표 계산."""
+
+    def __init__(self, dates, tickers, fields):
+        """
+        Args:
+            dates: 날짜 인덱스 (길이 n)
+            tickers: 티커 목록 (길이 k)
+            fields: 필드 이름 -> (n, k) float 배열. 봉이 없는 칸은 NaN
+        """
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.fields = fields
+        self.mask = np.all([~np.isnan(fields[f]) for f in ['Open', 'High', 'Low', 'Close']], axis=0)
+        # 종목별로 봉이 있는 칸을 위로 모으는 순서 (안정 정렬이라 봉 순서는 유지됨)
+        self._order = np.argsort(~self.mask, axis=0, kind='stable')
+        self._bars = {}
+        self._fingerprint = None
+
+    @classmethod
+    def from_frames(cls, frames):
+        """티커 -> OHLCV DataFrame 딕셔너리에서 날짜 합집합 기준으로 정렬된 패널을 만듭니다."""
+        frames = {t: f for t, f in frames.items() if f is not None and not f.empty}
+        if not frames:
+            return cls(pd.DatetimeIndex([]), [], {f: np.empty((0, 0)) for f in PANEL_FIELDS})
+        wide = pd.concat({t: f[PANEL_FIELDS] for t, f in frames.items()}, axis=1).sort_index()
+        tickers = list(frames)
+        fields = {f: wide.xs(f, axis=1, level=1)[tickers].to_numpy(dtype=float) for f in PANEL_FIELDS}
+        return cls(wide.index, tickers, fields)
+
+    @property
+    def fingerprint(self):
+        """티커, 날짜, OHLCV 값 전체의 해시. 내용이 같은 패널이면 같은 값입니다. (결과 캐시 키)"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(repr(self.tickers).encode())
+            digest.update(self.dates.asi8.tobytes())
+            for field in PANEL_FIELDS:
+                digest.update(np.ascontiguousarray(self.fields[field]).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @property
+    def bar_counts(self):
+        """종목별 실제 봉 개수."""
+        return pd.Series(self.mask.sum(axis=0), index=self.tickers)
+
+    # --- 봉 축 <-> 날짜 축 변환 ---
+
+    def bars(self, field):
+        """종목별로 실제 봉만 위로 모은 (n, k) 배열. 아래쪽 남는 칸은 NaN입니다."""
+        if field not in self._bars:
+            self._bars[field] = np.take_along_axis(self.fields[field], self._order, axis=0)
+        return self._bars[field]
+
+    def bar_dates(self):
+        """bars() 배열 각 칸의 날짜. 아래쪽 남는 칸은 NaT입니다."""
+        dates = self.dates.values[self._order]
+        dates[np.arange(len(self.dates))[:, None] >= self.mask.sum(axis=0)] = np.datetime64('NaT')
+        return dates
+
+    def to_dates(self, values):
+        """bars() 기준으로 계산한 배열을 원래 날짜 위치로 되돌립니다."""
+        out = np.empty_like(values)
+        np.put_along_axis(out, self._order, values, axis=0)
+        out[~self.mask] = False if out.dtype == bool else np.nan
+        return out
+
+    def apply(self, func, *fields, **params):
+        """func(봉 축 배열들, **params)를 종목별 실제 봉 순서로 계산하고 날짜 축으로 되돌립니다."""
+        result = func(*(self.bars(f) for f in fields), **params)
+        if isinstance(result, dict):
+            return {name: self.to_dates(v) for name, v in result.items()}
+        return self.to_dates(result)
+
+    # --- 지표 (모두 (n, k) 배열 또는 그 묶음을 반환) ---
+
+    def sma(self, period):
+        return self.apply(kernels.rolling_mean, 'Close', length=period)
+
+    def ema(self, period):
+        return self.apply(kernels.ema, 'Close', span=period)
+
+    def rsi(self, length=14):
+        return self.apply(kernels.rsi, 'Close', length=length)
+
+    def macd(self, fast=12, slow=26, signal=9):
+        """{'macd', 'histogram', 'signal'} 배열 딕셔너리."""
+        values = kernels.macd(self.bars('Close'), fast, slow, signal)
+        return {name: self.to_dates(values[..., i]) for i, name in enumerate(['macd', 'histogram', 'signal'])}
+
+    def bbands(self, length=20, std=2.0):
+        """{'lower', 'mid', 'upper', 'bandwidth', 'percent'} 배열 딕셔너리."""
+        close = self.bars('Close')
+        parts = kernels.bbands_from_parts(close, kernels.rolling_mean(close, length),
+                                          kernels.rolling_std(close, length, ddof=0), std)
+        return {name: self.to_dates(v) for name, v in zip(['lower', 'mid', 'upper', 'bandwidth', 'percent'], parts)}
+
+    def squeeze(self, bb_length=20, kc_length=20, kc_mult=1.5, use_tr=True):
+        """kernels.squeeze_momentum과 같은 컬럼 이름의 배열 딕셔너리."""
+        return self.apply(kernels.squeeze_momentum, 'High', 'Low', 'Close',
+                           bb_length=bb_length, kc_length=kc_length, kc_mult=kc_mult, use_tr=use_tr)
+
+    # --- 결과 정리 ---
+
+    def latest(self, values):
+        """종목별 마지막 실제 봉의 값을 티커 인덱스 Series로 반환합니다. (봉이 없는 종목은 NaN/False)"""
+        missing = False if values.dtype == bool else np.nan
+        if not len(self.dates):
+            return pd.Series(missing, index=self.tickers, dtype=values.dtype)
+        last = len(self.dates) - 1 - np.argmax(self.mask[::-1], axis=0)
+        picked = values[last, np.arange(len(self.tickers))]
+        return pd.Series(np.where(self.mask.any(axis=0), picked, missing), index=self.tickers)
+
+    def tail(self, values, n):
+        """
+        종목별 마지막 n개 실제 봉의 값을 (n, k) 배열로 모읍니다. (마지막 행이 최신 봉)
+        봉이 n개보다 적은 종목의 앞쪽 칸은 NaN(불리언은 False)입니다.
+        """
+        k = len(self.tickers)
+        position = np.arange(n)[:, None] + self.mask.sum(axis=0) - n  # 봉 축 위치
+        available = position >= 0
+        rows = self._order[np.clip(position, 0, None), np.arange(k)]
+        picked = values[rows, np.arange(k)]
+        return np.where(available, picked, False if values.dtype == bool else np.nan)
+
+    def last_date(self, flags):
+        """종목별로 flags가 True였던 마지막 날짜를 티커 인덱스 Series로 반환합니다. (없으면 NaT)"""
+        if not len(self.dates):
+            return pd.Series(pd.NaT, index=self.tickers)
+        last = len(self.dates) - 1 - np.argmax(flags[::-1], axis=0)
+        return pd.Series(self.dates[last], index=self.tickers).where(flags.any(axis=0))
+
+    def bars_since(self, flags):
+        """종목별로 flags가 마지막으로 True였던 봉부터 마지막 실제 봉까지의 봉 수. (없으면 NaN)"""
+        if not len(self.dates):
+            return pd.Series(np.nan, index=self.tickers)
+        counts = np.cumsum(self.mask, axis=0)
+        last = len(self.dates) - 1 - np.argmax(flags[::-1], axis=0)
+        since = self.mask.sum(axis=0) - counts[last, np.arange(len(self.tickers))]
+        return pd.Series(np.where(flags.any(axis=0), since, np.nan), index=self.tickers)
+
+    def frame(self, values):
+        """(n, k) 배열을 날짜 x 티커 DataFrame으로 감쌉니다."""
+        return pd.DataFrame(values, index=self.dates, columns=self.tickers)
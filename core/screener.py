@@ -0,0 +1,293 @@
+"""
+조건식으로 종목을 거르는 스크리너.
+
+`close > MA200 and RSI_14 < 30 and SQZ_ON` 같은 조건식을 파이썬 ast로 파싱한 뒤,
+허용된 노드만으로 이루어진 함수 트리로 한 번 컴파일합니다. 컴파일된 조건식은
+패널의 (최근 봉 x 종목) 배열 위에서 NumPy 연산으로 한 번에 평가되므로 종목별 eval이 없습니다.
+
+지원 문법:
+- 논리: and, or, not (대문자 AND/OR/NOT도 가능)
+- 비교: > >= < <= == != (연쇄 비교 30 < RSI_14 < 70 가능)
+- 산술: + - * / 와 괄호, 숫자, True/False
+- 이름: open/high/low/close/volume, MA200(MA_200), EMA20, RSI_14(RSI), MACD, MACD_SIGNAL, MACD_HIST,
+        BBU, BBM, BBL, BB_WIDTH, BB_PERCENT, SQZ_ON, SQZ_OFF, SQZ_NO, SQZ_VAL, SQZ_BUY, SQZ_SELL,
+        BULL_DIV, BEAR_DIV (대소문자 무관)
+- 함수: prev(x, n), change(x, n), crossed_above(a, b), crossed_below(a, b), abs(x), min(a, b), max(a, b)
+
+컴파일 결과와 스크린 결과는 캐시됩니다. 결과 캐시 키는 패널 내용의 해시(Panel.fingerprint)이므로
+데이터가 바뀌지 않은 패널에 같은 조건식을 다시 실행하면 계산 없이 바로 반환됩니다.
+"""
+import ast
+import functools
+import operator
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from core import calculator, signals
+
+RESULT_CACHE_SIZE = 64
+MATCH_MODES = ('latest', 'any', 'all')  # 마지막 봉 / 최근 봉 중 하나라도 / 최근 봉 모두
+
+Query = namedtuple('Query', ['source', 'evaluate', 'names', 'lag'])
+
+_COMPARE_OPS = {ast.Gt: operator.gt, ast.GtE: operator.ge, ast.Lt: operator.lt, ast.LtE: operator.le,
+                ast.Eq: operator.eq, ast.NotEq: operator.ne}
+_BINARY_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_KEYWORDS = re.compile(r'\b(AND|OR|NOT|TRUE|FALSE)\b')
+
+
+# --- 이름 -> 패널 배열 ---
+
+def _squeeze(panel, m):
+    return panel.apply(signals.squeeze_with_signals, 'High', 'Low', 'Close')
+
+
+def _divergence(panel, m):
+    return panel.apply(signals.rsi_divergence_signals, 'High', 'Low', 'Close')
+
+
+# (정규식, 계산 묶음 키, 계산 함수(panel, m), 선택 함수(결과, m)):
+# 같은 묶음 키의 이름들(SQZ_ON, SQZ_VAL 등)은 계산 함수를 한 번만 호출하고 결과에서 골라 씁니다.
+_NAME_RULES = [
+    (r'(OPEN|HIGH|LOW|CLOSE|VOLUME)', lambda m: ('FIELD', m[1]),
+     lambda p, m: p.fields[m[1].capitalize()], None),
+    (r'(?:MA|SMA)_?(\d+)', lambda m: ('SMA', int(m[1])), lambda p, m: p.sma(int(m[1])), None),
+    (r'EMA_?(\d+)', lambda m: ('EMA', int(m[1])), lambda p, m: p.ema(int(m[1])), None),
+    (r'RSI(?:_?(\d+))?', lambda m: ('RSI', int(m[1] or 14)), lambda p, m: p.rsi(int(m[1] or 14)), None),
+    (r'MACD(?:_12_26_9)?', lambda m: ('MACD',), lambda p, m: p.macd(), lambda r, m: r['macd']),
+    (r'MACD_?(?:SIGNAL|S)(?:_12_26_9)?', lambda m: ('MACD',), lambda p, m: p.macd(), lambda r, m: r['signal']),
+    (r'MACD_?(?:HIST|H)(?:_12_26_9)?', lambda m: ('MACD',), lambda p, m: p.macd(), lambda r, m: r['histogram']),
+    (r'BB(U|M|L)', lambda m: ('BBANDS',), lambda p, m: p.bbands(),
+     lambda r, m: r[{'U': 'upper', 'M': 'mid', 'L': 'lower'}[m[1]]]),
+    (r'BB_?(WIDTH|PERCENT)', lambda m: ('BBANDS',), lambda p, m: p.bbands(),
+     lambda r, m: r['bandwidth' if m[1] == 'WIDTH' else 'percent']),
+    (r'SQZ_(ON|OFF|NO)(?:_CUSTOM)?', lambda m: ('SQUEEZE',), _squeeze, lambda r, m: r[f'SQZ_{m[1]}_CUSTOM']),
+    (r'SQZ_(?:VAL|MOM)(?:_CUSTOM)?', lambda m: ('SQUEEZE',), _squeeze, lambda r, m: r['SQZ_VAL_CUSTOM']),
+    (r'SQZ_(BUY|SELL)', lambda m: ('SQUEEZE',), _squeeze, lambda r, m: r[f'SQZ_{m[1]}']),
+    (r'(BULL|BEAR)_DIV', lambda m: ('DIVERGENCE',), _divergence, lambda r, m: r[f'{m[1]}_DIV_CONFIRMED']),
+]
+_NAME_RULES = [(re.compile(pattern + r'$'), *rest) for pattern, *rest in _NAME_RULES]
+
+
+def _match_name(name):
+    for pattern, group, compute, select in _NAME_RULES:
+        m = pattern.match(name.upper())
+        if m:
+            return m, group, compute, select
+    raise ValueError(f"알 수 없는 이름: {name}")
+
+
+class _Resolver:
+    """조건식의 이름을 패널의 (날짜 x 종목) 배열로 바꿉니다. 같은 계산 묶음은 한 번만 계산합니다."""
+
+    def __init__(self, panel):
+        self.panel = panel
+        self._groups = {}
+
+    def __call__(self, name):
+        m, group, compute, select = _match_name(name)
+        key = group(m)
+        if key not in self._groups:
+            self._groups[key] = compute(self.panel, m)
+        return select(self._groups[key], m) if select else self._groups[key]
+
+
+# --- 컴파일 ---
+
+def _normalize(source):
+    return ' '.join(_KEYWORDS.sub(lambda m: m[1].lower() if m[1] in ('AND', 'OR', 'NOT') else m[1].capitalize(),
+                                  source.strip()).split())
+
+
+def _lag_arg(node, func):
+    if len(node.args) == 1:
+        return 1
+    arg = node.args[1]
+    if not (isinstance(arg, ast.Constant) and isinstance(arg.value, int) and arg.value >= 1):
+        raise ValueError(f"{func}()의 두 번째 인자는 1 이상의 정수여야 합니다.")
+    return arg.value
+
+
+def _truth(values):
+    """논리 연산용 불리언 배열. 숫자는 0이 아니면 True, NaN은 False입니다."""
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    return np.nan_to_num(values.astype(float), nan=0.0) != 0
+
+
+def _compile_node(node, names):
+    """ast 노드를 (함수(env) -> 배열, 필요한 과거 봉 수)로 바꿉니다. 허용되지 않은 노드는 ValueError."""
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, names)
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, names) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return (lambda env: functools.reduce(combine, (_truth(f(env)) for f, _ in parts)),
+                max(lag for _, lag in parts))
+
+    if isinstance(node, ast.UnaryOp):
+        inner, lag = _compile_node(node.operand, names)
+        if isinstance(node.op, ast.Not):
+            return (lambda env: np.logical_not(_truth(inner(env)))), lag
+        if isinstance(node.op, ast.USub):
+            return (lambda env: -np.asarray(inner(env), dtype=float)), lag
+        if isinstance(node.op, ast.UAdd):
+            return inner, lag
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _BINARY_OPS[type(node.op)]
+        (left, l_lag), (right, r_lag) = _compile_node(node.left, names), _compile_node(node.right, names)
+
+        def binary(env):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return op(np.asarray(left(env), dtype=float), np.asarray(right(env), dtype=float))
+        return binary, max(l_lag, r_lag)
+
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPS for op in node.ops):
+        operands = [_compile_node(n, names) for n in [node.left] + node.comparators]
+        ops = [_COMPARE_OPS[type(op)] for op in node.ops]
+
+        def compare(env):
+            values = [f(env) for f, _ in operands]
+            return functools.reduce(np.logical_and, (op(a, b) for op, a, b in zip(ops, values, values[1:])))
+        return compare, max(lag for _, lag in operands)
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, bool)):
+        value = node.value
+        return (lambda env: value), 0
+
+    if isinstance(node, ast.Name):
+        _match_name(node.id)  # 알 수 없는 이름은 컴파일 시점에 오류
+        names.append(node.id)
+        name = node.id
+        return (lambda env: env(name)), 0
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        return _compile_call(node, names)
+
+    raise ValueError(f"지원하지 않는 문법: {ast.unparse(node)}")
+
+
+def _compile_call(node, names):
+    func = node.func.id.lower()
+    arity = {'prev': (1, 2), 'change': (1, 2), 'abs': (1, 1), 'min': (2, 2), 'max': (2, 2),
+             'crossed_above': (2, 2), 'crossed_below': (2, 2)}
+    if func not in arity:
+        raise ValueError(f"알 수 없는 함수: {node.func.id}")
+    low, high = arity[func]
+    if not low <= len(node.args) <= high:
+        raise ValueError(f"{func}()의 인자 개수가 맞지 않습니다.")
+
+    if func in ('prev', 'change'):
+        n = _lag_arg(node, func)
+        inner, lag = _compile_node(node.args[0], names)
+
+        def shifted(env):
+            return signals._shift(np.asarray(inner(env), dtype=float), n, np.nan)
+        if func == 'prev':
+            return shifted, lag + n
+        return (lambda env: np.asarray(inner(env), dtype=float) / shifted(env) - 1.0), lag + n
+
+    args = [_compile_node(a, names) for a in node.args]
+    lag = max(l for _, l in args)
+    if func == 'abs':
+        return (lambda env: np.abs(args[0][0](env))), lag
+    if func in ('min', 'max'):
+        reduce = np.fmin if func == 'min' else np.fmax
+        return (lambda env: reduce(args[0][0](env), args[1][0](env))), lag
+
+    def crossed(env):
+        a = np.asarray(args[0][0](env), dtype=float)
+        b = np.asarray(args[1][0](env), dtype=float)
+        a, b = np.broadcast_arrays(a, b)
+        sig = signals.ma_cross_signals(a, b)
+        return sig['GOLDEN_CROSS' if func == 'crossed_above' else 'DEAD_CROSS']
+    return crossed, lag + 1
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(source):
+    """
+    조건식 문자열을 Query로 컴파일합니다. (같은 문자열은 한 번만 컴파일)
+
+    Returns:
+        Query: source(정규화된 식), evaluate(env -> 배열), names(참조한 이름), lag(필요한 과거 봉 수)
+
+    Raises:
+        ValueError: 문법 오류, 알 수 없는 이름/함수, 허용되지 않은 문법
+    """
+    normalized = _normalize(source)
+    if not normalized:
+        raise ValueError("조건식이 비어 있습니다.")
+    try:
+        tree = ast.parse(normalized, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"조건식 문법 오류: {e.msg}") from None
+    names = []
+    evaluate, lag = _compile_node(tree, names)
+    return Query(normalized, evaluate, tuple(dict.fromkeys(names)), lag)
+
+
+# --- 실행 ---
+
+_results = calculator.IndicatorCache(maxsize=RESULT_CACHE_SIZE)
+
+
+def screen(panel, rule, lookback=1, match='latest', rank_by=None, ascending=False):
+    """
+    패널의 모든 종목에 조건식을 적용해 통과한 종목 표를 반환합니다.
+
+    Args:
+        panel: core.panel.Panel
+        rule: 조건식 문자열
+        lookback: 평가할 최근 봉 수 (match가 'any'/'all'일 때 의미 있음)
+        match: 'latest'(마지막 봉), 'any'(최근 lookback봉 중 하나라도), 'all'(최근 lookback봉 모두)
+        rank_by: 정렬 기준 식 (예: 'RSI_14', 'close / MA200'). 없으면 티커 순
+        ascending: 오름차순 정렬 여부
+
+    Returns:
+        DataFrame: 티커 인덱스, Close, (Matched Bars), Rank, 조건식에 쓰인 이름별 최신 값 컬럼
+    """
+    if match not in MATCH_MODES:
+        raise ValueError(f"알 수 없는 match: {match}")
+    lookback = 1 if match == 'latest' else max(1, int(lookback))
+    query = compile_query(rule)
+    ranker = compile_query(rank_by) if rank_by else None
+
+    key = (panel.fingerprint, query.source, lookback, match, ranker.source if ranker else None, ascending)
+    cached = _results.get(key)
+    if cached is not None:
+        return cached.copy()
+
+    resolver = _Resolver(panel)
+    rows = lookback + max(query.lag, ranker.lag if ranker else 0)
+    tails = {}
+
+    def env(name):
+        if name not in tails:
+            tails[name] = panel.tail(resolver(name), rows)
+        return tails[name]
+
+    passed = np.broadcast_to(_truth(query.evaluate(env)), (rows, len(panel.tickers)))[-lookback:]
+    matched = passed[-1] if match == 'latest' else passed.any(axis=0) if match == 'any' else passed.all(axis=0)
+    # 봉이 lookback개보다 적은 종목은 'all' 조건을 만족한 것으로 보지 않습니다.
+    matched = matched & (panel.bar_counts.to_numpy() >= lookback)
+
+    columns = {'Close': panel.tail(panel.fields['Close'], 1)[0]}
+    if match != 'latest':
+        columns['Matched Bars'] = passed.sum(axis=0)
+    if ranker:
+        columns['Rank'] = np.broadcast_to(np.asarray(ranker.evaluate(env), dtype=float),
+                                          (rows, len(panel.tickers)))[-1]
+    for name in query.names:
+        if name.upper() != 'CLOSE':
+            columns[name] = env(name)[-1]
+    table = pd.DataFrame(columns, index=pd.Index(panel.tickers, name='Ticker'))[matched]
+    table = table.sort_values('Rank', ascending=ascending) if ranker else table.sort_index()
+    _results.put(key, table)
+    return table.copy()
@@ -0,0 +1,207 @@
+"""
+보조지표 기반 매매 신호.
+
+신호는 지표 배열(시간축이 0번 축)에서 계산하므로 단일 종목(1차원)과
+패널(봉 x 종목, 2차원) 모두에 같은 함수를 사용합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from core import kernels
+
+SIGNAL_ORDER = {'BUY': 0, 'SELL': 1, '': 2}  # 스캐너 표 기본 정렬 순서
+DIVERGENCE_ORDER = {'BULL': 0, 'BEAR': 1, '': 2}
+RECENT_BARS = 5  # 다이버전스 스캔에서 '현재 신호'로 보는 확정 후 경과 봉 수
+
+
+def _previous(values, fill):
+    """한 봉 전 값 (첫 봉은 fill)."""
+    prev = np.empty_like(values)
+    prev[:1] = fill
+    prev[1:] = values[:-1]
+    return prev
+
+
+def _shift(values, periods, fill):
+    """시간축으로 periods만큼 민 배열. 양수면 과거 값(t - periods), 음수면 미래 값(t + |periods|)입니다."""
+    out = np.full_like(values, fill)
+    if periods > 0:
+        out[periods:] = values[:-periods]
+    elif periods < 0:
+        out[:periods] = values[-periods:]
+    else:
+        out[:] = values
+    return out
+
+
+def _previous_flagged(flags, values):
+    """
+    각 봉에서 그 이전(자기 자신 제외)의 마지막 flags 봉의 값과 거리(봉 수)를 반환합니다.
+    마지막 flags 위치를 np.maximum.accumulate로 앞으로 채워 찾습니다. (없으면 NaN)
+    """
+    rows = np.arange(flags.shape[0]).reshape((-1,) + (1,) * (flags.ndim - 1))
+    last = np.maximum.accumulate(np.where(flags, rows, -1), axis=0)
+    prev = _shift(last, 1, -1)
+    value = np.take_along_axis(np.asarray(values, dtype=float), np.maximum(prev, 0), axis=0)
+    found = prev >= 0
+    return np.where(found, value, np.nan), np.where(found, rows - prev, -1)
+
+
+def swing_points(values, left=5, right=5):
+    """
+    스윙 저점/고점(피벗)을 찾습니다. 왼쪽 left개, 오른쪽 right개 봉을 포함한 윈도우의
+    최솟값(최댓값)과 같은 봉이 저점(고점)입니다. 윈도우 최솟값/최댓값은 롤링 min/max를
+    right만큼 앞으로 당겨 계산하므로 반복문이 없습니다.
+    피벗은 right개 봉이 더 지나야 확정됩니다. (마지막 right개 봉은 항상 False)
+
+    Returns:
+        tuple: (저점 불리언 배열, 고점 불리언 배열) - 피벗 봉 위치에 True
+    """
+    values = np.asarray(values, dtype=float)
+    length = left + right + 1
+    lowest = _shift(kernels.rolling_min(values, length), -right, np.nan)
+    highest = _shift(kernels.rolling_max(values, length), -right, np.nan)
+    return values == lowest, values == highest
+
+
+def rsi_divergence(high, low, rsi, left=5, right=5, min_range=5, max_range=60):
+    """
+    RSI 다이버전스를 찾습니다. (TradingView 기본 RSI Divergence 지표와 같은 규칙)
+    RSI의 스윙 저점/고점을 찾고, 직전 스윙과의 간격이 min_range~max_range 봉일 때
+    - 상승 다이버전스: RSI는 직전 저점보다 높은 저점, 가격(Low)은 직전 저점보다 낮은 저점
+    - 하락 다이버전스: RSI는 직전 고점보다 낮은 고점, 가격(High)은 직전 고점보다 높은 고점
+
+    Returns:
+        dict: 'RSI_PIVOT_LOW', 'RSI_PIVOT_HIGH', 'BULL_DIV', 'BEAR_DIV'(피벗 봉 위치, 차트 표시용),
+              'BULL_DIV_CONFIRMED', 'BEAR_DIV_CONFIRMED'(피벗이 확정되는 right봉 뒤 위치, 매매/스캔용)
+    """
+    high, low, rsi = np.asarray(high, dtype=float), np.asarray(low, dtype=float), np.asarray(rsi, dtype=float)
+    pivot_low, pivot_high = swing_points(rsi, left, right)
+
+    prev_rsi, distance = _previous_flagged(pivot_low, rsi)
+    prev_low, _ = _previous_flagged(pivot_low, low)
+    in_range = (distance >= min_range) & (distance <= max_range)
+    bull = pivot_low & in_range & (rsi > prev_rsi) & (low < prev_low)
+
+    prev_rsi, distance = _previous_flagged(pivot_high, rsi)
+    prev_high, _ = _previous_flagged(pivot_high, high)
+    in_range = (distance >= min_range) & (distance <= max_range)
+    bear = pivot_high & in_range & (rsi < prev_rsi) & (high > prev_high)
+
+    return {
+        'RSI_PIVOT_LOW': pivot_low,
+        'RSI_PIVOT_HIGH': pivot_high,
+        'BULL_DIV': bull,
+        'BEAR_DIV': bear,
+        'BULL_DIV_CONFIRMED': _shift(bull, right, False),
+        'BEAR_DIV_CONFIRMED': _shift(bear, right, False),
+    }
+
+
+def rsi_divergence_signals(high, low, close, rsi_length=14, left=5, right=5, min_range=5, max_range=60):
+    """종가로 RSI를 계산해 rsi_divergence를 적용합니다. (Panel.apply에 그대로 넘길 수 있음)"""
+    rsi = kernels.rsi(close, rsi_length)
+    columns = rsi_divergence(high, low, rsi, left, right, min_range, max_range)
+    columns['RSI'] = rsi
+    return columns
+
+
+def squeeze_signals(sqz_on, sqz_off, sqz_val):
+    """
+    스퀴즈 모멘텀 매매 신호를 계산합니다.
+    - 매수: 직전 봉 스퀴즈 ON -> 이번 봉 OFF(squeeze fired)이고, 모멘텀이 양수이며 증가 중
+    - 매도: 모멘텀이 0 이상에서 음수로 전환 (zero-cross)
+
+    Returns:
+        dict: 'SQZ_RISING'(모멘텀 증가), 'SQZ_BUY', 'SQZ_SELL' 불리언 배열
+    """
+    on, off = np.asarray(sqz_on, dtype=bool), np.asarray(sqz_off, dtype=bool)
+    val = np.asarray(sqz_val, dtype=float)
+    prev_val = _previous(val, np.nan)
+    rising = ~(val - prev_val < 0)  # 비교할 수 없는 봉(NaN)은 증가로 봅니다.
+    return {
+        'SQZ_RISING': rising,
+        'SQZ_BUY': _previous(on, False) & off & (val > 0) & rising,
+        'SQZ_SELL': (prev_val >= 0) & (val < 0),
+    }
+
+
+def ma_cross_signals(fast_ma, slow_ma):
+    """
+    이동평균 교차 신호를 계산합니다.
+    - 골든 크로스: 단기선이 장기선 이하에 있다가 위로 올라선 봉
+    - 데드 크로스: 단기선이 장기선 이상에 있다가 아래로 내려간 봉
+    (어느 한쪽이라도 NaN인 봉과 그 다음 봉에서는 신호가 없습니다)
+
+    Returns:
+        dict: 'MA_ABOVE'(단기선 > 장기선), 'GOLDEN_CROSS', 'DEAD_CROSS' 불리언 배열
+    """
+    fast, slow = np.asarray(fast_ma, dtype=float), np.asarray(slow_ma, dtype=float)
+    above, below = fast > slow, fast < slow
+    return {
+        'MA_ABOVE': above,
+        'GOLDEN_CROSS': above & _previous(fast <= slow, False),
+        'DEAD_CROSS': below & _previous(fast >= slow, False),
+    }
+
+
+def squeeze_with_signals(high, low, close, bb_length=20, kc_length=20, kc_mult=1.5, use_tr=True):
+    """스퀴즈 모멘텀 컬럼과 매매 신호를 함께 계산합니다. (Panel.apply에 그대로 넘길 수 있음)"""
+    columns = kernels.squeeze_momentum(high, low, close, bb_length=bb_length, kc_length=kc_length,
+                                       kc_mult=kc_mult, use_tr=use_tr)
+    columns.update(squeeze_signals(columns['SQZ_ON_CUSTOM'], columns['SQZ_OFF_CUSTOM'], columns['SQZ_VAL_CUSTOM']))
+    return columns
+
+
+def scan_squeeze(panel, **params):
+    """
+    패널의 모든 종목에 대해 스퀴즈 신호를 한 번에 계산해 종목별 현재 상태 표를 만듭니다.
+
+    Returns:
+        DataFrame: 티커 인덱스, Close/Momentum/Rising/Squeeze/Signal/Last Buy/Last Sell 컬럼.
+                   현재 신호(BUY, SELL, 없음) 순, 같은 신호 안에서는 모멘텀 내림차순
+    """
+    cols = panel.apply(squeeze_with_signals, 'High', 'Low', 'Close', **params)
+    buy, sell = panel.latest(cols['SQZ_BUY']), panel.latest(cols['SQZ_SELL'])
+    squeeze = np.select(
+        [panel.latest(cols['SQZ_ON_CUSTOM']), panel.latest(cols['SQZ_OFF_CUSTOM'])], ['ON', 'OFF'], default='NO')
+
+    table = pd.DataFrame({
+        'Close': panel.latest(panel.fields['Close']),
+        'Momentum': panel.latest(cols['SQZ_VAL_CUSTOM']),
+        'Rising': panel.latest(cols['SQZ_RISING']),
+        'Squeeze': squeeze,
+        'Signal': np.select([buy, sell], ['BUY', 'SELL'], default=''),
+        'Last Buy': panel.last_date(cols['SQZ_BUY']),
+        'Last Sell': panel.last_date(cols['SQZ_SELL']),
+    }, index=pd.Index(panel.tickers, name='Ticker'))
+    order = table['Signal'].map(SIGNAL_ORDER)
+    return table.assign(_order=order).sort_values(['_order', 'Momentum'], ascending=[True, False]).drop(columns='_order')
+
+
+def scan_divergence(panel, recent=RECENT_BARS, **params):
+    """
+    패널의 모든 종목에 대해 RSI 다이버전스를 한 번에 계산해 종목별 최근 상태 표를 만듭니다.
+    마지막으로 확정된 다이버전스가 recent봉 이내이면 Signal에 BULL/BEAR로 표시합니다.
+
+    Returns:
+        DataFrame: 티커 인덱스, Close/RSI/Signal/Bars Ago/Last Bull/Last Bear 컬럼.
+                   현재 신호(BULL, BEAR, 없음) 순, 같은 신호 안에서는 최근 확정 순
+    """
+    cols = panel.apply(rsi_divergence_signals, 'High', 'Low', 'Close', **params)
+    bull_ago = panel.bars_since(cols['BULL_DIV_CONFIRMED'])
+    bear_ago = panel.bars_since(cols['BEAR_DIV_CONFIRMED'])
+    latest_is_bull = bull_ago.fillna(np.inf) <= bear_ago.fillna(np.inf)
+    bars_ago = bull_ago.where(latest_is_bull, bear_ago)
+    signal = np.where(bars_ago <= recent, np.where(latest_is_bull, 'BULL', 'BEAR'), '')
+
+    table = pd.DataFrame({
+        'Close': panel.latest(panel.fields['Close']),
+        'RSI': panel.latest(cols['RSI']),
+        'Signal': signal,
+        'Bars Ago': bars_ago,
+        'Last Bull': panel.last_date(cols['BULL_DIV_CONFIRMED']),
+        'Last Bear': panel.last_date(cols['BEAR_DIV_CONFIRMED']),
+    }, index=pd.Index(panel.tickers, name='Ticker'))
+    order = table['Signal'].map(DIVERGENCE_ORDER)
+    return table.assign(_order=order).sort_values(['_order', 'Bars Ago']).drop(columns='_order')
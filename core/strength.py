@@ -0,0 +1,101 @@
+"""
+종목 간 상대강도(모멘텀) 순위.
+
+1/3/6/12개월 수익률, 변동성 조정 모멘텀, 그리고 종목 전체에 대한 백분위 순위를 계산합니다.
+원시 지표는 패널의 (최근 봉 x 종목) 배열에서 모든 종목을 한 번에 계산하고,
+순위(백분위)는 종목 축으로 한 번에 매깁니다.
+
+StrengthRanker는 종목별 원시 지표를 일봉 지문(calculator.data_fingerprint)과 함께 보관해 두고,
+새 일봉이 들어와 지문이 바뀐 종목만 다시 계산합니다. 순위는 종목 수만큼의 정렬이므로 매번 새로 매깁니다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core import calculator
+from core.panel import Panel
+
+# 기간 이름 -> 거래일 수 (한 달 = 21거래일)
+HORIZONS = {'1M': 21, '3M': 63, '6M': 126, '12M': 252}
+VOL_BARS = 252  # 변동성 계산 구간 (연율화)
+TRADING_DAYS = 252
+LOOKBACK_BARS = max(max(HORIZONS.values()), VOL_BARS) + 1
+RETURN_COLUMNS = list(HORIZONS)
+METRIC_COLUMNS = ['Close'] + RETURN_COLUMNS + ['Volatility', 'Vol-Adj Mom']
+
+
+def raw_metrics(panel):
+    """
+    패널의 모든 종목에 대해 원시 모멘텀 지표를 한 번에 계산합니다.
+    - 1M/3M/6M/12M: 종목별 마지막 봉 기준 21/63/126/252봉 전 대비 수익률 (이력이 짧으면 NaN)
+    - Volatility: 최근 252봉 일간 로그수익률의 연율화 표준편차 (관측치가 절반 미만이면 NaN)
+    - Vol-Adj Mom: 12개월 수익률을 변동성으로 나눈 값
+
+    Returns:
+        DataFrame: 티커 인덱스, METRIC_COLUMNS 컬럼
+    """
+    close = panel.tail(panel.fields['Close'], LOOKBACK_BARS)
+    last = close[-1]
+    columns = {'Close': last}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, bars in HORIZONS.items():
+            columns[name] = last / close[-1 - bars] - 1.0
+        log_returns = np.diff(np.log(close[-(VOL_BARS + 1):]), axis=0)
+        observed = (~np.isnan(log_returns)).sum(axis=0)
+        mean = np.nansum(log_returns, axis=0) / observed
+        variance = np.nansum((log_returns - mean) ** 2, axis=0) / (observed - 1)
+        columns['Volatility'] = np.where(observed >= VOL_BARS // 2, np.sqrt(variance * TRADING_DAYS), np.nan)
+        columns['Vol-Adj Mom'] = columns['12M'] / columns['Volatility']
+    return pd.DataFrame(columns, index=pd.Index(panel.tickers, name='Ticker'))
+
+
+def rank(metrics):
+    """
+    원시 지표에 종목 전체 기준 백분위(0~100)를 붙입니다.
+    RS Score는 1/3/6/12개월 수익률 백분위의 평균입니다. (값이 있는 기간만 평균)
+
+    Returns:
+        DataFrame: METRIC_COLUMNS + 기간별/Vol-Adj Mom 백분위('... %ile') + RS Score, RS Score 내림차순
+    """
+    ranked = metrics.copy()
+    percentiles = metrics[RETURN_COLUMNS + ['Vol-Adj Mom']].rank(pct=True) * 100
+    for column in percentiles.columns:
+        ranked[f'{column} %ile'] = percentiles[column]
+    ranked['RS Score'] = percentiles[RETURN_COLUMNS].mean(axis=1)
+    return ranked.sort_values('RS Score', ascending=False, na_position='last')
+
+
+class StrengthRanker:
+    """종목별 원시 지표를 보관해 두고 바뀐 종목만 다시 계산하는 상대강도 순위 계산기 (스레드 안전)."""
+
+    def __init__(self):
+        self._metrics = pd.DataFrame(columns=METRIC_COLUMNS, index=pd.Index([], name='Ticker'), dtype=float)
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def update(self, frames):
+        """
+        {티커: 일봉} 전체에 대한 순위표를 반환합니다. 지문이 바뀐(새 봉이 들어온) 종목만 다시 계산합니다.
+
+        Returns:
+            DataFrame: rank()의 반환값 (frames에 있는 종목만)
+        """
+        fingerprints = {t: calculator.data_fingerprint(df) for t, df in frames.items()}
+        with self._lock:
+            changed = [t for t, fp in fingerprints.items() if self._fingerprints.get(t) != fp]
+            if changed:
+                fresh = raw_metrics(Panel.from_frames({t: frames[t].iloc[-LOOKBACK_BARS:] for t in changed}))
+                kept = self._metrics.drop(index=changed, errors='ignore')
+                self._metrics = pd.concat([kept, fresh]) if not kept.empty else fresh
+                self._fingerprints.update({t: fingerprints[t] for t in changed})
+            metrics = self._metrics.reindex(list(frames))
+        return rank(metrics)
+
+    def reset(self):
+        with self._lock:
+            self._metrics = self._metrics.iloc[0:0]
+            self._fingerprints.clear()
+
+
+ranker = StrengthRanker()
@@ -0,0 +1,196 @@
+"""
+전략 파라미터 그리드 x 종목 묶음을 프로세스 풀에서 백테스트하는 파라미터 스윕.
+
+패널의 봉 축 High/Low/Close와 날짜 배열을 공유 메모리 한 블록에 한 번만 올리고,
+워커 프로세스는 시작할 때 그 블록을 붙여(attach) NumPy 배열 뷰로 읽습니다.
+작업(파라미터 조합 하나 x 종목 열 구간 하나)에는 파라미터와 열 범위만 넘기므로
+가격 데이터는 피클되거나 복사되지 않습니다. 각 작업은 core.backtest.evaluate로
+해당 구간의 모든 종목을 한 번에 계산하고, 작은 성과 지표 표만 돌려줍니다.
+"""
+import itertools
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from core import backtest
+
+SHARED_FIELDS = ['High', 'Low', 'Close']
+TASKS_PER_WORKER = 4  # 워커당 작업 수 목표 (작업 크기가 달라도 코어가 고르게 쓰이도록)
+
+DEFAULT_GRIDS = {
+    'squeeze': {
+        'bb_length': [14, 20, 30],
+        'kc_length': [14, 20, 30],
+        'kc_mult': [1.0, 1.5, 2.0],
+        'use_tr': [True, False],
+    },
+    'ma_cross': {
+        'fast': [5, 10, 20, 50],
+        'slow': [60, 120, 200],
+        'kind': ['SMA', 'EMA'],
+    },
+    'rsi_divergence': {
+        'rsi_length': [9, 14, 21],
+        'left': [3, 5, 8],
+        'right': [2, 3, 5],
+        'max_range': [40, 60, 90],
+    },
+}
+
+
+def parameter_grid(space):
+    """{파라미터: 후보 목록} 딕셔너리의 모든 조합을 파라미터 딕셔너리 리스트로 만듭니다."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+class SharedPanel:
+    """
+    패널의 봉 축 배열(High, Low, Close, 날짜)을 공유 메모리 한 블록에 올립니다.
+    with 블록을 벗어나면 공유 메모리를 해제합니다.
+    """
+
+    def __init__(self, panel):
+        shape = (len(panel.dates), len(panel.tickers))
+        self._shm = shared_memory.SharedMemory(create=True, size=max(8 * (len(SHARED_FIELDS) + 1) * math.prod(shape), 1))
+        self.spec = {'name': self._shm.name, 'shape': shape, 'tickers': panel.tickers}
+        arrays = _views(self._shm, shape)
+        for field in SHARED_FIELDS:
+            arrays[field][:] = panel.bars(field)
+        arrays['Dates'][:] = panel.bar_dates().astype('datetime64[ns]').view('int64')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _views(shm, shape):
+    """공유 메모리 블록 위의 필드별 (n, k) 배열 뷰. 날짜는 datetime64[ns]를 int64로 저장합니다."""
+    size = math.prod(shape)
+    views = {field: np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=8 * size * i)
+             for i, field in enumerate(SHARED_FIELDS)}
+    views['Dates'] = np.ndarray(shape, dtype=np.int64, buffer=shm.buf, offset=8 * size * len(SHARED_FIELDS))
+    return views
+
+
+# --- 워커 프로세스 ---
+
+_worker = {}
+
+
+def _attach(spec):
+    """워커 초기화: 공유 메모리 블록을 붙이고 배열 뷰를 만들어 둡니다. (프로세스가 끝날 때까지 유지)"""
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    _worker.update(shm=shm, arrays=_views(shm, spec['shape']), tickers=spec['tickers'])
+
+
+def _evaluate(strategy, params, cost, start, stop):
+    """파라미터 조합 하나를 종목 열 [start, stop) 구간에 백테스트해 성과 지표 표를 반환합니다."""
+    arrays, cols = _worker['arrays'], slice(start, stop)
+    dates = arrays['Dates'][:, cols].view('datetime64[ns]')
+    _, _, stats = backtest.evaluate(arrays['High'][:, cols], arrays['Low'][:, cols], arrays['Close'][:, cols],
+                                    dates, strategy, cost, **params)
+    stats.insert(0, 'Ticker', _worker['tickers'][start:stop])
+    for i, (name, value) in enumerate(params.items()):
+        stats.insert(i, name, value)
+    return stats
+
+
+# --- 실행 ---
+
+def iter_sweep(panel, strategy, grid, cost=backtest.DEFAULT_COST, workers=None):
+    """
+    파라미터 조합 x 종목 구간 작업을 프로세스 풀에 나눠 실행하고, 끝나는 순서대로 결과 표를 하나씩 내보냅니다.
+
+    Args:
+        panel: core.panel.Panel
+        strategy: backtest.STRATEGIES의 키
+        grid: 파라미터 딕셔너리 리스트 (parameter_grid 참고)
+        cost: 편도 거래 비용 비율
+        workers: 프로세스 수 (기본값: CPU 코어 수)
+
+    Yields:
+        DataFrame: 파라미터 컬럼 + Ticker + backtest.STATS_COLUMNS (작업 하나 분량)
+    """
+    n_tickers = len(panel.tickers)
+    if not grid or not n_tickers:
+        return
+    workers = workers or os.cpu_count() or 1
+    # 파라미터 조합이 코어 수보다 적으면 종목을 여러 구간으로 나눠 작업 수를 늘립니다.
+    chunks = min(n_tickers, math.ceil(workers * TASKS_PER_WORKER / len(grid)))
+    size = math.ceil(n_tickers / chunks)
+
+    with SharedPanel(panel) as shared:
+        # Streamlit 같은 멀티스레드 프로세스에서 fork하지 않도록 spawn으로 워커를 만듭니다.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_attach, initargs=(shared.spec,))
+        try:
+            futures = [pool.submit(_evaluate, strategy, params, cost, start, min(start + size, n_tickers))
+                       for params in grid for start in range(0, n_tickers, size)]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_sweep(panel, strategy, grid, cost=backtest.DEFAULT_COST, workers=None):
+    """iter_sweep의 결과를 모두 모아 (파라미터 x 종목) 한 행씩의 표로 반환합니다."""
+    parts = list(iter_sweep(panel, strategy, grid, cost, workers))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+def rank(table, by='Sharpe', agg='median'):
+    """
+    스윕 결과를 파라미터 조합별로 종목 전체에 대해 집계하고 by 기준 내림차순으로 정렬합니다.
+
+    Returns:
+        DataFrame: 파라미터 조합 인덱스, 성과 지표별 agg 집계 + Tickers(종목 수) 컬럼
+    """
+    params = [c for c in table.columns if c != 'Ticker' and c not in backtest.STATS_COLUMNS]
+    grouped = table.groupby(params, sort=False)
+    ranked = grouped[backtest.STATS_COLUMNS].agg(agg)
+    ranked['Trades'] = grouped['Trades'].sum()
+    ranked['Tickers'] = grouped['Ticker'].size()
+    return ranked.sort_values(by, ascending=False)
+
+
+if __name__ == "__main__":
+    # 순차 실행과의 일치 여부 확인 및 워커 수별 속도 비교 (python -m core.sweep)
+    import time
+    from core.panel import Panel
+
+    rng = np.random.default_rng(0)
+
+    def synthetic(n_bars, start):
+        c = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_bars)))
+        h = c * (1 + np.abs(rng.normal(0, 0.01, n_bars)))
+        l = c * (1 - np.abs(rng.normal(0, 0.01, n_bars)))
+        return pd.DataFrame({'Open': c, 'High': h, 'Low': l, 'Close': c, 'Volume': 1e6},
+                            index=pd.bdate_range(start, periods=n_bars))
+
+    panel = Panel.from_frames({f'T{i}': synthetic(int(rng.integers(1000, 2500)), f'201{i % 5}-01-01') for i in range(200)})
+    grid = parameter_grid(DEFAULT_GRIDS['squeeze'])
+
+    started = time.perf_counter()
+    sequential = {tuple(p.values()): backtest.run(panel, 'squeeze', **p).stats for p in grid}
+    print(f"순차 실행: {len(grid)}개 조합 x {len(panel.tickers)}종목 {time.perf_counter() - started:.2f}초")
+
+    for workers in sorted({1, os.cpu_count()}):
+        started = time.perf_counter()
+        table = run_sweep(panel, 'squeeze', grid, workers=workers)
+        print(f"프로세스 {workers}개: {time.perf_counter() - started:.2f}초, {len(table)}행")
+
+    params = list(DEFAULT_GRIDS['squeeze'])
+    for key, part in table.groupby(params):
+        expected = sequential[key].loc[part['Ticker']]
+        assert np.allclose(part[backtest.STATS_COLUMNS].to_numpy(dtype=float), expected.to_numpy(dtype=float), equal_nan=True), key
+    print("순차 실행과 일치")
+    print(rank(table).head(5)[['CAGR', 'Sharpe', 'Hit Rate', 'Max Drawdown', 'Trades', 'Tickers']])
@@ -0,0 +1,173 @@
+"""
+이동평균 골든/데드 크로스 이벤트 인덱스.
+
+일봉 캐시를 갱신하다 새 봉이 확정되면(fetcher) 새로 확정된 봉 구간만 계산해 교차 이벤트를 쌓아 둡니다.
+(진행 중인 봉의 교차는 인덱스에 넣지 않습니다. 확정 기준은 signal_history.finalized_bars)
+'최근 N일 안에 교차한 종목'은 전체 이력을 다시 계산하지 않고 이 인덱스에서 바로 찾습니다.
+
+저장 형식 (cache/ 아래 CSV 두 개):
+- cross_events.csv: Ticker, Pair, Date, Event(GOLDEN/DEAD) - 이벤트 한 건당 한 행
+- cross_state.csv: Ticker, Pair, Through - 종목/쌍별로 이벤트를 계산한 마지막 봉 날짜
+Through 봉의 값이 나중에 바뀔 수 있으므로(수정 주가 등) 다음 갱신 때 Through 봉부터 다시 계산합니다.
+"""
+import os
+import sys
+import threading
+
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import calculator, signals
+
+EVENTS_FILE_PATH = os.path.join("cache", "cross_events.csv")
+STATE_FILE_PATH = os.path.join("cache", "cross_state.csv")
+DEFAULT_PAIRS = [('MA5', 'MA20'), ('MA20', 'MA60'), ('MA50', 'MA200')]  # (단기선, 장기선)
+EVENT_COLUMNS = ['Ticker', 'Pair', 'Date', 'Event']
+
+
+def pair_name(fast, slow):
+    return f"{fast}/{slow}"
+
+
+def detect_crosses(df, fast, slow, start=0):
+    """
+    df의 start번째 봉부터 마지막 봉까지의 골든/데드 크로스를 찾습니다.
+    이동평균은 start 앞의 워밍업 구간을 포함한 꼬리 구간만으로 계산합니다.
+
+    Returns:
+        DataFrame: Date, Event 컬럼
+    """
+    specs = [calculator.ma_spec(fast), calculator.ma_spec(slow)]
+    begin = max(0, start - calculator.warmup_bars(specs) - 1)
+    part = df.iloc[begin:]
+    values = calculator.evaluate(part, specs)
+    sig = signals.ma_cross_signals(values[specs[0]].iloc[:, 0], values[specs[1]].iloc[:, 0])
+    offset = start - begin
+    golden, dead = sig['GOLDEN_CROSS'][offset:], sig['DEAD_CROSS'][offset:]
+    dates = part.index[offset:].astype('datetime64[ns]')
+    events = pd.DataFrame({'Date': dates[golden | dead], 'Event': 'GOLDEN'})
+    events.loc[dead[golden | dead], 'Event'] = 'DEAD'
+    return events
+
+
+class CrossEventStore:
+    """
+    종목별 이동평균 교차 이벤트를 CSV 파일에 보관하는 인덱스입니다.
+    update는 캐시 갱신 때마다 호출되며, 바뀐 내용이 있을 때만 파일에 씁니다.
+    """
+
+    def __init__(self, events_path=EVENTS_FILE_PATH, state_path=STATE_FILE_PATH, pairs=DEFAULT_PAIRS):
+        self.events_path = events_path
+        self.state_path = state_path
+        self.pairs = list(pairs)
+        self._events = None  # EVENT_COLUMNS, Date 오름차순
+        self._through = None  # (ticker, pair) -> 마지막으로 계산한 봉 날짜
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._events is None:
+            try:
+                events = pd.read_csv(self.events_path, parse_dates=['Date'])
+                state = pd.read_csv(self.state_path, parse_dates=['Through'])
+            except (OSError, pd.errors.EmptyDataError, ValueError):
+                events, state = pd.DataFrame(columns=EVENT_COLUMNS), pd.DataFrame(columns=['Ticker', 'Pair', 'Through'])
+            self._events = events[EVENT_COLUMNS].astype({'Date': 'datetime64[ns]'}).sort_values('Date', kind='stable', ignore_index=True)
+            self._through = {(t, p): d for t, p, d in state[['Ticker', 'Pair', 'Through']].itertuples(index=False)}
+        return self._events
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.events_path) or '.', exist_ok=True)
+        state = pd.DataFrame([(t, p, d) for (t, p), d in self._through.items()], columns=['Ticker', 'Pair', 'Through'])
+        for frame, path in [(self._events, self.events_path), (state, self.state_path)]:
+            tmp_path = f"{path}.tmp"
+            frame.to_csv(tmp_path, index=False, date_format='%Y-%m-%d')
+            os.replace(tmp_path, path)
+
+    def _update_locked(self, ticker, df, pairs):
+        """lock 안에서 호출. 바뀐 내용이 있으면 True."""
+        events = self._load()
+        changed, new_parts, stale = False, [], pd.Series(False, index=events.index)
+        for fast, slow in pairs:
+            pair = pair_name(fast, slow)
+            through = self._through.get((ticker, pair))
+            start = 0 if through is None else min(int(df.index.searchsorted(through)), len(df) - 1)
+            found = detect_crosses(df, fast, slow, start)
+            found.insert(0, 'Pair', pair)
+            found.insert(0, 'Ticker', ticker)
+
+            since = df.index[start]
+            old = (events['Ticker'] == ticker) & (events['Pair'] == pair) & (events['Date'] >= since)
+            if events.loc[old, ['Date', 'Event']].to_numpy().tolist() != found[['Date', 'Event']].to_numpy().tolist():
+                stale |= old
+                new_parts.append(found)
+                changed = True
+            if through != df.index[-1]:
+                self._through[(ticker, pair)] = df.index[-1]
+                changed = True
+
+        if new_parts:
+            self._events = pd.concat([events[~stale]] + new_parts, ignore_index=True) \
+                .sort_values('Date', kind='stable', ignore_index=True)
+        return changed
+
+    def update(self, ticker, df, pairs=None):
+        """새로 받은(또는 교체된) 봉 구간의 교차 이벤트를 계산해 인덱스에 반영합니다."""
+        if df is None or df.empty:
+            return
+        with self._lock:
+            if self._update_locked(ticker, df, pairs or self.pairs):
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"Failed to save cross event index: {e}")
+
+    def backfill(self, frames, pairs=None):
+        """인덱스에 아직 없는 종목/쌍만 {티커: 일봉} 캐시 데이터로 채웁니다. (한 번만 저장)"""
+        pairs = pairs or self.pairs
+        with self._lock:
+            self._load()
+            changed = False
+            for ticker, df in frames.items():
+                missing = [p for p in pairs if (ticker, pair_name(*p)) not in self._through]
+                if missing and df is not None and not df.empty:
+                    changed |= self._update_locked(ticker, df, missing)
+            if changed:
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"Failed to save cross event index: {e}")
+
+    def recent(self, days, tickers=None, pairs=None, event=None, as_of=None):
+        """
+        최근 days일(달력 기준, as_of 포함) 안에 발생한 교차 이벤트를 최신순으로 반환합니다.
+
+        Args:
+            tickers: 찾을 티커 목록 (None이면 전체)
+            pairs: 찾을 쌍 이름 목록 (pair_name 형식, None이면 전체)
+            event: 'GOLDEN' 또는 'DEAD' (None이면 둘 다)
+            as_of: 기준일 (기본값: 오늘)
+        """
+        as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now()).normalize()
+        with self._lock:
+            events = self._load()
+            start = events['Date'].searchsorted(as_of - pd.Timedelta(days=days - 1))
+            found = events.iloc[start:]
+        if tickers is not None:
+            found = found[found['Ticker'].isin(tickers)]
+        if pairs is not None:
+            found = found[found['Pair'].isin(pairs)]
+        if event is not None:
+            found = found[found['Event'] == event]
+        return found.iloc[::-1].reset_index(drop=True)
+
+    def last_events(self, tickers=None, pairs=None):
+        """종목/쌍별 마지막 교차 이벤트를 반환합니다."""
+        with self._lock:
+            events = self._load()
+        if tickers is not None:
+            events = events[events['Ticker'].isin(tickers)]
+        if pairs is not None:
+            events = events[events['Pair'].isin(pairs)]
+        return events.groupby(['Ticker', 'Pair'], sort=False).tail(1).iloc[::-1].reset_index(drop=True)
+
+
+store = CrossEventStore()
@@ -1,56 +1,24 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
 
+from data import manual_accounts, positions
 
 
 class DCIntegration:
-    def __init__(self):
-        asset_path = "private/dc_balance.csv"
-        self.asset_df = pd.read_csv(asset_path)
+    """DC 계좌 잔고 (수기 계좌 파일의 'DC' 계좌)"""
+
+    def __init__(self, provider=None):
+        self.provider = provider or manual_accounts.provider
 
-        print(self.asset_df )
+    def get_positions(self) -> pd.DataFrame:
+        """DC 계좌 잔고를 표준 포지션 테이블로 반환합니다."""
+        return self.provider.get_positions(['DC'])
 
     def get_balance(self):
-        stock = self.get_stock_info()
-        deposit = self.get_deposit()
-        merged = {'DC': {'stock': stock['DC'].get('stock', []), 'deposit': deposit['DC'].get('deposit', [])}}
-        return merged
-    
-    def get_stock_info(self):
-        """DC 계좌 잔고 조회"""
-        ret = {
-            "DC": {
-                "stock": [],
-                "deposit": []
-            }
-        }
-        
-        # DC 계좌 잔고 정보
-        for index, row in self.asset_df.iterrows():
-            if row['ticker'] == 'DC_DEPOSIT':
-                continue
-            ret["DC"]["stock"].append({
-                'name': row['name'],
-                'ticker': row['ticker'],
-                'quantity': float(row['quantity']),
-                'avg_price': float(row['avg_price']),
-                'currency': row['currency']
-            })
-        
-        return ret
-
-    def get_deposit(self):
-        ret =  {
-                    "deposit": [
-                        {
-                            'name': 'DC 예수금',
-                            'ticker': 'DC_DEPOSIT',
-                            'quantity': float(self.asset_df.loc[self.asset_df['ticker'] == 'DC_DEPOSIT', 'quantity'].values[0]),
-                            'avg_price': 0.0,  # KRW는 평균 매입가가 없으므로 0으로 설정
-                            'currency': 'KRW'
-                        }
-                    ]
-                }
-        return {'DC': ret}
+        return positions.positions_to_balance(self.get_positions())
 
     def get_orderbook(self, ticker):
         # Implement the logic to fetch order book for a specific ticker
@@ -59,4 +27,4 @@ class DCIntegration:
 if __name__ == "__main__":
     hyundai = DCIntegration()
     balance = hyundai.get_balance()
-    print(balance)
\ No newline at end of file
+    print(balance)
@@ -4,27 +4,127 @@ import requests
 import pandas as pd
 from datetime import datetime, time
 import pytz
-import os
-
 import os
 import sys
+import threading
+import time as time_module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import data.kis_integration as kis_integration
+from data import metadata, cross_events, signal_history, intraday
 
 # --- 로컬 캐시 설정 ---
 CACHE_DIR = "cache" # 데이터를 저장할 폴더 이름
 CACHE_TTL_SECONDS = 1 # 캐시 유효 시간 (10초)
 
-kis = kis_integration.KISIntegration()
+# --- 외부 API 클라이언트 레지스트리 (지연 생성) ---
+# 임포트 시점에는 아무 것도 만들지 않고, 처음 실제로 사용할 때 한 번만 인증합니다.
+# 토큰은 날짜별로 관리되므로 CLIENT_TTL_SECONDS가 지나면 클라이언트를 새로 만듭니다.
+CLIENT_TTL_SECONDS = 6 * 3600
+
+def _create_kis_client():
+    import data.kis_integration as kis_integration
+    return kis_integration.KISIntegration()
+
+_CLIENT_FACTORIES = {
+    'kis': _create_kis_client,
+}
+_clients = {}  # name -> (client, created_at)
+_clients_lock = threading.Lock()
+
+def get_client(name):
+    """이름으로 API 클라이언트를 가져옵니다. 처음 호출될 때 스레드 안전하게 생성합니다."""
+    entry = _clients.get(name)
+    if entry is None or time_module.monotonic() - entry[1] > CLIENT_TTL_SECONDS:
+        with _clients_lock:
+            entry = _clients.get(name)
+            if entry is None or time_module.monotonic() - entry[1] > CLIENT_TTL_SECONDS:
+                entry = (_CLIENT_FACTORIES[name](), time_module.monotonic())
+                _clients[name] = entry
+    return entry[0]
+
+def reset_client(name=None):
+    """생성된 클라이언트를 버립니다. name이 없으면 전부 버립니다."""
+    with _clients_lock:
+        if name is None:
+            _clients.clear()
+        else:
+            _clients.pop(name, None)
 
 def get_stock_info_from_KIS(ticker):
-    return kis.get_stock_info_domestic(ticker)
+    return get_client('kis').get_stock_info_domestic(ticker)
+
+def get_domestic_prices(codes):
+    """KIS에서 국내 종목(금현물 포함)의 현재가를 일괄 조회합니다. 실패 시 빈 딕셔너리를 반환합니다."""
+    if not codes:
+        return {}
+    try:
+        return get_client('kis').get_domestic_prices(codes)
+    except Exception as e:
+        print(f"Failed to fetch domestic prices from KIS: {e}")
+        return {}
+
+OHLCV_COLS = ['Open', 'High', 'Low', 'Close', 'Volume']
 
-def load_daily_data(ticker_symbol):
+def _normalize_ohlcv(df):
+    """
+    적재 시점에 일봉을 한 번만 정리합니다: 단일 레벨 컬럼, 숫자형 OHLCV, 결측 행 제거.
+    이후 지표 계산은 이 프레임을 복사 없이 그대로 사용합니다.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df = df.loc[:, ~df.columns.duplicated()]
+    cols = [c for c in OHLCV_COLS if c in df.columns]
+    non_numeric = [c for c in cols if not pd.api.types.is_numeric_dtype(df[c])]
+    if non_numeric:
+        df = df.assign(**{c: pd.to_numeric(df[c], errors='coerce') for c in non_numeric})
+    return df.dropna(subset=cols)
+
+def compact_ohlcv(df):
+    """
+    메모리 절약 모드: 가격은 float32, 거래량은 int32(범위를 넘는 종목만 int64)로 줄인 사본을 반환합니다.
+    여러 종목의 이력을 메모리에 들고 스캔할 때 사용합니다. (CSV 캐시는 그대로 float64)
+    """
+    dtypes = {c: 'float32' for c in ['Open', 'High', 'Low', 'Close'] if c in df.columns}
+    compact = df.astype(dtypes)
+    if 'Volume' in compact.columns:
+        volume = compact['Volume'].round()
+        compact['Volume'] = volume.astype('int32' if volume.abs().max() < 2**31 else 'int64')
+    return compact
+
+def load_daily_data(ticker_symbol, compact=False):
     """
     지정된 티커의 일봉 데이터를 다운로드합니다.
     데이터 저장 전, 복잡한 헤더를 정리하여 캐시 파일의 안정성을 높였습니다.
+    compact=True이면 compact_ohlcv로 줄인 형식으로 반환합니다.
     """
+    data = _load_daily_data(ticker_symbol)
+    return compact_ohlcv(data) if compact and not data.empty else data
+
+_indexed_bars = {}  # ticker -> 이벤트 인덱스/신호 이력에 반영한 마지막 확정 봉 (날짜, 값)
+_indexed_bars_lock = threading.Lock()
+
+def _update_event_indexes(ticker_symbol, df):
+    """
+    새 일봉이 확정됐을 때만 이동평균 교차 이벤트 인덱스와 신호 이력을 확정된 봉으로 갱신합니다.
+    진행 중인 마지막 봉만 바뀐 자동 새로고침에서는 아무것도 하지 않습니다. (실패해도 데이터 로드는 계속)
+    """
+    finalized = signal_history.finalized_bars(df, ticker_symbol)
+    if finalized.empty:
+        return
+    last_bar = (finalized.index[-1], tuple(finalized.iloc[-1].tolist()))
+    with _indexed_bars_lock:
+        if _indexed_bars.get(ticker_symbol) == last_bar:
+            return
+        _indexed_bars[ticker_symbol] = last_bar
+    try:
+        cross_events.store.update(ticker_symbol, finalized)
+    except Exception as e:
+        print(f"Failed to update cross events for {ticker_symbol}: {e}")
+    try:
+        signal_history.store.update(ticker_symbol, finalized)
+    except Exception as e:
+        print(f"Failed to update signal history for {ticker_symbol}: {e}")
+
+def _load_daily_data(ticker_symbol):
     os.makedirs(CACHE_DIR, exist_ok=True)
     file_path = os.path.join(CACHE_DIR, f"{ticker_symbol}.csv")
 
@@ -34,6 +134,7 @@ def load_daily_data(ticker_symbol):
             df = pd.read_csv(file_path, index_col='Date', parse_dates=True)
             if not isinstance(df.index, pd.DatetimeIndex):
                 raise Exception('Invalid index')
+            df = _normalize_ohlcv(df)
         except Exception:
             print(f"Corrupted cache file detected for '{ticker_symbol}'. Deleting and refetching.")
             os.remove(file_path)
@@ -42,10 +143,7 @@ def load_daily_data(ticker_symbol):
             # yfinance에서 최신 1개만 받아 마지막 행만 갱신
             print(f"Updating last row for '{ticker_symbol}' from yfinance.")
             try:
-                latest = yf.download(ticker_symbol, period='2d', interval='1d', auto_adjust=True)
-                if isinstance(latest.columns, pd.MultiIndex):
-                    latest.columns = latest.columns.get_level_values(0)
-                    latest = latest.loc[:,~latest.columns.duplicated()]
+                latest = _normalize_ohlcv(yf.download(ticker_symbol, period='2d', interval='1d', auto_adjust=True))
                 if not latest.empty:
                     # 최신 날짜만 추출
                     last_row = latest.iloc[[-1]]
@@ -56,6 +154,7 @@ def load_daily_data(ticker_symbol):
                     df = df.sort_index()
                     df.to_csv(file_path, index_label='Date')
                     print(f"Updated last row and saved '{ticker_symbol}' to local cache.")
+                    _update_event_indexes(ticker_symbol, df)
                 return df
             except Exception as e:
                 print(f"Failed to update last row for {ticker_symbol}: {e}")
@@ -63,19 +162,64 @@ def load_daily_data(ticker_symbol):
     # 캐시가 없거나, 로딩에 실패했으면 yfinance에서 전체 데이터 가져오기
     print(f"Fetching '{ticker_symbol}' from yfinance (full download).")
     try:
-        data = yf.download(ticker_symbol, period='500d', interval='1d', auto_adjust=True)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
-            data = data.loc[:,~data.columns.duplicated()]
+        data = _normalize_ohlcv(yf.download(ticker_symbol, period='500d', interval='1d', auto_adjust=True))
         if not data.empty:
             data.to_csv(file_path, index_label='Date')
             print(f"Saved '{ticker_symbol}' to local cache.")
+            _update_event_indexes(ticker_symbol, data)
         return data
     except Exception as e:
         print(f"Failed to fetch data for {ticker_symbol}: {e}")
         return pd.DataFrame()
 
 
+def _download_intraday(ticker_symbol, interval, start):
+    """start 시각(포함) 이후의 분봉을 yfinance에서 받습니다. (interval은 intraday.INTERVALS 키, 인덱스는 거래소 시간대)"""
+    return _normalize_ohlcv(yf.download(ticker_symbol, start=start.to_pydatetime(),
+                                        interval=intraday.INTERVALS[interval].yf_interval,
+                                        auto_adjust=True, progress=False))
+
+def load_intraday_data(ticker_symbol, interval):
+    """
+    지정된 티커의 분봉(1min/5min/15min)을 메모리 링 버퍼에서 가져옵니다.
+    버퍼의 마지막 봉 시각 이후의 새 봉만 내려받고, 세션이 끝나면 디스크에 저장합니다. (data/intraday.py)
+    """
+    return intraday.store.update(ticker_symbol, interval, _download_intraday)
+
+
+_cached_frames = {}  # ticker -> ((mtime_ns, size), DataFrame)
+_cached_frames_lock = threading.Lock()
+
+def load_cached_data(ticker_symbol):
+    """
+    네트워크 조회 없이 로컬 캐시의 일봉만 읽습니다. (여러 종목 스캔용)
+    파일이 바뀌지 않았으면 메모리에 있는 프레임을 그대로 돌려줍니다. 캐시가 없으면 None.
+    """
+    file_path = os.path.join(CACHE_DIR, f"{ticker_symbol}.csv")
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _cached_frames_lock:
+        cached = _cached_frames.get(ticker_symbol)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        df = _normalize_ohlcv(pd.read_csv(file_path, index_col='Date', parse_dates=True))
+    except Exception as e:
+        print(f"Failed to read cached data for {ticker_symbol}: {e}")
+        return None
+    with _cached_frames_lock:
+        _cached_frames[ticker_symbol] = (key, df)
+    return df
+
+def load_cached_frames(tickers):
+    """여러 티커의 로컬 캐시 일봉을 {티커: DataFrame}으로 반환합니다. (캐시가 없는 티커는 제외)"""
+    frames = {t: load_cached_data(t) for t in dict.fromkeys(tickers)}
+    return {t: df for t, df in frames.items() if df is not None and not df.empty}
+
+
 @st.cache_data(ttl=60) # 1분 캐시
 def get_current_prices(ticker_list):
     """여러 티커의 최신 가격을 한 번에 가져옵니다."""
@@ -197,21 +341,22 @@ def get_index_data(ticker_symbol):
     except Exception:
         return None, None
 
-@st.cache_data(ttl=3600)
 def get_stock_info(ticker_symbol):
-    """yf.Ticker.info에서 주식 정보를 딕셔너리로 가져옵니다."""
-    try:
-        return yf.Ticker(ticker_symbol).info
-    except Exception:
-        return {}
+    """
+    종목 메타데이터(name, currency, exchange, type)를 디스크 캐시에서 즉시 가져옵니다.
+    캐시가 없거나 오래된 경우 yf.Ticker.info 조회는 백그라운드에서 진행됩니다.
+    """
+    return metadata.store.get(ticker_symbol)
 
-@st.cache_data(ttl=3600)
 def get_company_name(ticker_symbol):
     """get_stock_info를 사용해 회사 이름을 가져옵니다."""
-    info = get_stock_info(ticker_symbol)
-    name = info.get('longName', info.get('shortName'))
+    name = get_stock_info(ticker_symbol).get('name')
     return name if name else ticker_symbol
 
+def warm_metadata(ticker_list):
+    """여러 티커의 메타데이터를 백그라운드에서 미리 채웁니다."""
+    metadata.store.warm(ticker_list)
+
 @st.cache_data(ttl=60)
 def get_market_status(timezone_str, open_time, close_time):
     """지정된 시간대의 시장 개장 여부와 현지 시간을 반환합니다."""
@@ -0,0 +1,290 @@
+"""
+분봉(1/5/15분) 메모리 링 버퍼.
+
+티커/주기별로 고정 크기 링 버퍼(시각 배열 + OHLCV 배열)를 메모리에 두고,
+자동 새로고침마다 버퍼의 마지막 봉 시각 이후의 봉만 내려받아 꼬리에 덧붙입니다.
+(마지막 봉은 진행 중인 봉이므로 같은 시각부터 다시 받아 교체합니다)
+버퍼가 가득 차면 가장 오래된 봉부터 덮어씁니다.
+
+세션(거래소 현지 날짜)이 바뀌면 끝난 세션까지의 봉을 cache/intraday/ 아래
+티커/주기별 .npz 파일(컬럼별 배열)로 저장하고, 다음 실행 때 이 파일에서 버퍼를 다시 채워
+그 이후의 봉만 내려받습니다. 프로세스 종료 시에는 진행 중인 세션까지 저장합니다.
+"""
+import atexit
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+INTRADAY_DIR = os.path.join("cache", "intraday")
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# 키는 월봉('1M', data/timeframes.py)과 대소문자만 다르지 않도록 'min'으로 씁니다.
+# label: 화면 표시 이름, yf_interval: yfinance interval 값 (저장 파일 이름에도 사용),
+# lookback_days: 처음 받을 때(또는 오래 비었을 때) 받을 기간 (yfinance 제공 한도 이내), capacity: 링 버퍼 크기 (봉 수)
+IntervalDef = namedtuple('IntervalDef', ['label', 'yf_interval', 'lookback_days', 'capacity'])
+INTERVALS = {
+    '1min': IntervalDef('1분봉', '1m', 5, 2000),
+    '5min': IntervalDef('5분봉', '5m', 30, 2000),
+    '15min': IntervalDef('15분봉', '15m', 55, 1500),
+}
+
+
+def _utc_ns(index):
+    """tz가 있는 DatetimeIndex를 UTC 기준 int64(ns) 배열로 바꿉니다. (인덱스 해상도와 무관)"""
+    return index.tz_convert('UTC').values.astype('datetime64[ns]').view(np.int64)
+
+
+class RingBuffer:
+    """
+    고정 크기 OHLCV 링 버퍼. 시각은 UTC 기준 int64(ns)로 저장하고, 표시할 때만 거래소 시간대로 바꿉니다.
+    frame()은 버퍼가 바뀌지 않았으면 같은 DataFrame을 돌려줍니다. (지표 캐시가 그대로 맞음)
+    """
+
+    def __init__(self, capacity, tz='UTC'):
+        self.capacity = capacity
+        self.tz = tz
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((capacity, len(COLUMNS)), dtype=np.float64)
+        self.start = 0
+        self.size = 0
+        self._frame = None
+
+    def __len__(self):
+        return self.size
+
+    def _positions(self):
+        return (self.start + np.arange(self.size)) % self.capacity
+
+    @property
+    def last_time(self):
+        """마지막 봉 시각 (UTC ns, 비어 있으면 None)."""
+        return int(self.times[(self.start + self.size - 1) % self.capacity]) if self.size else None
+
+    def extend(self, times, values):
+        """
+        오름차순 봉을 꼬리에 덧붙입니다. 버퍼의 마지막 봉들과 시각이 겹치면 새 값으로 교체합니다.
+
+        Returns:
+            int: 반영한 봉 수
+        """
+        n = len(times)
+        if n == 0:
+            return 0
+        if n > self.capacity:
+            times, values, n = times[-self.capacity:], values[-self.capacity:], self.capacity
+        # 겹치는 꼬리(보통 진행 중이던 마지막 봉 하나)를 걷어냅니다.
+        while self.size and self.times[(self.start + self.size - 1) % self.capacity] >= times[0]:
+            self.size -= 1
+        positions = (self.start + self.size + np.arange(n)) % self.capacity
+        self.times[positions] = times
+        self.values[positions] = values
+        overflow = max(0, self.size + n - self.capacity)
+        self.start = (self.start + overflow) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        self._frame = None
+        return n
+
+    def arrays(self):
+        """시간순으로 정렬한 (시각 배열, 값 배열) 사본."""
+        positions = self._positions()
+        return self.times[positions], self.values[positions]
+
+    def frame(self):
+        """버퍼 내용을 거래소 시간대 인덱스의 OHLCV DataFrame으로 반환합니다."""
+        if self._frame is None:
+            times, values = self.arrays()
+            index = pd.DatetimeIndex(times.view('datetime64[ns]')).tz_localize('UTC').tz_convert(self.tz)
+            index.name = 'Datetime'
+            self._frame = pd.DataFrame(values, index=index, columns=COLUMNS)
+        return self._frame
+
+    def session_date(self, time):
+        """UTC ns 시각의 거래소 현지 날짜."""
+        return pd.Timestamp(time, tz='UTC').tz_convert(self.tz).date()
+
+
+class IntradayStore:
+    """
+    티커/주기별 분봉 링 버퍼 모음 (스레드 안전).
+    네트워크 조회는 lock 밖에서 하고, 버퍼 반영/저장만 lock 안에서 합니다.
+    """
+
+    def __init__(self, directory=INTRADAY_DIR):
+        self.directory = directory
+        self._buffers = {}  # (ticker, interval) -> RingBuffer
+        self._saved = {}    # (ticker, interval) -> 파일에 저장한 마지막 봉 시각 (UTC ns)
+        self._lock = threading.Lock()
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.directory, f"{ticker}_{INTERVALS[interval].yf_interval}.npz")
+
+    def _buffer(self, ticker, interval):
+        """lock 안에서 호출. 메모리에 없으면 저장된 파일에서 버퍼를 채웁니다."""
+        key = (ticker, interval)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = RingBuffer(INTERVALS[interval].capacity)
+            try:
+                with np.load(self._path(ticker, interval), allow_pickle=False) as saved:
+                    buffer.tz = str(saved['tz'])
+                    buffer.extend(saved['times'], saved['values'])
+            except (OSError, KeyError, ValueError):
+                pass
+            self._buffers[key] = buffer
+            self._saved[key] = buffer.last_time
+        return buffer
+
+    def _save(self, key, buffer, through=None):
+        """lock 안에서 호출. 버퍼에서 through 시각까지(None이면 전부)의 봉을 파일에 저장합니다."""
+        times, values = buffer.arrays()
+        if through is not None:
+            stop = int(np.searchsorted(times, through, side='right'))
+            times, values = times[:stop], values[:stop]
+        if not len(times) or times[-1] == self._saved.get(key):
+            return
+        path = self._path(*key)
+        tmp_path = f"{path}.tmp.npz"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            np.savez_compressed(tmp_path, times=times, values=values, tz=np.array(buffer.tz))
+            os.replace(tmp_path, path)
+            self._saved[key] = int(times[-1])
+        except OSError as e:
+            print(f"Failed to save intraday bars for {key[0]} ({key[1]}): {e}")
+
+    def update(self, ticker, interval, fetch):
+        """
+        마지막 봉 시각 이후의 새 봉만 받아 버퍼에 반영하고, 버퍼 전체를 DataFrame으로 반환합니다.
+        세션이 바뀌었으면 끝난 세션까지의 봉을 파일에 저장합니다.
+
+        Args:
+            fetch: fetch(ticker, interval, start) -> OHLCV DataFrame (interval은 INTERVALS 키, start는 tz가 있는 Timestamp)
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"지원하지 않는 분봉 주기입니다: {interval} (가능: {', '.join(INTERVALS)})")
+        key = (ticker, interval)
+        with self._lock:
+            buffer = self._buffer(ticker, interval)
+            last_time = buffer.last_time
+
+        earliest = pd.Timestamp.now(tz='UTC').normalize() - pd.Timedelta(days=INTERVALS[interval].lookback_days)
+        start = earliest if last_time is None else max(pd.Timestamp(last_time, tz='UTC'), earliest)
+        try:
+            new = fetch(ticker, interval, start)
+        except Exception as e:
+            print(f"Failed to fetch {interval} bars for {ticker}: {e}")
+            new = None
+
+        with self._lock:
+            if new is not None and not new.empty:
+                index = new.index if new.index.tz is not None else new.index.tz_localize('UTC')
+                previous = buffer.last_time
+                buffer.tz = str(index.tz)
+                buffer.extend(_utc_ns(index), new[COLUMNS].to_numpy(dtype=float))
+                # 새 세션의 봉이 들어왔으면 직전 세션은 끝난 것이므로 그때까지 저장합니다.
+                if previous is not None and buffer.session_date(buffer.last_time) != buffer.session_date(previous):
+                    session_start = pd.Timestamp(buffer.session_date(buffer.last_time)).tz_localize(buffer.tz)
+                    self._save(key, buffer, through=session_start.tz_convert('UTC').value - 1)
+            return buffer.frame()
+
+    def flush(self):
+        """진행 중인 세션을 포함해 아직 저장하지 않은 봉을 모두 저장합니다. (프로세스 종료 시 호출)"""
+        with self._lock:
+            for key, buffer in self._buffers.items():
+                self._save(key, buffer)
+
+
+store = IntradayStore()
+atexit.register(store.flush)
+
+
+if __name__ == "__main__":
+    # 링 버퍼 덮어쓰기/꼬리 교체, 세션 종료 시 저장과 재시작 복원 확인 (python data/intraday.py)
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    days = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=5)  # 조회 한도 안쪽의 최근 5거래일
+    sessions = [pd.date_range(f'{d:%Y-%m-%d} 09:30', periods=78, freq='5min', tz='America/New_York') for d in days]
+    index = sessions[0].append(sessions[1:])
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(index))))
+    bars = pd.DataFrame({'Open': close, 'High': close * 1.001, 'Low': close * 0.999, 'Close': close, 'Volume': 100.0},
+                        index=index.as_unit('ns'))
+
+    buffer = RingBuffer(100, tz='America/New_York')
+    for i in range(0, len(bars), 7):
+        part = bars.iloc[max(0, i - 1):i + 7]  # 직전 봉부터 다시 받는 것처럼 한 봉씩 겹침
+        buffer.extend(_utc_ns(part.index), part.to_numpy())
+    assert buffer.frame().equals(bars.iloc[-100:].rename_axis('Datetime')), "링 버퍼 내용 불일치"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        now = {'stop': 0}
+        fetched = []
+
+        def fake_fetch(ticker, interval, start):
+            part = bars.iloc[:now['stop']]
+            fetched.append(int((part.index >= start).sum()))
+            return part[part.index >= start]
+
+        intraday = IntradayStore(tmp)
+        for stop in range(12, len(bars) + 1, 6):
+            now['stop'] = stop
+            frame = intraday.update('T', '5min', fake_fetch)
+        assert frame.equals(bars.rename_axis('Datetime')), "증분 조회 결과 불일치"
+        assert max(fetched[1:]) == 7, fetched  # 이후 조회는 새 봉 + 마지막 봉 하나만
+        with np.load(os.path.join(tmp, 'T_5m.npz')) as saved:
+            assert pd.Timestamp(saved['times'][-1], tz='UTC') == sessions[-2][-1], "끝난 세션까지 저장되지 않음"
+
+        restarted = IntradayStore(tmp)
+        with restarted._lock:
+            restored = restarted._buffer('T', '5min')
+        assert len(restored) == 78 * 4 and str(restored.tz) == 'America/New_York'
+        intraday.flush()
+        with np.load(os.path.join(tmp, 'T_5m.npz')) as saved:
+            assert len(saved['times']) == len(bars), "종료 시 진행 중인 세션까지 저장되지 않음"
+        print(f"링 버퍼/증분 조회/세션 저장 확인: 조회 봉 수 {fetched[:3]}..., 복원 {len(restored)}봉")
+
+    # 가득 찬 1분봉 버퍼로 장중 재생: 10초마다 마지막 봉 교체, 1분마다 새 봉 추가(가장 오래된 봉은 밀려남).
+    # 지표 엔진이 봉이 추가될 때도 상태를 다시 만들지 않는지와 새로고침당 비용 확인
+    import sys
+    import time
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core import calculator, incremental
+
+    minutes = pd.date_range(f'{days[-1]:%Y-%m-%d} 09:30', periods=390, freq='1min', tz='America/New_York')
+    minutes = pd.date_range(end=minutes[0] - pd.Timedelta(days=1), periods=INTERVALS['1min'].capacity,
+                            freq='1min').append(minutes)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, len(minutes))))
+    bars = pd.DataFrame({'Open': close, 'High': close * 1.0005, 'Low': close * 0.9995, 'Close': close, 'Volume': 100.0},
+                        index=minutes.as_unit('ns'))
+    inputs = {'selected_ma_periods': ['MA5', 'MA20', 'MA60', 'EMA200'], 'show_bbands': True, 'show_rsi': True,
+              'show_macd': True, 'show_stoch': True, 'show_squeeze': True}
+    window = 200  # charting.CHART_BARS
+    with tempfile.TemporaryDirectory() as tmp:
+        live = {'stop': INTERVALS['1min'].capacity, 'tick': 0}
+
+        def live_fetch(ticker, interval, start):
+            part = bars.iloc[:live['stop']].copy()
+            part.iloc[-1, part.columns.get_loc('Close')] *= 1 + 0.0001 * live['tick']  # 진행 중인 봉
+            return part[part.index >= start]
+
+        intraday = IntradayStore(tmp)
+        test_engine = incremental.IncrementalIndicatorEngine()
+        test_engine.update('T@1min', intraday.update('T', '1min', live_fetch), inputs, window=window)
+        state = test_engine._states['T@1min']
+        timings = {'append': [], 'replace': []}
+        for stop in range(live['stop'] + 1, live['stop'] + 121):
+            for tick in range(6):
+                live.update(stop=stop, tick=tick)
+                started = time.perf_counter()
+                frame = intraday.update('T', '1min', live_fetch)
+                result = test_engine.update('T@1min', frame, inputs, window=window)
+                timings['replace' if tick else 'append'].append(time.perf_counter() - started)
+                assert test_engine._states['T@1min'] is state, f"{stop}번째 봉에서 지표 상태를 다시 만듦"
+        assert len(frame) == INTERVALS['1min'].capacity and frame.index[-1] == bars.index[stop - 1]
+        expected = calculator.calculate_all_indicators(frame, inputs, window=window)
+        assert np.allclose(result['MA_20'], expected['MA_20'], equal_nan=True)
+        print("1분봉 장중 재생 (가득 찬 버퍼, 지표 상태 재생성 없음): "
+              + ", ".join(f"{k} {np.median(v) * 1e3:.1f}ms" for k, v in timings.items()))
@@ -3,10 +3,14 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.kis_auth_class import KISAuth
+from data import manual_accounts, positions
 
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
 import pandas as pd
 import json
+import threading
+import time
 
 indexMapping = {
     "cblc_dvsn_name": "잔고구분명",
@@ -96,8 +100,32 @@ indexMapping = {
     "tot_loan_amt": "총대출금액"
 }
 
+# 잔고 응답 필드 → 표준 포지션 컬럼 (필드명은 indexMapping 기준)
+DOMESTIC_STOCK_FIELDS = {
+    "prdt_name": "name",        # 상품명
+    "pdno": "ticker",           # 상품번호
+    "hldg_qty": "quantity",     # 보유수량
+    "pchs_avg_pric": "avg_price"  # 매입평균가격
+}
+OVERSEA_STOCK_FIELDS = {
+    "prdt_name": "name",        # 상품명
+    "pdno": "ticker",           # 상품번호
+    "ccld_qty_smtl1": "quantity",  # 체결수량합계
+    "avg_unpr3": "avg_price"    # 평균단가
+}
+
+# 국내 시세 일괄 조회 설정
+DOMESTIC_QUOTE_TTL_SECONDS = 10  # 같은 종목은 10초 동안 캐시된 가격 사용
+DOMESTIC_QUOTE_MAX_WORKERS = 4   # 동시 요청 수
+
 class KISIntegration:
     def __init__(self):
+        # 국내 시세 캐시 (종목코드 -> (가격, 조회시각)) 및 호출 간격 제어
+        self._quote_cache = {}
+        self._quote_cache_lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+
         self.pension_auth = KISAuth("/home/jungmo/apps/visualize_stocks/private/pension_devlp.yaml") # 개인연금
         self.pension_auth.auth()
 
@@ -290,211 +318,44 @@ class KISIntegration:
 
         return current_data1, current_data2, current_data3
 
-    def _gold_inquire_balance(self) -> pd.DataFrame: # TODO: HARDCODED FOR GOLD
-
-        df1 = pd.DataFrame()
-        df1["prdt_name"] = ["KRX 금현물"]
-        df1["pdno"] = ["M04020000"]
-        df1["hldg_qty"] = [22]
-        df1["pchs_avg_pric"] = [int(3257430/22)]
-        df1["CANO"] = ["GOLD"]
-
-        df2 = pd.DataFrame()
-        df2["prvs_rcdl_excc_amt"] = [1341218]
-        df2["CANO"] = ["GOLD"]
-        return df1, df2
-    
-    def _ISA_inquire_balance(self) -> Tuple[pd.DataFrame, pd.DataFrame]: # TODO: HARDCODED FOR ISA
-
-        df1 = pd.DataFrame()
-        df1["prdt_name"] = ["TIGER 미국나스닥100"]
-        df1["pdno"] = ["133690"]
-        df1["hldg_qty"] = [101]
-        df1["pchs_avg_pric"] = [118144]
-        df1["CANO"] = ["ISA"]
-
-        df2 = pd.DataFrame()
-        df2["prvs_rcdl_excc_amt"] = [86297]
-        df2["CANO"] = ["ISA"]
-
-        return df1, df2
-
-    def get_balance(self, jsondump = False) -> dict:
-
+    def get_positions(self) -> pd.DataFrame:
+        """모든 KIS 계좌(및 ISA/금 수기 계좌)의 잔고를 표준 포지션 테이블로 반환합니다."""
         pension_stock, pension_deposit = self._pension_inquire_balance()
         irp_stock, irp_deposit = self._IRP_inquire_balance()
         normal_stock, normal_usd_deposit, normal_krw_deposit = self._normal_inquire_balance_oversea()
-        ISA_stock, ISA_deposit = self._ISA_inquire_balance()
-
-        ret = {}
-
-
-        # 퇴직연금 잔고 정보 처리
-        pension_stock_list = []
-        for _, row in pension_stock.iterrows():
-            stock_info = {
-                "name": row["prdt_name"],
-                "ticker": row["pdno"],
-                "quantity": float(row["hldg_qty"]),
-                "avg_price": float(row["pchs_avg_pric"]),
-                "currency": "KRW"  # 개인연금은 원화로 가정
-            }
-            pension_stock_list.append(stock_info)
-
-        pension_deposit_list = []
-        p = {
-            "name": "개인연금 예수금",
-            "ticker": "PENSION_DEPOSIT",
-            "quantity": 1,  # 예수금은 수량 개념이 없으므로 1로 설정
-            "avg_price": float(pension_deposit["prvs_rcdl_excc_amt"].values[0]),
-            "currency": "KRW"  # 예수금은 원화로 가정
-        }
-        pension_deposit_list.append(p)
-        ret[f'{self.pension_auth.getTREnv().my_acct}'] = {
-            "stock": pension_stock_list,
-            "deposit": pension_deposit_list
-        }
 
+        pension_acct = f'{self.pension_auth.getTREnv().my_acct}'
+        irp_acct = f'{self.IRP_auth.getTREnv().my_acct}'
+        normal_acct = f'{self.normal_auth.getTREnv().my_acct}'
+
+        def _first(df, col):
+            return float(df[col].values[0])
+
+        # 예수금은 수량 개념이 없으므로 수량 1, 금액을 평균단가로 설정
+        frames = [
+            # 개인연금 잔고 정보 처리
+            positions.normalize_positions(pension_stock, DOMESTIC_STOCK_FIELDS, pension_acct, "KRW", labels=indexMapping),
+            positions.deposit_positions(pension_acct, [
+                ("개인연금 예수금", "PENSION_DEPOSIT", 1, _first(pension_deposit, "prvs_rcdl_excc_amt"), "KRW")]),
+            # 퇴직연금 잔고 정보 처리
+            positions.normalize_positions(irp_stock, DOMESTIC_STOCK_FIELDS, irp_acct, "KRW", labels=indexMapping),
+            positions.deposit_positions(irp_acct, [
+                ("퇴직연금 예수금", "IRP_DEPOSIT", 1, _first(irp_deposit, "prvs_rcdl_excc_amt"), "KRW")]),
+            # ISA / 금 잔고 정보 처리 (API 미지원, 수기 계좌 파일에서 조회)
+            manual_accounts.provider.get_positions(["ISA", "GOLD"]),
+            # 해외주식 잔고 정보 처리
+            positions.normalize_positions(normal_stock, OVERSEA_STOCK_FIELDS, normal_acct, "USD", labels=indexMapping),
+            positions.deposit_positions(normal_acct, [
+                ("해외주식 예수금", "OVERSEA_DEPOSIT", 1, _first(normal_usd_deposit, "nxdy_frcr_drwg_psbl_amt"), "USD"),
+                ("해외주식 원화 예수금", "OVERSEA_KRW_DEPOSIT", 1,
+                 _first(normal_krw_deposit, "tot_dncl_amt") + _first(normal_krw_deposit, "ustl_sll_amt_smtl"), "KRW"),
+            ]),
+        ]
+        return positions.concat_positions(frames)
 
-        # 퇴직연금 잔고 정보 처리
-        irp_stock_list = []
-        for _, row in irp_stock.iterrows():
-            stock_info = {
-                "name": row["prdt_name"],
-                "ticker": row["pdno"],
-                "quantity": float(row["hldg_qty"]),
-                "avg_price": float(row["pchs_avg_pric"]),
-                "currency": "KRW"  # 개인연금은 원화로 가정
-            }
-            irp_stock_list.append(stock_info)
-
-        irp_deposit_list = []
-        p = {
-            "name": "퇴직연금 예수금",
-            "ticker": "IRP_DEPOSIT",
-            "quantity": 1,  # 예수금은 수량 개념이 없으므로 1로 설정
-            "avg_price": float(irp_deposit["prvs_rcdl_excc_amt"].values[0]),
-            "currency": "KRW"  # 예수금은 원화로 가정
-        }
-        irp_deposit_list.append(p)
-        ret[f'{self.IRP_auth.getTREnv().my_acct}'] = {
-            "stock": irp_stock_list,
-            "deposit": irp_deposit_list
-        }
-
-
-        # # 퇴직연금 잔고 정보 처리
-        # pension_stock_list = []
-        # for _, row in pension_stock.iterrows():
-        #     stock_info = {
-        #         "name": row["prdt_name"],
-        #         "ticker": row["pdno"],
-        #         "quantity": float(row["hldg_qty"]),
-        #         "avg_price": float(row["pchs_avg_pric"]),
-        #         "currency": "KRW"  # 퇴직연금은 원화로 가정
-        #     }
-        #     pension_stock_list.append(stock_info)
-
-        # pension_deposit_list = []
-        # p = {
-        #     "name": "퇴직연금 예수금",
-        #     "ticker": "PENSION_DEPOSIT",
-        #     "quantity": 1,  # 예수금은 수량 개념이 없으므로 1로 설정
-        #     "avg_price": float(pension_deposit["dnca_tot_amt"].values[0]),
-        #     "currency": "KRW"  # 예수금은 원화로 가정
-        # }
-        # pension_deposit_list.append(p)
-        # ret[f'{self.pension_auth.getTREnv().my_acct}'] = {
-        #     "stock": pension_stock_list,
-        #     "deposit": pension_deposit_list
-        # }
-
-        # ISA 잔고 정보 처리
-        isa_stock_list = []
-        for _, row in ISA_stock.iterrows():
-            stock_info = {
-                "name": row["prdt_name"],
-                "ticker": row["pdno"],
-                "quantity": float(row["hldg_qty"]),
-                "avg_price": float(row["pchs_avg_pric"]),
-                "currency": "KRW"  # ISA는 원화로 가정
-            }
-            isa_stock_list.append(stock_info)
-        isa_deposit_list = []
-        i = {
-            "name": "ISA 예수금",
-            "ticker": "ISA_DEPOSIT",
-            "quantity": 1,  # 예수금은 수량 개념이 없으므로 1로 설정
-            "avg_price": float(ISA_deposit["prvs_rcdl_excc_amt"].values[0]),
-            "currency": "KRW"  # 예수금은 원화로 가정
-        }
-        isa_deposit_list.append(i)
-
-        ret['ISA'] = {
-            "stock": isa_stock_list,
-            "deposit": isa_deposit_list
-        }
-
-        # 금 잔고 정보 처리
-        gold_stock, gold_deposit = self._gold_inquire_balance()
-        gold_stock_list = []
-        for _, row in gold_stock.iterrows():
-            stock_info = {
-                "name": row["prdt_name"],
-                "ticker": row["pdno"],
-                "quantity": float(row["hldg_qty"]),
-                "avg_price": float(row["pchs_avg_pric"]),
-                "currency": "KRW"  # 금은 원화로 가정
-            }
-            gold_stock_list.append(stock_info)
-        gold_deposit_list = []
-        g = {
-            "name": "금 예수금",
-            "ticker": "GOLD_DEPOSIT",
-            "quantity": 1,  # 예수금은 수량 개념이 없으므로 1로 설정
-            "avg_price": float(gold_deposit["prvs_rcdl_excc_amt"].values[0]),
-            "currency": "KRW"  # 예수금은 원화로 가정
-        }
-        gold_deposit_list.append(g)
-        ret['GOLD'] = {
-            "stock": gold_stock_list,
-            "deposit": gold_deposit_list
-        }
-
-        # 해외주식 잔고 정보 처리
-        normal_stock_list = []
-        normal_deposit_list = []
-        for _, row in normal_stock.iterrows():
-            stock_info = {
-                "name": row["prdt_name"],
-                "ticker": row["pdno"],
-                "quantity": float(row["ccld_qty_smtl1"]),
-                "avg_price": float(row["avg_unpr3"]),
-                "currency": "USD"  # 해외 주식은 달러로 가정
-            }
-            normal_stock_list.append(stock_info)
-
-        n1 = {
-            "name": "해외주식 예수금",
-            "ticker": "OVERSEA_DEPOSIT",
-            "quantity": 1,  # 예수금은 수량 개념이 없으므로 1로 설정
-            "avg_price": float(normal_usd_deposit["nxdy_frcr_drwg_psbl_amt"].values[0]),
-            "currency": "USD"  # 예수금은 달러로 가정
-        }
-        normal_deposit_list.append(n1)
-        n2 = {
-            "name": "해외주식 원화 예수금",
-            "ticker": "OVERSEA_KRW_DEPOSIT",
-            "quantity": 1,  # 예수금은 수량 개념이 없으므로 1로 설정
-            "avg_price": float(normal_krw_deposit["tot_dncl_amt"].values[0]) + float(normal_krw_deposit["ustl_sll_amt_smtl"].values[0]),
-            "currency": "KRW"  # 예수금은 원화로 가정
-        }
-        normal_deposit_list.append(n2)
-
-        ret[f'{self.normal_auth.getTREnv().my_acct}'] = {
-            "stock": normal_stock_list,
-            "deposit": normal_deposit_list
-        }
+    def get_balance(self, jsondump = False) -> dict:
+        """기존 잔고 딕셔너리 형태로 반환합니다. (JSON 백업용)"""
+        ret = positions.positions_to_balance(self.get_positions())
 
         with open("private/balance.json", "w", encoding="utf-8") as f:
             json.dump(ret, f, ensure_ascii=False, indent=2)
@@ -547,6 +408,58 @@ class KISIntegration:
             return pd.DataFrame() 
         
     
+    def _throttle(self):
+        """KIS 유량 제한을 넘지 않도록 요청 시작 시각을 smartSleep 간격으로 벌립니다."""
+        interval = self.normal_auth._smartSleep
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _fetch_domestic_price(self, code: str) -> Optional[float]:
+        self._throttle()
+        try:
+            quote = self.get_stock_info_domestic(code)
+        except Exception as e:
+            print(f"국내 시세 조회 실패 ({code}): {e}")
+            return None
+        if quote.empty or "stck_prpr" not in quote.columns:
+            return None
+        price = float(quote["stck_prpr"].iloc[0])
+        return price if price > 0 else None
+
+    def get_domestic_prices(self, codes: Iterable[str], ttl: float = DOMESTIC_QUOTE_TTL_SECONDS) -> Dict[str, float]:
+        """
+        여러 국내 종목(금현물 M04020000 포함)의 현재가를 한 번에 조회합니다.
+        캐시가 유효한 종목은 재조회하지 않고, 나머지는 유량 제한 안에서 동시에 조회합니다.
+
+        Returns:
+            dict: 종목코드 -> 현재가 (조회 실패한 종목은 제외)
+        """
+        codes = list(dict.fromkeys(codes))
+        now = time.monotonic()
+        prices = {}
+        with self._quote_cache_lock:
+            for code in codes:
+                cached = self._quote_cache.get(code)
+                if cached is not None and now - cached[1] <= ttl:
+                    prices[code] = cached[0]
+        missing = [code for code in codes if code not in prices]
+
+        if missing:
+            workers = min(DOMESTIC_QUOTE_MAX_WORKERS, len(missing))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                fetched = dict(zip(missing, pool.map(self._fetch_domestic_price, missing)))
+            fetched_at = time.monotonic()
+            with self._quote_cache_lock:
+                for code, price in fetched.items():
+                    if price is not None:
+                        self._quote_cache[code] = (price, fetched_at)
+                        prices[code] = price
+        return prices
+
     def get_stock_info_oversea(self, ticker):
         # 해외 주식 티커에 대한 정보를 가져오는 메서드
         return self.normal_auth.get_stock_info(ticker)
@@ -0,0 +1,111 @@
+"""
+API로 조회할 수 없는 수기 관리 계좌(ISA, 금현물, DC 등)의 잔고 제공자.
+
+모든 수기 계좌는 하나의 CSV 파일(private/manual_accounts.csv)에 포지션 테이블 형태로 기록합니다.
+
+    account_id,kind,name,ticker,quantity,avg_price,currency
+    ISA,stock,TIGER 미국나스닥100,133690,101,118144,KRW
+    ISA,deposit,ISA 예수금,ISA_DEPOSIT,1,86297,KRW
+
+예수금은 다른 계좌와 같이 수량 1, 평균단가에 금액을 기록합니다.
+파일은 한 번만 파싱하고, 수정 시각(mtime)이 바뀐 경우에만 다시 읽습니다.
+파일이 없으면 처음 읽을 때 기존 잔고(migrate_legacy_accounts)로 한 번 만들어 둡니다.
+"""
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from data import positions
+
+MANUAL_ACCOUNTS_PATH = "private/manual_accounts.csv"
+LEGACY_DC_BALANCE_PATH = "private/dc_balance.csv"
+
+# 기존에 kis_integration.py에 하드코딩되어 있던 ISA/금 잔고 (수기 계좌 파일을 처음 만들 때만 사용)
+LEGACY_POSITIONS = [
+    ('ISA', 'stock', 'TIGER 미국나스닥100', '133690', 101, 118144, 'KRW'),
+    ('ISA', 'deposit', 'ISA 예수금', 'ISA_DEPOSIT', 1, 86297, 'KRW'),
+    ('GOLD', 'stock', 'KRX 금현물', 'M04020000', 22, int(3257430 / 22), 'KRW'),
+    ('GOLD', 'deposit', '금 예수금', 'GOLD_DEPOSIT', 1, 1341218, 'KRW'),
+]
+
+_cache = {}  # path -> ((mtime_ns, size), positions DataFrame)
+_cache_lock = threading.Lock()
+
+
+def _read_positions(path):
+    df = pd.read_csv(path, dtype={'ticker': str, 'account_id': str})
+    return positions.concat_positions([df[positions.POSITION_COLUMNS]])
+
+
+class ManualAccountProvider:
+    """수기 계좌 파일을 mtime 기준으로 캐시하여 포지션/잔고를 제공합니다."""
+
+    def __init__(self, path=MANUAL_ACCOUNTS_PATH):
+        self.path = path
+
+    def _load(self):
+        with _cache_lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                # 기존 배포에서 처음 실행될 때: 템플릿으로 파일을 만들어 두고 이후에는 그 파일을 읽습니다.
+                migrate_legacy_accounts(self.path)
+                stat = os.stat(self.path)
+            key = (stat.st_mtime_ns, stat.st_size)
+            cached = _cache.get(self.path)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            df = _read_positions(self.path)
+            _cache[self.path] = (key, df)
+            return df
+
+    def get_positions(self, account_ids=None):
+        """
+        수기 계좌의 포지션 테이블을 반환합니다.
+
+        Args:
+            account_ids: 특정 계좌만 조회할 경우 계좌 ID 목록 (None이면 전체)
+        """
+        df = self._load()
+        if account_ids is not None:
+            df = df[df['account_id'].isin(list(account_ids))]
+        return df.copy()
+
+    def get_balance(self, account_ids=None):
+        """기존 잔고 딕셔너리 형태로 반환합니다."""
+        return positions.positions_to_balance(self.get_positions(account_ids))
+
+
+def migrate_legacy_accounts(path=MANUAL_ACCOUNTS_PATH, dc_path=LEGACY_DC_BALANCE_PATH):
+    """
+    기존에 코드에 하드코딩되어 있던 ISA/금 잔고(LEGACY_POSITIONS)와 dc_balance.csv를 수기 계좌 파일로 옮깁니다.
+    수기 계좌 파일이 이미 있으면 아무 것도 하지 않습니다.
+    """
+    if os.path.exists(path):
+        print(f"이미 존재합니다: {path}")
+        return
+
+    frames = [pd.DataFrame(LEGACY_POSITIONS, columns=positions.POSITION_COLUMNS)]
+    if os.path.exists(dc_path):
+        dc = pd.read_csv(dc_path, dtype={'ticker': str})
+        dc['account_id'] = 'DC'
+        dc['kind'] = dc['ticker'].eq('DC_DEPOSIT').map({True: 'deposit', False: 'stock'})
+        # 기존 DC 예수금은 수량에 금액을 기록했으므로 다른 예수금과 같이 수량 1, 평균단가 = 금액으로 바꿉니다.
+        deposit = dc['kind'] == 'deposit'
+        dc.loc[deposit, 'avg_price'] = dc.loc[deposit, 'quantity'].astype(float)
+        dc.loc[deposit, ['name', 'currency', 'quantity']] = ['DC 예수금', 'KRW', 1.0]
+        frames.append(dc[positions.POSITION_COLUMNS])
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    positions.concat_positions(frames).to_csv(path, index=False)
+    print(f"수기 계좌 파일을 생성했습니다: {path}")
+
+
+provider = ManualAccountProvider()
+
+if __name__ == "__main__":
+    migrate_legacy_accounts()
+    print(provider.get_balance())
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yfinance as yf
+
+# --- 종목 메타데이터(이름/통화/거래소/유형) 디스크 캐시 설정 ---
+METADATA_PATH = os.path.join("cache", "metadata.json")
+METADATA_TTL_SECONDS = 7 * 24 * 3600  # 메타데이터는 거의 바뀌지 않으므로 7일간 사용
+METADATA_RETRY_SECONDS = 600  # 조회 실패한 티커는 10분 뒤에 다시 시도
+METADATA_REFRESH_WORKERS = 4
+
+
+def _default_metadata(ticker):
+    """아직 조회되지 않은 티커에 대해 즉시 돌려줄 기본값."""
+    currency = 'KRW' if ticker.upper().endswith(('.KS', '.KQ')) else 'USD'
+    return {'name': ticker, 'currency': currency, 'exchange': '', 'type': ''}
+
+
+def _fetch_metadata(ticker):
+    """yf.Ticker.info에서 필요한 필드만 추려옵니다. (느린 호출이므로 백그라운드에서만 사용)"""
+    info = yf.Ticker(ticker).info or {}
+    default = _default_metadata(ticker)
+    return {
+        'name': info.get('longName') or info.get('shortName') or default['name'],
+        'currency': info.get('currency') or default['currency'],
+        'exchange': info.get('exchange') or '',
+        'type': info.get('quoteType') or '',
+    }
+
+
+class MetadataStore:
+    """
+    종목 메타데이터를 JSON 파일에 보관하는 캐시입니다.
+    조회(get)는 절대 네트워크를 기다리지 않습니다. 없거나 오래된 항목은
+    캐시값(또는 기본값)을 먼저 돌려주고 백그라운드에서 갱신합니다.
+    """
+
+    def __init__(self, path=METADATA_PATH, ttl_seconds=METADATA_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._entries = None  # ticker -> {..., 'fetched_at': epoch}
+        self._failed_at = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=METADATA_REFRESH_WORKERS,
+                                            thread_name_prefix='metadata')
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _needs_refresh(self, ticker, now):
+        entry = self._entries.get(ticker)
+        if entry is not None and now - entry.get('fetched_at', 0) <= self.ttl_seconds:
+            return False
+        if ticker in self._pending:
+            return False
+        return now - self._failed_at.get(ticker, 0) > METADATA_RETRY_SECONDS
+
+    def _schedule(self, tickers):
+        """갱신이 필요한 티커만 골라 백그라운드 작업으로 넘깁니다. (lock 안에서 호출)"""
+        now = time.time()
+        for ticker in tickers:
+            if self._needs_refresh(ticker, now):
+                self._pending.add(ticker)
+                self._executor.submit(self.refresh, ticker)
+
+    def get(self, ticker):
+        """캐시된 메타데이터를 즉시 반환합니다. 필요하면 백그라운드 갱신을 예약합니다."""
+        with self._lock:
+            entries = self._load()
+            self._schedule([ticker])
+            entry = entries.get(ticker)
+        if entry is None:
+            return _default_metadata(ticker)
+        return {k: v for k, v in entry.items() if k != 'fetched_at'}
+
+    def warm(self, tickers):
+        """보유/관심 종목 전체의 메타데이터를 백그라운드에서 미리 채웁니다."""
+        with self._lock:
+            self._load()
+            self._schedule(dict.fromkeys(tickers))
+
+    def refresh(self, ticker):
+        """한 티커의 메타데이터를 동기적으로 다시 조회해 저장합니다."""
+        try:
+            metadata = _fetch_metadata(ticker)
+        except Exception as e:
+            print(f"Failed to fetch metadata for {ticker}: {e}")
+            with self._lock:
+                self._failed_at[ticker] = time.time()
+                self._pending.discard(ticker)
+            return None
+
+        with self._lock:
+            self._load()[ticker] = {**metadata, 'fetched_at': time.time()}
+            self._pending.discard(ticker)
+            self._failed_at.pop(ticker, None)
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Failed to save metadata cache: {e}")
+        return metadata
+
+
+store = MetadataStore()
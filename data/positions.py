@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+# 모든 계좌 소스(KIS/업비트/DC/수기 계좌)가 공통으로 사용하는 포지션 테이블 스키마
+POSITION_DTYPES = {
+    'account_id': str,
+    'kind': str,        # 'stock' | 'deposit' | 'crypto' (기존 잔고 딕셔너리의 키와 동일)
+    'name': str,
+    'ticker': str,
+    'quantity': 'float64',
+    'avg_price': 'float64',
+    'currency': str,
+}
+POSITION_COLUMNS = list(POSITION_DTYPES)
+
+
+def empty_positions():
+    """스키마만 갖춘 빈 포지션 테이블을 반환합니다."""
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in POSITION_DTYPES.items()})
+
+
+def normalize_positions(df, field_map, account_id, currency, kind='stock', labels=None):
+    """
+    API 응답 DataFrame을 컬럼 이름 변경과 astype만으로 표준 포지션 테이블로 변환합니다.
+
+    Args:
+        df: 원본 응답 DataFrame (값이 문자열이어도 됨)
+        field_map: 원본 필드명 → 표준 컬럼명 ('name', 'ticker', 'quantity', 'avg_price')
+        account_id: 계좌 식별자
+        currency: 통화 코드. 문자열이면 전체 행에 적용, 원본 필드명이면 해당 컬럼 사용
+        kind: 포지션 종류
+        labels: 필드명 → 표시명 매핑 (누락 필드 오류 메시지용, 예: KIS indexMapping)
+    """
+    if df is None or df.empty:
+        return empty_positions()
+
+    missing = [field for field in field_map if field not in df.columns]
+    if missing:
+        labels = labels or {}
+        names = ', '.join(f"{f}({labels[f]})" if f in labels else f for f in missing)
+        raise KeyError(f"응답에 필요한 필드가 없습니다: {names}")
+
+    out = df[list(field_map)].rename(columns=field_map)
+    out['account_id'] = account_id
+    out['kind'] = kind
+    out['currency'] = df[currency].values if currency in df.columns else currency
+    return out[POSITION_COLUMNS].astype(POSITION_DTYPES).reset_index(drop=True)
+
+
+def deposit_positions(account_id, deposits):
+    """
+    예수금 항목들을 포지션 테이블로 변환합니다.
+
+    Args:
+        account_id: 계좌 식별자
+        deposits: (name, ticker, quantity, avg_price, currency) 튜플 목록
+    """
+    if not deposits:
+        return empty_positions()
+    out = pd.DataFrame(deposits, columns=['name', 'ticker', 'quantity', 'avg_price', 'currency'])
+    out['account_id'] = account_id
+    out['kind'] = 'deposit'
+    return out[POSITION_COLUMNS].astype(POSITION_DTYPES)
+
+
+def concat_positions(frames):
+    """여러 소스의 포지션 테이블을 하나로 합칩니다."""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return empty_positions()
+    return pd.concat(frames, ignore_index=True).astype(POSITION_DTYPES)
+
+
+def positions_to_balance(positions):
+    """
+    포지션 테이블을 기존 잔고 딕셔너리 형태({계좌: {'stock': [...], 'deposit': [...]}})로 변환합니다.
+    JSON 백업 저장 등 딕셔너리 형태가 꼭 필요한 곳에서만 사용합니다.
+    """
+    ret = {}
+    record_cols = ['name', 'ticker', 'quantity', 'avg_price', 'currency']
+    for (account_id, kind), group in positions.groupby(['account_id', 'kind'], sort=False):
+        ret.setdefault(account_id, {})[kind] = group[record_cols].to_dict('records')
+    return ret
+
+
+def to_portfolio_frame(positions, asset_classification):
+    """
+    포지션 테이블에 자산 분류와 매입금액을 벡터 연산으로 추가합니다.
+    (기존 process_portfolio_data의 행 단위 루프를 대체)
+    """
+    df = positions.copy()
+    kind = df['kind']
+    is_krw_crypto = (kind == 'crypto') & (df['ticker'] == 'KRW')
+    classified = df['ticker'].map(asset_classification)
+
+    df['asset_type'] = np.select(
+        [
+            kind == 'stock',
+            (kind == 'deposit') & df['currency'].isin(['KRW', 'USD']),
+            kind == 'deposit',
+            is_krw_crypto,
+        ],
+        [
+            classified.fillna('주식'),
+            df['currency'],
+            '현금',
+            'KRW',
+        ],
+        default=classified.fillna('암호화폐'),
+    )
+    df['original_type'] = np.select(
+        [kind == 'stock', (kind == 'deposit') | is_krw_crypto],
+        ['주식', '현금'],
+        default='암호화폐',
+    )
+    df['total_purchase'] = df['quantity'] * df['avg_price']
+    return df.drop(columns='kind')
@@ -0,0 +1,364 @@
+"""
+스퀴즈 모멘텀 / RSI 다이버전스 신호 이력 저장소 (SQLite).
+
+일봉 캐시를 갱신할 때(fetcher) 새로 들어온 봉 구간의 신호만 계산해 cache/signals.db에 쌓아 둡니다.
+'지난 1년 동안 몇 번 발생했나', '최근 N일 안에 신호가 난 종목' 같은 조회는 전체 이력을 다시
+계산하지 않고 인덱스를 타는 SELECT 한 번으로 끝납니다. (일봉 캐시에서 언제든 다시 만들 수 있는 파생 데이터이므로
+포트폴리오 DB와 분리된 사이드카 파일로 둡니다)
+
+테이블:
+- signals(ticker, date, signal_type, value): 신호 한 건당 한 행. 기본 키 (ticker, date, signal_type)가
+  종목별 조회 인덱스를 겸하고, (signal_type, date) 인덱스로 신호 종류/기간 조회를 합니다.
+- signal_state(ticker, through, last_bar): 종목별로 신호를 저장한 마지막 봉 날짜와 그 봉의 값.
+아직 장이 끝나지 않은 봉은 계속 바뀌므로 저장하지 않고, 거래소 현지 시각으로 장 마감이 지난 봉만 저장합니다.
+(한국 시간 자정이 지나도 미국 일봉은 뉴욕 16시 마감 전까지 진행 중입니다)
+진행 중인 봉의 신호가 필요하면 live_signals로 그때그때 계산합니다.
+through 날짜와 그 봉의 값이 그대로면 (같은 봉을 다시 받아 쓴 자동 새로고침) 아무것도 하지 않고,
+바뀌었으면 through 봉부터 다시 계산해 덮어씁니다. (through보다 앞선 봉의 신호는 다시 쓰지 않습니다)
+"""
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import calculator, signals
+
+DB_FILE_PATH = os.path.join("cache", "signals.db")
+
+# 저장하는 신호 종류 -> 설명 (value 컬럼에 들어가는 값)
+SIGNAL_TYPES = {
+    'SQZ_FIRED': '스퀴즈 해제 (ON -> OFF, 모멘텀)',
+    'SQZ_BUY': '스퀴즈 매수 신호 (모멘텀)',
+    'SQZ_SELL': '스퀴즈 매도 신호 (모멘텀)',
+    'BULL_DIV': 'RSI 상승 다이버전스 확정 (피벗 RSI)',
+    'BEAR_DIV': 'RSI 하락 다이버전스 확정 (피벗 RSI)',
+}
+SQUEEZE_PARAMS = {'bb_length': 20, 'kc_length': 20, 'kc_mult': 1.5, 'use_tr': True}
+DIVERGENCE_PARAMS = {'rsi_length': 14, 'left': 5, 'right': 5, 'min_range': 5, 'max_range': 60}
+HISTORY_COLUMNS = ['Ticker', 'Date', 'Signal', 'Value']
+
+# 거래소 -> (시간대, 장 마감 시각). 일봉 D는 거래소 현지 시각으로 D일 장 마감 이후에 확정됩니다.
+EXCHANGE_SESSIONS = {
+    'KR': ('Asia/Seoul', pd.Timedelta(hours=15, minutes=30)),
+    'US': ('America/New_York', pd.Timedelta(hours=16)),
+    'CRYPTO': ('UTC', pd.Timedelta(days=1)),  # 24시간 거래, UTC 날짜 단위 일봉
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    signal_type TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (ticker, date, signal_type)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_signals_type_date ON signals (signal_type, date);
+CREATE TABLE IF NOT EXISTS signal_state (
+    ticker TEXT PRIMARY KEY,
+    through TEXT NOT NULL,
+    last_bar TEXT
+);
+"""
+
+
+def warmup_bars():
+    """신호 계산 구간 앞에 필요한 봉 수 (지표 워밍업 + 직전 봉 비교 / 직전 피벗 탐색 구간)."""
+    squeeze = calculator.warmup_bars([('SQUEEZE', tuple(sorted(SQUEEZE_PARAMS.items())))]) + 1
+    p = DIVERGENCE_PARAMS
+    divergence = calculator.warmup_bars([('RSI', (('length', p['rsi_length']),))]) + p['left'] + p['right'] + p['max_range'] + 1
+    return max(squeeze, divergence)
+
+
+def detect_signals(df, start=0):
+    """
+    df의 start번째 봉부터 마지막 봉까지의 신호를 찾습니다.
+    지표는 start 앞의 워밍업 구간을 포함한 꼬리 구간만으로 계산합니다.
+
+    Returns:
+        DataFrame: Date, Signal, Value 컬럼 (Date 오름차순)
+    """
+    begin = max(0, start - warmup_bars())
+    part = df.iloc[begin:]
+    high, low, close = (part[c].to_numpy(dtype=float) for c in ['High', 'Low', 'Close'])
+    sqz = signals.squeeze_with_signals(high, low, close, **SQUEEZE_PARAMS)
+    div = signals.rsi_divergence_signals(high, low, close, **DIVERGENCE_PARAMS)
+    pivot_rsi = signals._shift(div['RSI'], DIVERGENCE_PARAMS['right'], np.nan)
+    fired = signals._previous(np.asarray(sqz['SQZ_ON_CUSTOM'], dtype=bool), False) & np.asarray(sqz['SQZ_OFF_CUSTOM'], dtype=bool)
+    columns = {
+        'SQZ_FIRED': (fired, sqz['SQZ_VAL_CUSTOM']),
+        'SQZ_BUY': (sqz['SQZ_BUY'], sqz['SQZ_VAL_CUSTOM']),
+        'SQZ_SELL': (sqz['SQZ_SELL'], sqz['SQZ_VAL_CUSTOM']),
+        'BULL_DIV': (div['BULL_DIV_CONFIRMED'], pivot_rsi),
+        'BEAR_DIV': (div['BEAR_DIV_CONFIRMED'], pivot_rsi),
+    }
+    offset = start - begin
+    dates = part.index[offset:].astype('datetime64[ns]')
+    found = [pd.DataFrame({'Date': dates[flags[offset:]], 'Signal': name, 'Value': np.asarray(values)[offset:][flags[offset:]]})
+             for name, (flags, values) in columns.items()]
+    return pd.concat(found, ignore_index=True).sort_values('Date', kind='stable', ignore_index=True)
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def exchange_session(ticker):
+    """티커가 거래되는 거래소의 EXCHANGE_SESSIONS 키. (접미사로 판단, 그 밖은 미국)"""
+    ticker = ticker.upper()
+    if ticker.endswith(('.KS', '.KQ')) or ticker.startswith(('^KS', '^KQ')):
+        return 'KR'
+    if ticker.endswith(('-USD', '-USDT', '-KRW')) or ticker.startswith('KRW-'):
+        return 'CRYPTO'
+    return 'US'
+
+
+def finalized_bars(df, ticker, as_of=None):
+    """
+    거래소 현지 시각으로 장 마감이 지난(확정된) 일봉만 반환합니다.
+
+    Args:
+        as_of: 기준 시각 (기본값: 현재). tz가 없으면 거래소 현지 시각으로 봅니다.
+    """
+    tz, close = EXCHANGE_SESSIONS[exchange_session(ticker)]
+    now = pd.Timestamp.now(tz='UTC') if as_of is None else pd.Timestamp(as_of)
+    now = now.tz_convert(tz) if now.tzinfo is not None else now.tz_localize(tz)
+    last_final = (now - close).tz_localize(None).normalize()
+    return df.iloc[:int(df.index.searchsorted(last_final, side='right'))]
+
+
+def _bar_key(df):
+    """마지막 봉의 값. 저장된 값과 같으면 다시 계산하지 않습니다."""
+    return ','.join(repr(float(v)) for v in df[['Open', 'High', 'Low', 'Close']].iloc[-1])
+
+
+def live_signals(frames, signal_types=None, as_of=None):
+    """
+    진행 중인 세션 봉(저장하지 않는 봉)의 신호를 {티커: 일봉}에서 바로 계산합니다.
+
+    Returns:
+        DataFrame: HISTORY_COLUMNS (최신순)
+    """
+    found = []
+    for ticker, df in frames.items():
+        if df is None or df.empty:
+            continue
+        start = len(finalized_bars(df, ticker, as_of))
+        if start < len(df):
+            found.append(detect_signals(df, start).assign(Ticker=ticker))
+    if not found:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    found = pd.concat(found, ignore_index=True)[HISTORY_COLUMNS]
+    if signal_types is not None:
+        found = found[found['Signal'].isin(list(signal_types))]
+    return found.sort_values(['Date', 'Ticker', 'Signal'], ascending=[False, True, True], ignore_index=True)
+
+
+class SignalHistoryStore:
+    """
+    종목별 신호 이력을 SQLite 파일에 보관하는 저장소입니다.
+    update는 캐시 갱신 때마다 호출되며, 확정된 봉이 바뀌었을 때만 through 봉 이후 구간을
+    한 트랜잭션으로 다시 씁니다.
+    """
+
+    def __init__(self, db_path=DB_FILE_PATH):
+        self.db_path = db_path
+        self._initialized = False
+        self._state = {}  # ticker -> 저장된 (through, last_bar). 바뀌지 않은 갱신은 DB를 열지 않습니다.
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            with closing(sqlite3.connect(self.db_path)) as conn:
+                conn.executescript(_SCHEMA)
+                columns = {r[1] for r in conn.execute("PRAGMA table_info(signal_state)")}
+                if 'last_bar' not in columns:  # last_bar 컬럼 이전에 만든 파일
+                    conn.execute("ALTER TABLE signal_state ADD COLUMN last_bar TEXT")
+                    conn.commit()
+            self._initialized = True
+        return closing(sqlite3.connect(self.db_path))
+
+    def _update_locked(self, conn, ticker, df):
+        """
+        lock/트랜잭션 안에서 호출. 확정된 봉(df)이 저장된 상태와 다르면 through 봉부터 마지막 봉까지의
+        신호를 다시 씁니다.
+
+        Returns:
+            bool: 다시 썼으면 True
+        """
+        state = (_day(df.index[-1]), _bar_key(df))
+        row = conn.execute("SELECT through, last_bar FROM signal_state WHERE ticker = ?", (ticker,)).fetchone()
+        if row is not None and tuple(row) == state:
+            self._state[ticker] = state
+            return False
+        start = 0 if row is None else min(int(df.index.searchsorted(pd.Timestamp(row[0]))), len(df) - 1)
+        found = detect_signals(df, start)
+        conn.execute("DELETE FROM signals WHERE ticker = ? AND date >= ?", (ticker, _day(df.index[start])))
+        conn.executemany(
+            "INSERT INTO signals (ticker, date, signal_type, value) VALUES (?, ?, ?, ?)",
+            [(ticker, _day(d), s, None if pd.isna(v) else float(v)) for d, s, v in found.itertuples(index=False)])
+        conn.execute("INSERT OR REPLACE INTO signal_state (ticker, through, last_bar) VALUES (?, ?, ?)", (ticker,) + state)
+        self._state[ticker] = state
+        return True
+
+    def update(self, ticker, df, as_of=None):
+        """
+        확정된 봉(finalized_bars) 구간에서 새로 확정되거나 바뀐 봉의 신호를 계산해 저장합니다.
+
+        Returns:
+            bool: 저장소를 다시 썼으면 True
+        """
+        if df is None:
+            return False
+        df = finalized_bars(df, ticker, as_of)
+        if df.empty:
+            return False
+        with self._lock:
+            if self._state.get(ticker) == (_day(df.index[-1]), _bar_key(df)):
+                return False
+            with self._connect() as conn, conn:
+                return self._update_locked(conn, ticker, df)
+
+    def backfill(self, frames, as_of=None):
+        """저장소에 아직 없는 종목만 {티커: 일봉} 캐시 데이터의 확정된 봉으로 채웁니다. (한 트랜잭션)"""
+        with self._lock, self._connect() as conn, conn:
+            known = {t for (t,) in conn.execute("SELECT ticker FROM signal_state")}
+            for ticker, df in frames.items():
+                if ticker not in known and df is not None:
+                    df = finalized_bars(df, ticker, as_of)
+                    if not df.empty:
+                        self._update_locked(conn, ticker, df)
+
+    def _query(self, sql, params):
+        with self._lock, self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    @staticmethod
+    def _filters(tickers=None, signal_types=None, start=None, end=None):
+        """WHERE 절과 파라미터. signal_type/date 조건은 (signal_type, date) 인덱스, ticker 조건은 기본 키를 탑니다."""
+        clauses, params = [], []
+        for column, values in [('signal_type', signal_types), ('ticker', tickers)]:
+            if values is not None:
+                values = list(values)
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})" if values else "0")
+                params += values
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(_day(start))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(_day(end))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def history(self, tickers=None, signal_types=None, start=None, end=None):
+        """
+        조건에 맞는 신호를 최신순으로 반환합니다.
+
+        Args:
+            tickers: 티커 목록 (None이면 전체)
+            signal_types: SIGNAL_TYPES 키 목록 (None이면 전체)
+            start, end: 날짜 범위 (양 끝 포함, None이면 제한 없음)
+
+        Returns:
+            DataFrame: HISTORY_COLUMNS
+        """
+        where, params = self._filters(tickers, signal_types, start, end)
+        found = self._query(
+            f"SELECT ticker AS Ticker, date AS Date, signal_type AS Signal, value AS Value FROM signals{where} "
+            "ORDER BY date DESC, ticker, signal_type", params)
+        found['Date'] = pd.to_datetime(found['Date'])
+        return found
+
+    def recent(self, days, tickers=None, signal_types=None, as_of=None):
+        """최근 days일(달력 기준, as_of 포함) 안에 발생한 신호를 최신순으로 반환합니다. (as_of 기본값: 오늘)"""
+        as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now()).normalize()
+        return self.history(tickers, signal_types, start=as_of - pd.Timedelta(days=days - 1), end=as_of)
+
+    def counts(self, tickers=None, signal_types=None, start=None, end=None):
+        """
+        종목별 신호 발생 횟수와 마지막 발생일을 반환합니다. ('지난 1년 동안 몇 번 발생했나')
+
+        Returns:
+            DataFrame: 티커 인덱스, 신호 종류별 횟수 컬럼 + 신호 종류별 'Last …' 날짜 컬럼
+        """
+        where, params = self._filters(tickers, signal_types, start, end)
+        found = self._query(
+            f"SELECT ticker AS Ticker, signal_type AS Signal, COUNT(*) AS Count, MAX(date) AS Last "
+            f"FROM signals{where} GROUP BY signal_type, ticker", params)
+        types = list(SIGNAL_TYPES) if signal_types is None else list(signal_types)
+        count = found.pivot(index='Ticker', columns='Signal', values='Count').reindex(columns=types).fillna(0).astype(int)
+        last = found.assign(Last=pd.to_datetime(found['Last'])) \
+            .pivot(index='Ticker', columns='Signal', values='Last').reindex(columns=types)
+        last.columns = [f'Last {s}' for s in types]
+        table = count.join(last)
+        if tickers is not None:
+            table = table.reindex(list(dict.fromkeys(tickers)))
+            table[types] = table[types].fillna(0).astype(int)
+        table.index.name = 'Ticker'
+        table.columns.name = None
+        return table
+
+
+store = SignalHistoryStore()
+
+
+if __name__ == "__main__":
+    # 증분 갱신(진행 중인 봉 제외, 같은 봉 재기록 생략)이 전체 계산과 같은지 확인 (python data/signal_history.py)
+    import tempfile
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 1500
+    c = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    h = c * (1 + np.abs(rng.normal(0, 0.01, n)))
+    l = c * (1 - np.abs(rng.normal(0, 0.01, n)))
+    df = pd.DataFrame({'Open': c, 'High': h, 'Low': l, 'Close': c, 'Volume': 1e6}, index=pd.bdate_range('2019-01-01', periods=n))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        full, incremental = SignalHistoryStore(os.path.join(tmp, 'full.db')), SignalHistoryStore(os.path.join(tmp, 'inc.db'))
+        full.update('T', df, as_of=df.index[-1] + pd.Timedelta(days=1))
+        started = time.perf_counter()
+        incremental.update('T', df.iloc[:1000], as_of=df.index[999])
+        writes = 0
+        for stop in range(1001, n + 1):
+            today = df.index[stop - 1]
+            # 같은 세션 안의 자동 새로고침: 진행 중인 봉만 바뀜. 뉴욕 장중, 그리고 한국 시간 자정 이후지만
+            # 뉴욕 마감(16시) 전인 시각 (서머타임 여부와 무관하게 02:00, 04:30 KST는 뉴욕 장중)
+            next_day = f'{today + pd.Timedelta(days=1):%Y-%m-%d}'
+            ticks = [today + pd.Timedelta(hours=10),
+                     pd.Timestamp(f'{next_day} 02:00', tz='Asia/Seoul'), pd.Timestamp(f'{next_day} 04:30', tz='Asia/Seoul')]
+            for tick, as_of in enumerate(ticks):
+                partial = df.iloc[:stop].copy()
+                partial.iloc[-1, partial.columns.get_loc('Close')] *= 1 + 0.01 * tick
+                writes += incremental.update('T', partial, as_of=as_of)
+            assert incremental.history(start=today).empty, "진행 중인 봉의 신호가 저장됨"
+        writes += incremental.update('T', df, as_of=df.index[-1] + pd.Timedelta(days=1))  # 마지막 봉 확정
+        print(f"증분 갱신 {3 * (n - 1000) + 1}회 중 저장소 기록 {writes}회: {time.perf_counter() - started:.2f}초")
+        assert writes == n - 999, writes  # 새로 확정된 봉마다 한 번 (처음 갱신 때 확정 구간은 999봉)
+
+        a, b = full.history(), incremental.history()
+        assert a[['Ticker', 'Date', 'Signal']].equals(b[['Ticker', 'Date', 'Signal']]), (len(a), len(b))
+        assert np.allclose(a['Value'], b['Value'], atol=1e-2, equal_nan=True)  # RSI는 워밍업 구간만큼의 근사 오차
+        print(f"전체 계산과 일치: {len(a)}건")
+
+        # 장 마감 기준은 티커의 거래소 현지 시각
+        day = df.index[-1]
+        next_day = f'{day + pd.Timedelta(days=1):%Y-%m-%d}'
+        for ticker, as_of, final in [('T', pd.Timestamp(f'{next_day} 03:00', tz='Asia/Seoul'), False),
+                                     ('T', pd.Timestamp(f'{next_day} 07:00', tz='Asia/Seoul'), True),
+                                     ('005930.KS', pd.Timestamp(f'{day:%Y-%m-%d} 15:00', tz='Asia/Seoul'), False),
+                                     ('005930.KS', pd.Timestamp(f'{day:%Y-%m-%d} 15:30', tz='Asia/Seoul'), True),
+                                     ('BTC-USD', pd.Timestamp(f'{day:%Y-%m-%d} 23:59', tz='UTC'), False),
+                                     ('BTC-USD', pd.Timestamp(f'{next_day} 00:00', tz='UTC'), True)]:
+            assert (finalized_bars(df, ticker, as_of).index[-1] == day) == final, (ticker, as_of)
+
+        live = live_signals({'T': df}, as_of=df.index[-300])
+        assert live['Date'].min() >= df.index[-300]
+        assert live[['Date', 'Signal']].reset_index(drop=True).equals(
+            a[a['Date'] >= df.index[-300]][['Date', 'Signal']].reset_index(drop=True)), "진행 중인 봉 신호 불일치"
+        print(full.counts(start=df.index[-252]))
+        print(full.recent(30, as_of=df.index[-1]).head())
@@ -0,0 +1,130 @@
+"""
+일봉 캐시에서 만드는 주봉/월봉.
+
+주봉/월봉을 위해 yfinance를 다시 호출하지 않고, 캐시된 일봉을 기간별로 묶어
+Open=첫 값, High=최댓값, Low=최솟값, Close=마지막 값, Volume=합계로 집계합니다.
+기간 경계는 일봉 인덱스의 거래소 현지 세션 날짜 기준(주: 월~일, 월: 달력 월)이고,
+각 봉의 날짜는 그 기간의 첫 거래일입니다. (월요일 휴장이면 화요일 날짜)
+
+TimeframeCache는 티커/주기별 결과를 보관해 두고, 일봉이 교체/추가됐을 때만 다시 묶습니다.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+TIMEFRAMES = {'1D': '일봉', '1W': '주봉', '1M': '월봉'}
+DEFAULT_TIMEFRAME = '1D'
+AGGREGATIONS = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def period_keys(index, timeframe):
+    """일봉 인덱스의 봉별 기간 번호 (같은 주/월이면 같은 값). tz가 있으면 현지 시각의 날짜를 사용합니다."""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    days = index.values.astype('datetime64[D]')
+    if timeframe == '1W':
+        return (days.astype(np.int64) + 3) // 7  # 1970-01-01은 목요일 -> 월요일에 시작하는 주 번호
+    if timeframe == '1M':
+        return days.astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"지원하지 않는 주기입니다: {timeframe}")
+
+
+def _aggregate(index, arrays, timeframe):
+    """정렬된 일봉 배열을 기간별로 집계합니다. Returns: (기간 첫 거래일 인덱스, {컬럼: 배열})"""
+    keys = period_keys(index, timeframe)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    reducers = {
+        'first': lambda v: v[starts],
+        'max': lambda v: np.maximum.reduceat(v, starts),
+        'min': lambda v: np.minimum.reduceat(v, starts),
+        'last': lambda v: v[ends],
+        'sum': lambda v: np.add.reduceat(v, starts),
+    }
+    return index[starts], {c: reducers[AGGREGATIONS[c]](v) for c, v in arrays.items()}
+
+
+def resample_ohlcv(df, timeframe):
+    """
+    일봉을 주봉/월봉으로 집계합니다. (AGGREGATIONS 규칙, 정렬된 일봉 가정)
+
+    Returns:
+        DataFrame: 기간별 OHLCV, 인덱스는 기간의 첫 거래일
+    """
+    if timeframe == '1D':
+        return df
+    cols = [c for c in AGGREGATIONS if c in df.columns]
+    if df.empty:
+        return df[cols].iloc[0:0]
+    index, columns = _aggregate(df.index, {c: df[c].to_numpy() for c in cols}, timeframe)
+    return pd.DataFrame(columns, index=index)
+
+
+def _last_bar_key(df, cols):
+    """마지막 일봉 (행 수, 날짜, 값). 캐시 일봉은 마지막 봉만 교체/추가되므로 이 값이 같으면 결과도 같습니다."""
+    return len(df), df.index[-1], tuple(df[c].iat[-1] for c in cols)
+
+
+class TimeframeCache:
+    """
+    티커/주기별 주봉·월봉을 보관하는 캐시 (스레드 안전).
+    마지막 일봉이 같으면 보관한 결과를 그대로 반환하고, 일봉이 교체/추가되면 한 번의 벡터 연산으로 다시 집계합니다.
+    (집계는 reduceat 한 번이라 20년치 일봉도 1ms 미만이고, 진행 중인 주/월만 잘라 이어 붙이는 것보다
+    오히려 빠릅니다. 과거 봉의 집계 값은 그대로이므로 이후 지표 증분 계산도 그대로 이어집니다)
+    """
+
+    def __init__(self):
+        self._entries = {}  # (ticker, timeframe) -> (마지막 일봉 키, 결과)
+        self._lock = threading.Lock()
+
+    def get(self, ticker, df, timeframe):
+        """df(일봉)를 timeframe으로 집계한 결과를 반환합니다. ('1D'면 df 그대로)"""
+        if timeframe == '1D' or df.empty:
+            return resample_ohlcv(df, timeframe)
+        key = _last_bar_key(df, [c for c in AGGREGATIONS if c in df.columns])
+        with self._lock:
+            entry = self._entries.get((ticker, timeframe))
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        frame = resample_ohlcv(df, timeframe)
+        with self._lock:
+            self._entries[(ticker, timeframe)] = (key, frame)
+        return frame
+
+    def reset(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == ticker]:
+                    del self._entries[key]
+
+
+cache = TimeframeCache()
+
+
+if __name__ == "__main__":
+    # pandas groupby 집계와의 일치 및 캐시 갱신(마지막 봉 교체 포함) 확인 (python data/timeframes.py)
+    rng = np.random.default_rng(0)
+    n = 1500
+    dates = pd.bdate_range('2019-01-01', periods=n + 100)
+    dates = dates.delete(rng.choice(len(dates), 100, replace=False))  # 휴장일
+    c = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    df = pd.DataFrame({'Open': c * (1 + rng.normal(0, 0.005, n)), 'High': c * 1.01, 'Low': c * 0.99, 'Close': c,
+                       'Volume': rng.integers(1e5, 1e6, n).astype(float)}, index=dates)
+
+    for timeframe in ['1W', '1M']:
+        keys = period_keys(df.index, timeframe)
+        expected = df.groupby(keys).agg(AGGREGATIONS)
+        expected.index = df.index.to_series().groupby(keys).first().values
+        assert resample_ohlcv(df, timeframe).equals(expected), timeframe
+
+        local = TimeframeCache()
+        for stop in range(1000, n + 1):
+            partial = df.iloc[:stop].copy()
+            partial.iloc[-1, partial.columns.get_loc('Close')] *= 1.01  # 장중 값
+            local.get('T', partial, timeframe)
+            result = local.get('T', df.iloc[:stop], timeframe)
+        assert result.equals(resample_ohlcv(df, timeframe)), timeframe
+        print(f"{TIMEFRAMES[timeframe]}: {len(result)}봉, pandas 집계/캐시 갱신 일치")
@@ -0,0 +1,37 @@
+"""
+스캔 대상 종목 목록: 보유종목(private/asset.csv)과 관심종목(private/watchlist.csv).
+"""
+import os
+
+import pandas as pd
+
+ASSET_FILE_PATH = os.path.join("private", "asset.csv")
+WATCHLIST_FILE_PATH = os.path.join("private", "watchlist.csv")
+
+
+def load_tickers(file_path):
+    """CSV 파일의 ticker 컬럼을 대문자로 정리해 순서대로(중복 제거) 반환합니다."""
+    if not os.path.exists(file_path):
+        return []
+    try:
+        df = pd.read_csv(file_path, dtype={'ticker': str})
+    except (pd.errors.EmptyDataError, OSError):
+        return []
+    if 'ticker' not in df.columns:
+        return []
+    return list(dict.fromkeys(str(t).strip().upper() for t in df['ticker'].dropna()))
+
+
+def holding_tickers():
+    return load_tickers(ASSET_FILE_PATH)
+
+
+def watchlist_tickers():
+    return load_tickers(WATCHLIST_FILE_PATH)
+
+
+def all_tickers():
+    """보유종목과 관심종목을 합친 목록과, 티커 -> 구분('보유'/'관심') 딕셔너리를 반환합니다."""
+    groups = {t: '관심' for t in watchlist_tickers()}
+    groups.update({t: '보유' for t in holding_tickers()})
+    return list(groups), groups
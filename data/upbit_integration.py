@@ -7,6 +7,10 @@ from urllib.parse import urlencode, unquote
 import pandas as pd
 from typing import Dict, List, Optional
 import json
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import positions
 
 
 class UpbitIntegration:
@@ -137,11 +141,35 @@ class UpbitIntegration:
             print(f"호가 정보 조회 실패: {e}")
             return []
 
+    def get_positions(self) -> pd.DataFrame:
+        """계좌 조회 결과를 표준 포지션 테이블로 반환합니다. (행 단위 루프 없이 변환)"""
+        accounts = pd.DataFrame(self.get_accounts())
+        if accounts.empty:
+            return positions.empty_positions()
+
+        numeric = accounts[['balance', 'locked', 'avg_buy_price']].astype('float64')
+
+        # 예수금: KRW 잔고 (KRW는 평균 매입가가 없으므로 0으로 설정)
+        krw_balance = numeric.loc[accounts['currency'] == 'KRW', 'balance']
+        deposit = positions.deposit_positions('UPBIT', [
+            ('업비트 예수금', 'UPBIT_DEPOSIT', krw_balance.iloc[-1], 0.0, 'KRW')
+        ]) if not krw_balance.empty else positions.empty_positions()
+
+        # 암호화폐: 평균 매입가가 있고 잔고가 있는 것만
+        held = (numeric['avg_buy_price'] != 0) & ((numeric['balance'] > 0) | (numeric['locked'] > 0))
+        crypto = pd.DataFrame({
+            'name': accounts.loc[held, 'currency'],
+            'ticker': accounts.loc[held, 'currency'],
+            'quantity': numeric.loc[held, 'balance'] + numeric.loc[held, 'locked'],
+            'avg_price': numeric.loc[held, 'avg_buy_price'],
+        })
+        crypto = positions.normalize_positions(
+            crypto, {c: c for c in crypto.columns}, 'UPBIT', 'KRW', kind='crypto')
+
+        return positions.concat_positions([crypto, deposit])
+
     def get_balance(self):
-        deposit = self.get_deposit()
-        balance = self._get_balance()
-        merged = {'UPBIT': {'crypto': balance['UPBIT'].get('crypto', []), 'deposit': deposit['UPBIT'].get('deposit', [])}}
-        return merged
+        return positions.positions_to_balance(self.get_positions())
 
 # 테스트 실행 (필요시)
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import os
 from data import fetcher
+from core import strength
 import auth  # 인증 모듈 추가
 
 # --- 페이지 기본 설정 ---
@@ -139,3 +140,33 @@ display_ticker_section(portfolio_tickers, "포트폴리오 보유종목", "💼"
 
 if not pure_watchlist_tickers and not portfolio_tickers:
     st.info("포트폴리오에 종목을 추가하거나, 위의 편집기에서 관심종목을 추가하고 저장해주세요.")
+
+# 3. 상대강도(모멘텀) 순위 구간
+def display_strength_section(tickers):
+    """관심종목/보유종목 전체의 상대강도 순위표를 표시합니다. (로컬 캐시 일봉 기준, 새 봉이 들어온 종목만 재계산)"""
+    frames = fetcher.load_cached_frames(tickers)
+    if not frames:
+        return
+    st.divider()
+    st.subheader("📈 상대강도 순위")
+    st.caption("1/3/6/12개월(21/63/126/252거래일) 수익률과 변동성 조정 모멘텀(12개월 수익률 / 연율화 변동성), "
+               "종목 전체 기준 백분위입니다. RS Score는 기간별 수익률 백분위의 평균입니다. 열 제목을 눌러 정렬할 수 있습니다.")
+    ranked = strength.ranker.update(frames)
+    ranked.insert(0, 'Group', ['보유' if t in asset_tickers else '관심' for t in ranked.index])
+
+    def style_return(val):
+        return '' if pd.isna(val) else 'color: red' if val < 0 else 'color: green' if val > 0 else 'color: gray'
+
+    percentile_cols = [c for c in ranked.columns if c.endswith('%ile')] + ['RS Score']
+    st.dataframe(
+        ranked.style.format({c: '{:+.1%}' for c in strength.RETURN_COLUMNS}, na_rep='-')
+        .format({'Close': '{:,.2f}', 'Volatility': '{:.1%}', 'Vol-Adj Mom': '{:+.2f}'}, na_rep='-')
+        .format({c: '{:.0f}' for c in percentile_cols}, na_rep='-')
+        .map(style_return, subset=strength.RETURN_COLUMNS),
+        use_container_width=True
+    )
+    missing = [t for t in tickers if t not in frames]
+    if missing:
+        st.caption(f"캐시 데이터가 없는 종목 {len(missing)}개 제외: {', '.join(missing)} (메인 차트에서 한 번 조회하면 캐시됩니다)")
+
+display_strength_section(all_watchlist_tickers)
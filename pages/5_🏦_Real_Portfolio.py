@@ -8,9 +8,9 @@ import auth  # 인증 모듈 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from data import fetcher
 import json
-import data.kis_integration as kis_integration
 import data.upbit_integration as upbit_integration
 import data.dc_integration as dc_integration
+from data import positions
 
 # if not auth.render_authentication_ui():
 #     st.stop()
@@ -57,34 +57,22 @@ st.divider()
 @st.cache_data(ttl=300)  # 5분간 캐시
 def load_real_portfolio():
     try:
-        kis = kis_integration.KISIntegration()
+        kis = fetcher.get_client('kis')
         upbit = upbit_integration.UpbitIntegration()
         dc = dc_integration.DCIntegration()
         
-        # KIS 계좌 데이터 가져오기
-        balance = kis.get_balance()
-        print(balance)
+        # KIS / 업비트 / 현대차(DC) 계좌를 하나의 포지션 테이블로 합치기
+        portfolio_positions = positions.concat_positions([
+            kis.get_positions(),
+            upbit.get_positions(),
+            dc.get_positions(),
+        ])
 
-        # 업비트 계좌 데이터 가져오기
-        upbit_balance = upbit.get_balance()
-        
-        print(upbit_balance)
-        # 두 계좌 데이터 합치기
-        if upbit_balance:
-            balance.update(upbit_balance)
-
-        # 현대차 계좌 데이터 가져오기
-        dc_balance = dc.get_balance()
-        print(dc_balance)
-        # 두 계좌 데이터 합치기
-        if dc_balance:
-            balance.update(dc_balance)
-        
         # 디버깅용 저장
         with open("private/balance.json", "w", encoding="utf-8") as f:
-            json.dump(balance, f, ensure_ascii=False, indent=2)
-            
-        return balance
+            json.dump(positions.positions_to_balance(portfolio_positions), f, ensure_ascii=False, indent=2)
+
+        return portfolio_positions
     except Exception as e:
         st.error(f"포트폴리오 데이터 로딩 실패: {e}")
         return None
@@ -129,74 +117,9 @@ def format_percentage(percentage, mask=False):
         return f"{percentage:.2f}%"
 
 # 데이터 처리 함수
-def process_portfolio_data(balance_data, asset_classification):
-    """KIS API 및 Upbit API 데이터를 DataFrame으로 변환"""
-    all_data = []
-    
-    for account_id, account_data in balance_data.items():
-        # 주식 데이터 처리 (KIS)
-        if 'stock' in account_data:
-            for stock in account_data['stock']:
-                # 사용자 정의 자산 분류 적용
-                custom_asset_type = asset_classification.get(stock['ticker'], '주식')
-                
-                all_data.append({
-                    'account_id': account_id,
-                    'name': stock['name'],
-                    'ticker': stock['ticker'],
-                    'quantity': stock['quantity'],
-                    'avg_price': stock['avg_price'],
-                    'currency': stock['currency'],
-                    'asset_type': custom_asset_type,
-                    'original_type': '주식',  # 원래 타입 보존
-                    'total_purchase': stock['quantity'] * stock['avg_price']
-                })
-        
-        # 예수금 데이터 처리 (KIS)
-        if 'deposit' in account_data:
-            for deposit in account_data['deposit']:
-                # 통화에 따라 자산 분류 결정
-                if deposit['currency'] == 'KRW':
-                    asset_type = 'KRW'
-                elif deposit['currency'] == 'USD':
-                    asset_type = 'USD'
-                else:
-                    asset_type = '현금'  # 기타 통화는 현금으로
-                
-                all_data.append({
-                    'account_id': account_id,
-                    'name': deposit['name'],
-                    'ticker': deposit['ticker'],
-                    'quantity': deposit['quantity'],
-                    'avg_price': deposit['avg_price'],
-                    'currency': deposit['currency'],
-                    'asset_type': asset_type,
-                    'original_type': '현금',
-                    'total_purchase': deposit['quantity'] * deposit['avg_price']
-                })
-        
-        # 암호화폐 데이터 처리 (Upbit)
-        if 'crypto' in account_data:
-            for crypto in account_data['crypto']:
-                # KRW는 현금으로 분류, 나머지는 암호화폐로 분류
-                if crypto['ticker'] == 'KRW':
-                    custom_asset_type = 'KRW'
-                else:
-                    custom_asset_type = asset_classification.get(crypto['ticker'], '암호화폐')
-                
-                all_data.append({
-                    'account_id': account_id,
-                    'name': crypto['name'],
-                    'ticker': crypto['ticker'],
-                    'quantity': crypto['quantity'],
-                    'avg_price': crypto['avg_price'],
-                    'currency': crypto['currency'],
-                    'asset_type': custom_asset_type,
-                    'original_type': '암호화폐' if crypto['ticker'] != 'KRW' else '현금',
-                    'total_purchase': crypto['quantity'] * crypto['avg_price']
-                })
-    
-    return pd.DataFrame(all_data)
+def process_portfolio_data(portfolio_positions, asset_classification):
+    """표준 포지션 테이블에 자산 분류와 매입금액을 추가"""
+    return positions.to_portfolio_frame(portfolio_positions, asset_classification)
 
 # 현재가 조회 함수
 @st.cache_data(ttl=300)
@@ -209,8 +132,9 @@ def get_current_prices_for_portfolio(tickers):
 
     prices = {}
     
-    # 한국 주식
-    new_kr_tickers = [t+".KS" for t in kr_tickers if len(t) == 6]
+    # 한국 주식 및 금현물 (KIS 일괄 시세, 조회되지 않은 종목만 yfinance로 보완)
+    prices.update(fetcher.get_domestic_prices([t for t in kr_tickers if len(t) == 6] + gold_tickers))
+    new_kr_tickers = [t+".KS" for t in kr_tickers if len(t) == 6 and t not in prices]
     if new_kr_tickers:
         kr_prices = fetcher.get_current_prices(new_kr_tickers)
         kr_prices = kr_prices.to_dict()
@@ -222,11 +146,6 @@ def get_current_prices_for_portfolio(tickers):
         us_prices = fetcher.get_current_prices(us_tickers)
         prices.update(us_prices.to_dict())
     
-    # 금
-    if gold_tickers:
-        # gold_prices = fetcher.get_stock_info_from_KIS('M04020000')
-        prices['M04020000'] = 150000.0#float(gold_prices['stck_prpr'].iloc[0])
-    
     # 암호화폐 (업비트 API 사용)
     if crypto_tickers:
         try:
@@ -245,8 +164,8 @@ def get_current_prices_for_portfolio(tickers):
 st.divider()
 
 # 포트폴리오 데이터 로딩
-balance = load_real_portfolio()
-if balance is None:
+portfolio_positions = load_real_portfolio()
+if portfolio_positions is None:
     st.error("포트폴리오 데이터를 불러올 수 없습니다.")
     st.stop()
 
@@ -258,7 +177,7 @@ with st.expander("🏷️ 자산 분류 설정"):
     current_classification = load_asset_classification()
     
     # 포트폴리오에서 주식 종목만 추출
-    temp_df = process_portfolio_data(balance, {})
+    temp_df = process_portfolio_data(portfolio_positions, {})
     stock_tickers = temp_df[temp_df['original_type'] == '주식']['ticker'].unique().tolist()
     
     if stock_tickers:
@@ -312,7 +231,7 @@ with st.expander("🏷️ 자산 분류 설정"):
 
 # 데이터 처리
 final_classification = load_asset_classification()
-portfolio_df = process_portfolio_data(balance, final_classification)
+portfolio_df = process_portfolio_data(portfolio_positions, final_classification)
 
 if not portfolio_df.empty:
     # 현재가 조회 (원래 타입이 주식 또는 암호화폐인 것만)
@@ -0,0 +1,118 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from data import fetcher, universe, cross_events, signal_history
+from core import signals
+from core.panel import Panel
+import auth  # 인증 모듈 추가
+
+# --- 페이지 기본 설정 ---
+st.set_page_config(layout="wide", page_title="신호 스캐너")
+
+# --- 인증 확인 ---
+if not auth.render_authentication_ui():
+    st.stop()
+
+st.title("📡 신호 스캐너")
+st.write("보유종목과 관심종목 전체의 스퀴즈 모멘텀 / RSI 다이버전스 신호와 이동평균 교차를 로컬 캐시 데이터로 한 번에 확인합니다.")
+
+# --- 상수 정의 ---
+SCAN_BARS = 260  # 종목별로 최근 약 1년치 봉만 사용 (최근 신호 날짜 표시용)
+
+tickers, groups = universe.all_tickers()
+if not tickers:
+    st.info("포트폴리오에 종목을 추가하거나, 관심종목 페이지에서 관심종목을 추가해주세요.")
+    st.stop()
+
+started = time.perf_counter()
+cached = fetcher.load_cached_frames(tickers)
+frames = {t: df.iloc[-SCAN_BARS:] for t, df in cached.items()}
+panel = Panel.from_frames(frames)
+squeeze_table = signals.scan_squeeze(panel)
+divergence_table = signals.scan_divergence(panel)
+for table in (squeeze_table, divergence_table):
+    table.insert(0, 'Group', table.index.map(groups))
+elapsed = time.perf_counter() - started
+
+missing = [t for t in tickers if t not in frames]
+if missing:
+    st.caption(f"캐시 데이터가 없는 종목 {len(missing)}개 제외: {', '.join(missing)} (메인 차트에서 한 번 조회하면 캐시됩니다)")
+
+signal_filter = st.radio("표시할 종목", ['전체', '현재 신호만'], horizontal=True)
+if signal_filter == '현재 신호만':
+    squeeze_table = squeeze_table[squeeze_table['Signal'] != '']
+    divergence_table = divergence_table[divergence_table['Signal'] != '']
+
+def style_signal(val):
+    if val in ('BUY', 'BULL'):
+        return 'color: green; font-weight: bold'
+    if val in ('SELL', 'BEAR'):
+        return 'color: red; font-weight: bold'
+    return ''
+
+squeeze_tab, divergence_tab, cross_tab, history_tab = st.tabs(["스퀴즈 모멘텀", "RSI 다이버전스", "골든/데드 크로스", "신호 이력"])
+with squeeze_tab:
+    st.dataframe(
+        squeeze_table.style.format({'Close': '{:,.2f}', 'Momentum': '{:+,.3f}'}, na_rep='-')
+        .format({'Last Buy': '{:%Y-%m-%d}', 'Last Sell': '{:%Y-%m-%d}'}, na_rep='-')
+        .map(style_signal, subset=['Signal']),
+        use_container_width=True
+    )
+with divergence_tab:
+    st.caption(f"RSI(14) 스윙 피벗 기준, 확정 후 {signals.RECENT_BARS}봉 이내의 다이버전스를 현재 신호로 표시합니다.")
+    st.dataframe(
+        divergence_table.style.format({'Close': '{:,.2f}', 'RSI': '{:.1f}', 'Bars Ago': '{:.0f}'}, na_rep='-')
+        .format({'Last Bull': '{:%Y-%m-%d}', 'Last Bear': '{:%Y-%m-%d}'}, na_rep='-')
+        .map(style_signal, subset=['Signal']),
+        use_container_width=True
+    )
+with cross_tab:
+    # 교차 이벤트는 일봉이 확정될 때 인덱스에 쌓이므로 여기서는 조회만 합니다. (인덱스에 없는 종목만 확정된 봉으로 한 번 채움)
+    cross_events.store.backfill({t: signal_history.finalized_bars(df, t) for t, df in cached.items()})
+    col1, col2, col3 = st.columns(3)
+    days = col1.number_input("최근 N일", min_value=1, max_value=365, value=10)
+    pair_names = [cross_events.pair_name(*p) for p in cross_events.store.pairs]
+    pairs = col2.multiselect("이동평균 쌍", pair_names, default=pair_names)
+    event = col3.selectbox("종류", ['전체', 'GOLDEN', 'DEAD'])
+    crosses = cross_events.store.recent(days, tickers=list(cached), pairs=pairs, event=None if event == '전체' else event)
+    crosses.insert(1, 'Group', crosses['Ticker'].map(groups))
+    if crosses.empty:
+        st.info(f"최근 {days}일 동안 교차가 발생한 종목이 없습니다.")
+    else:
+        st.dataframe(
+            crosses.style.format({'Date': '{:%Y-%m-%d}'})
+            .map(lambda v: style_signal({'GOLDEN': 'BUY', 'DEAD': 'SELL'}.get(v, '')), subset=['Event']),
+            use_container_width=True, hide_index=True
+        )
+with history_tab:
+    # 신호 이력도 캐시 갱신 때 저장소에 쌓이므로 여기서는 인덱스 조회만 합니다. (저장소에 없는 종목만 한 번 채움)
+    signal_history.store.backfill(cached)
+    col1, col2 = st.columns(2)
+    history_days = col1.number_input("조회 기간 (일)", min_value=1, max_value=3650, value=365)
+    signal_types = col2.multiselect("신호 종류", list(signal_history.SIGNAL_TYPES), default=list(signal_history.SIGNAL_TYPES),
+                                    format_func=lambda s: f"{s} - {signal_history.SIGNAL_TYPES[s]}")
+    since = pd.Timestamp.now().normalize() - pd.Timedelta(days=history_days - 1)
+    counts = signal_history.store.counts(tickers=list(cached), signal_types=signal_types, start=since)
+    counts.insert(0, 'Group', counts.index.map(groups))
+    st.markdown(f"**종목별 발생 횟수 (최근 {history_days}일)**")
+    st.dataframe(
+        counts.style.format({f'Last {s}': '{:%Y-%m-%d}' for s in signal_types}, na_rep='-'),
+        use_container_width=True
+    )
+    # 진행 중인 세션 봉의 신호는 저장하지 않으므로 캐시 데이터에서 바로 계산해 맨 위에 붙입니다.
+    live = signal_history.live_signals(cached, signal_types=signal_types)
+    history = signal_history.store.history(tickers=list(cached), signal_types=signal_types, start=since)
+    history = pd.concat([live, history], ignore_index=True) if not live.empty else history
+    history.insert(1, 'Group', history['Ticker'].map(groups))
+    if not live.empty:
+        st.caption(f"오늘(진행 중인 봉)의 신호 {len(live)}건은 장 마감 전까지 바뀔 수 있습니다.")
+    st.markdown(f"**신호 목록 ({len(history)}건, 최신순)**")
+    st.dataframe(
+        history.style.format({'Date': '{:%Y-%m-%d}', 'Value': '{:+,.3f}'}, na_rep='-')
+        .map(lambda v: style_signal({'SQZ_BUY': 'BUY', 'BULL_DIV': 'BUY', 'SQZ_SELL': 'SELL', 'BEAR_DIV': 'SELL'}.get(v, '')),
+             subset=['Signal']),
+        use_container_width=True, hide_index=True
+    )
+st.caption(f"{len(frames)}개 종목 스캔: {elapsed:.3f}초")
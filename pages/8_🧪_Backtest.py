@@ -0,0 +1,114 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from data import fetcher, universe
+from core import backtest, sweep
+from core.panel import Panel
+import auth  # 인증 모듈 추가
+
+# --- 페이지 기본 설정 ---
+st.set_page_config(layout="wide", page_title="전략 백테스트")
+
+# --- 인증 확인 ---
+if not auth.render_authentication_ui():
+    st.stop()
+
+st.title("🧪 전략 백테스트")
+st.write("strategy.md의 전략을 보유종목과 관심종목 전체에 대해 로컬 캐시 일봉으로 한 번에 백테스트합니다.")
+
+# --- 상수 정의 ---
+STRATEGY_LABELS = {
+    'squeeze': '스퀴즈 모멘텀',
+    'ma_cross': '골든/데드 크로스',
+    'rsi_divergence': 'RSI 다이버전스',
+}
+
+tickers, groups = universe.all_tickers()
+if not tickers:
+    st.info("포트폴리오에 종목을 추가하거나, 관심종목 페이지에서 관심종목을 추가해주세요.")
+    st.stop()
+
+# --- 설정 ---
+col1, col2, col3, col4 = st.columns(4)
+strategy = col1.selectbox("전략", list(STRATEGY_LABELS), format_func=STRATEGY_LABELS.get)
+cost = col2.number_input("편도 거래 비용 (%)", min_value=0.0, max_value=2.0, value=backtest.DEFAULT_COST * 100, step=0.05) / 100
+params = {}
+if strategy == 'ma_cross':
+    params['fast'] = col3.number_input("단기 이동평균", min_value=2, max_value=200, value=50)
+    params['slow'] = col4.number_input("장기 이동평균", min_value=5, max_value=400, value=200)
+    params['kind'] = st.radio("이동평균 종류", ['SMA', 'EMA'], horizontal=True)
+    if params['fast'] >= params['slow']:
+        st.warning("단기 이동평균 기간은 장기 이동평균 기간보다 짧아야 합니다.")
+        st.stop()
+
+started = time.perf_counter()
+frames = fetcher.load_cached_frames(tickers)
+result = backtest.run(Panel.from_frames(frames), strategy, cost=cost, **params)
+elapsed = time.perf_counter() - started
+
+missing = [t for t in tickers if t not in frames]
+if missing:
+    st.caption(f"캐시 데이터가 없는 종목 {len(missing)}개 제외: {', '.join(missing)} (메인 차트에서 한 번 조회하면 캐시됩니다)")
+if not frames:
+    st.stop()
+
+# --- 요약 ---
+stats = result.stats.sort_values('CAGR', ascending=False)
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("종목 수", f"{len(stats)}개")
+m2.metric("CAGR 중앙값", f"{stats['CAGR'].median():.2%}")
+m3.metric("평균 승률", f"{stats['Hit Rate'].mean():.1%}")
+m4.metric("총 거래 수", f"{len(result.trades):,}건")
+
+percent_cols = ['Total Return', 'CAGR', 'Max Drawdown', 'Volatility', 'Exposure', 'Hit Rate', 'Avg Trade', 'Buy & Hold']
+st.subheader("종목별 성과")
+st.dataframe(
+    stats.assign(Group=stats.index.map(groups))[['Group'] + list(stats.columns)]
+    .style.format({c: '{:.2%}' for c in percent_cols}, na_rep='-')
+    .format({'Sharpe': '{:.2f}', 'Trades': '{:,.0f}'}, na_rep='-'),
+    use_container_width=True
+)
+
+# --- 종목 상세 ---
+st.subheader("종목 상세")
+ticker = st.selectbox("종목", list(stats.index))
+equity = result.equity[ticker].dropna()
+close = frames[ticker]['Close'].reindex(equity.index)
+st.line_chart({'Strategy': equity, 'Buy & Hold': close / close.iloc[0]})
+trades = result.trades[result.trades['Ticker'] == ticker].drop(columns='Ticker')
+st.dataframe(
+    trades.style.format({'Entry Date': '{:%Y-%m-%d}', 'Exit Date': '{:%Y-%m-%d}',
+                         'Entry Price': '{:,.2f}', 'Exit Price': '{:,.2f}', 'Return': '{:+.2%}'}),
+    use_container_width=True, hide_index=True
+)
+st.caption(f"{len(frames)}개 종목 백테스트: {elapsed:.3f}초 (신호 봉 종가 체결, 롱 온리)")
+
+# --- 파라미터 스윕 ---
+st.divider()
+st.subheader("파라미터 스윕")
+st.write("파라미터 후보의 모든 조합을 위 종목 전체에 대해 여러 프로세스로 나눠 백테스트하고, 조합별 중앙값으로 순위를 매깁니다.")
+space = {}
+sweep_cols = st.columns(len(sweep.DEFAULT_GRIDS[strategy]))
+for col, (name, candidates) in zip(sweep_cols, sweep.DEFAULT_GRIDS[strategy].items()):
+    space[name] = col.multiselect(name, candidates, default=candidates)
+rank_by = st.selectbox("순위 기준", ['Sharpe', 'CAGR', 'Total Return', 'Hit Rate', 'Avg Trade'])
+grid = sweep.parameter_grid(space)
+if strategy == 'ma_cross':
+    grid = [p for p in grid if p['fast'] < p['slow']]
+
+if st.button(f"스윕 실행 ({len(grid)}개 조합 x {len(frames)}종목)", disabled=not grid):
+    started = time.perf_counter()
+    progress = st.progress(0.0)
+    table_slot = st.empty()
+    parts = []
+    for part in sweep.iter_sweep(Panel.from_frames(frames), strategy, grid, cost=cost):
+        parts.append(part)
+        done = sum(len(p) for p in parts)
+        progress.progress(done / (len(grid) * len(frames)), text=f"{done:,} / {len(grid) * len(frames):,}")
+        table_slot.dataframe(sweep.rank(pd.concat(parts, ignore_index=True), by=rank_by)
+                             .style.format({c: '{:.2%}' for c in percent_cols}, na_rep='-')
+                             .format({'Sharpe': '{:.2f}', 'Trades': '{:,.0f}'}, na_rep='-'),
+                             use_container_width=True)
+    st.caption(f"스윕 완료: {time.perf_counter() - started:.1f}초")
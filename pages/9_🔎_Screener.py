@@ -0,0 +1,74 @@
+import time
+
+import streamlit as st
+
+from data import fetcher, universe
+from core import screener
+from core.panel import Panel
+import auth  # 인증 모듈 추가
+
+# --- 페이지 기본 설정 ---
+st.set_page_config(layout="wide", page_title="종목 스크리너")
+
+# --- 인증 확인 ---
+if not auth.render_authentication_ui():
+    st.stop()
+
+st.title("🔎 종목 스크리너")
+st.write("조건식으로 보유종목과 관심종목 전체를 한 번에 걸러냅니다. 같은 데이터에 같은 조건식을 다시 실행하면 캐시된 결과를 바로 보여줍니다.")
+
+# --- 상수 정의 ---
+SCREEN_BARS = 400  # 종목별로 최근 봉만 사용 (MA200/EMA200 워밍업 포함)
+PRESETS = {
+    '직접 입력': '',
+    '200일선 위 + RSI 과매도': 'close > MA200 and RSI_14 < 30',
+    '스퀴즈 진행 중 + 모멘텀 상승': 'SQZ_ON and SQZ_VAL > prev(SQZ_VAL)',
+    '스퀴즈 해제 매수 신호': 'SQZ_BUY',
+    '골든 크로스 (20/60)': 'crossed_above(MA20, MA60)',
+    '볼린저 하단 이탈': 'close < BBL',
+    'RSI 상승 다이버전스': 'BULL_DIV',
+}
+MATCH_LABELS = {'latest': '마지막 봉', 'any': '최근 N봉 중 하나라도', 'all': '최근 N봉 모두'}
+
+tickers, groups = universe.all_tickers()
+if not tickers:
+    st.info("포트폴리오에 종목을 추가하거나, 관심종목 페이지에서 관심종목을 추가해주세요.")
+    st.stop()
+
+# --- 조건 입력 ---
+preset = st.selectbox("예시 조건", list(PRESETS))
+rule = st.text_input("조건식", value=PRESETS[preset] or 'close > MA200 and RSI_14 < 30 and SQZ_ON')
+with st.expander("조건식 문법"):
+    st.markdown(
+        "- 논리: `and`, `or`, `not` / 비교: `>`, `>=`, `<`, `<=`, `==`, `!=` / 산술: `+ - * /`\n"
+        "- 가격: `open`, `high`, `low`, `close`, `volume`\n"
+        "- 지표: `MA200`, `EMA20`, `RSI_14`, `MACD`, `MACD_SIGNAL`, `MACD_HIST`, `BBU`, `BBM`, `BBL`, "
+        "`BB_WIDTH`, `BB_PERCENT`, `SQZ_ON`, `SQZ_OFF`, `SQZ_NO`, `SQZ_VAL`, `SQZ_BUY`, `SQZ_SELL`, `BULL_DIV`, `BEAR_DIV`\n"
+        "- 함수: `prev(x, n)`, `change(x, n)`, `crossed_above(a, b)`, `crossed_below(a, b)`, `abs(x)`, `min(a, b)`, `max(a, b)`"
+    )
+
+col1, col2, col3, col4 = st.columns(4)
+match = col1.selectbox("평가 구간", list(MATCH_LABELS), format_func=MATCH_LABELS.get)
+lookback = col2.number_input("N (봉)", min_value=1, max_value=60, value=5, disabled=(match == 'latest'))
+rank_by = col3.text_input("정렬 기준 식", value='RSI_14')
+ascending = col4.checkbox("오름차순", value=True)
+
+# --- 실행 ---
+started = time.perf_counter()
+frames = {t: df.iloc[-SCREEN_BARS:] for t, df in fetcher.load_cached_frames(tickers).items()}
+panel = Panel.from_frames(frames)
+try:
+    result = screener.screen(panel, rule, lookback=lookback, match=match, rank_by=rank_by or None, ascending=ascending)
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+elapsed = time.perf_counter() - started
+
+missing = [t for t in tickers if t not in frames]
+if missing:
+    st.caption(f"캐시 데이터가 없는 종목 {len(missing)}개 제외: {', '.join(missing)} (메인 차트에서 한 번 조회하면 캐시됩니다)")
+
+st.subheader(f"조건을 만족한 종목: {len(result)} / {len(frames)}")
+result.insert(0, 'Group', result.index.map(groups))
+st.dataframe(result.style.format(precision=2, na_rep='-'), use_container_width=True)
+st.caption(f"스크린 시간: {elapsed:.3f}초 (데이터 로드 포함)")
@@ -17,10 +17,10 @@ sys.path.append(current_dir)
 
 # 모듈 import
 from db_manager import PortfolioDBManager
-import data.kis_integration as kis_integration
 import data.upbit_integration as upbit_integration
 import data.dc_integration as dc_integration
 from data import fetcher
+from data import positions
 import pandas as pd
 import json
 
@@ -58,71 +58,9 @@ def load_asset_classification():
     else:
         return default_asset_types.copy()
 
-def process_portfolio_data(balance_data, asset_classification):
+def process_portfolio_data(portfolio_positions, asset_classification):
     """포트폴리오 데이터 처리 (5_🏦_Real_Portfolio.py와 동일한 로직)"""
-    all_data = []
-    
-    for account_id, account_data in balance_data.items():
-        # 주식 데이터 처리 (KIS)
-        if 'stock' in account_data:
-            for stock in account_data['stock']:
-                custom_asset_type = asset_classification.get(stock['ticker'], '주식')
-                
-                all_data.append({
-                    'account_id': account_id,
-                    'name': stock['name'],
-                    'ticker': stock['ticker'],
-                    'quantity': stock['quantity'],
-                    'avg_price': stock['avg_price'],
-                    'currency': stock['currency'],
-                    'asset_type': custom_asset_type,
-                    'original_type': '주식',
-                    'total_purchase': stock['quantity'] * stock['avg_price']
-                })
-        
-        # 예수금 데이터 처리 (KIS)
-        if 'deposit' in account_data:
-            for deposit in account_data['deposit']:
-                if deposit['currency'] == 'KRW':
-                    asset_type = 'KRW'
-                elif deposit['currency'] == 'USD':
-                    asset_type = 'USD'
-                else:
-                    asset_type = '현금'
-                
-                all_data.append({
-                    'account_id': account_id,
-                    'name': deposit['name'],
-                    'ticker': deposit['ticker'],
-                    'quantity': deposit['quantity'],
-                    'avg_price': deposit['avg_price'],
-                    'currency': deposit['currency'],
-                    'asset_type': asset_type,
-                    'original_type': '현금',
-                    'total_purchase': deposit['quantity'] * deposit['avg_price']
-                })
-        
-        # 암호화폐 데이터 처리 (Upbit)
-        if 'crypto' in account_data:
-            for crypto in account_data['crypto']:
-                if crypto['ticker'] == 'KRW':
-                    custom_asset_type = 'KRW'
-                else:
-                    custom_asset_type = asset_classification.get(crypto['ticker'], '암호화폐')
-                
-                all_data.append({
-                    'account_id': account_id,
-                    'name': crypto['name'],
-                    'ticker': crypto['ticker'],
-                    'quantity': crypto['quantity'],
-                    'avg_price': crypto['avg_price'],
-                    'currency': crypto['currency'],
-                    'asset_type': custom_asset_type,
-                    'original_type': '암호화폐' if crypto['ticker'] != 'KRW' else '현금',
-                    'total_purchase': crypto['quantity'] * crypto['avg_price']
-                })
-    
-    return pd.DataFrame(all_data)
+    return positions.to_portfolio_frame(portfolio_positions, asset_classification)
 
 def get_current_prices_for_portfolio(tickers):
     """포트폴리오 종목들의 현재가 조회"""
@@ -134,8 +72,9 @@ def get_current_prices_for_portfolio(tickers):
     prices = {}
     
     try:
-        # 한국 주식
-        new_kr_tickers = [t+".KS" for t in kr_tickers if len(t) == 6]
+        # 한국 주식 및 금현물 (KIS 일괄 시세, 조회되지 않은 종목만 yfinance로 보완)
+        prices.update(fetcher.get_domestic_prices([t for t in kr_tickers if len(t) == 6] + gold_tickers))
+        new_kr_tickers = [t+".KS" for t in kr_tickers if len(t) == 6 and t not in prices]
         if new_kr_tickers:
             kr_prices = fetcher.get_current_prices(new_kr_tickers)
             kr_prices = kr_prices.to_dict()
@@ -147,11 +86,6 @@ def get_current_prices_for_portfolio(tickers):
             us_prices = fetcher.get_current_prices(us_tickers)
             prices.update(us_prices.to_dict())
         
-        # 금
-        if gold_tickers:
-            # gold_prices = fetcher.get_stock_info_from_KIS('M04020000')
-            prices['M04020000'] = 150000.0#float(gold_prices['stck_prpr'].iloc[0])
-        
         # 암호화폐 (업비트 API 사용)
         if crypto_tickers:
             upbit = upbit_integration.UpbitIntegration()
@@ -173,34 +107,34 @@ def save_daily_portfolio():
         logger.info("일일 포트폴리오 저장 작업 시작")
         
         # 1. 포트폴리오 데이터 로딩
-        kis = kis_integration.KISIntegration()
+        kis = fetcher.get_client('kis')
         upbit = upbit_integration.UpbitIntegration()
         dc = dc_integration.DCIntegration()
         
         # 계좌 데이터 가져오기
-        balance = kis.get_balance()
-        logger.info(f"KIS 계좌 데이터 로딩 완료: {len(balance)} 계좌")
+        kis_positions = kis.get_positions()
+        logger.info(f"KIS 계좌 데이터 로딩 완료: {kis_positions['account_id'].nunique()} 계좌")
         
         # 업비트 계좌 데이터
-        upbit_balance = upbit.get_balance()
-        if upbit_balance:
-            balance.update(upbit_balance)
+        upbit_positions = upbit.get_positions()
+        if not upbit_positions.empty:
             logger.info("업비트 계좌 데이터 추가 완료")
         
         # 현대차 계좌 데이터
-        dc_balance = dc.get_balance()
-        if dc_balance:
-            balance.update(dc_balance)
+        dc_positions = dc.get_positions()
+        if not dc_positions.empty:
             logger.info("현대차 계좌 데이터 추가 완료")
+
+        portfolio_positions = positions.concat_positions([kis_positions, upbit_positions, dc_positions])
         
         # 백업 저장
         backup_file = f"private/balance_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         with open(backup_file, "w", encoding="utf-8") as f:
-            json.dump(balance, f, ensure_ascii=False, indent=2)
+            json.dump(positions.positions_to_balance(portfolio_positions), f, ensure_ascii=False, indent=2)
         
         # 2. 자산 분류 로딩 및 데이터 처리
         asset_classification = load_asset_classification()
-        portfolio_df = process_portfolio_data(balance, asset_classification)
+        portfolio_df = process_portfolio_data(portfolio_positions, asset_classification)
         
         if portfolio_df.empty:
             logger.warning("포트폴리오 데이터가 비어있습니다.")
@@ -1,5 +1,6 @@
 import streamlit as st
 from utils import settings
+from data import fetcher, timeframes, intraday
 
 def display():
     """사이드바 UI를 표시하고 사용자 입력을 반환합니다."""
@@ -28,6 +29,9 @@ def display():
         except Exception:
             pass
 
+    # 타이틀 바가 yf.Ticker.info를 기다리지 않도록 메타데이터를 미리 채워둡니다.
+    fetcher.warm_metadata(asset_tickers + watchlist_tickers)
+
     st.sidebar.subheader('Select Ticker')
     col1, col2 = st.sidebar.columns(2)
     selected_asset = col1.selectbox('From My Assets', [''] + asset_tickers, index=0, key=f'asset_ticker_{asset_mtime}')
@@ -38,6 +42,12 @@ def display():
     # 우선순위: 보유종목 > 관심종목 > 직접입력
     ticker = selected_asset or selected_watch or ticker_input
 
+    # --- 봉 주기 (분봉은 메모리 링 버퍼, 주봉/월봉은 캐시된 일봉을 묶어서 만듦) ---
+    timeframe_labels = {name: d.label for name, d in intraday.INTERVALS.items()}
+    timeframe_labels.update(timeframes.TIMEFRAMES)
+    timeframe = st.sidebar.radio('봉 주기', list(timeframe_labels), format_func=timeframe_labels.get,
+                                 index=list(timeframe_labels).index(timeframes.DEFAULT_TIMEFRAME), horizontal=True)
+
     # --- 이동평균선(MA) 선택 ---
     st.sidebar.subheader('이동평균선')
     ma_options = {
@@ -51,6 +61,17 @@ def display():
         if st.sidebar.checkbox(ma_name, value=(ma_name in default_ma_selection)):
             selected_ma_periods.append(ma_name)
 
+    # --- 이동평균 리본 (여러 기간의 이동평균을 한 번에 계산해 그림) ---
+    ribbon = None
+    if st.sidebar.checkbox('이동평균 리본 (MA Ribbon)'):
+        ribbon_cols = st.sidebar.columns(2)
+        ribbon_kind = ribbon_cols[0].selectbox('종류', ['SMA', 'EMA'], key='ribbon_kind')
+        ribbon_count = int(ribbon_cols[1].number_input('개수', min_value=2, max_value=30, value=10, step=1, key='ribbon_count'))
+        ribbon_start, ribbon_end = st.sidebar.slider('기간 범위', min_value=2, max_value=300, value=(10, 100), key='ribbon_range')
+        ribbon_periods = sorted({round(ribbon_start + (ribbon_end - ribbon_start) * i / (ribbon_count - 1))
+                                 for i in range(ribbon_count)})
+        ribbon = {'kind': ribbon_kind, 'periods': ribbon_periods}
+
     # --- 이동평균선 스타일 설정 ---
     with st.sidebar.expander("⚙️ 이동평균선 스타일 설정"):
         for ma_name, _ in ma_options.items():
@@ -84,6 +105,7 @@ def display():
     st.sidebar.subheader('보조지표')
     show_bbands = st.sidebar.checkbox('볼린저 밴드 (Bollinger Bands)', value=True)
     show_rsi = st.sidebar.checkbox('상대강도지수 (RSI)')
+    show_rsi_div = show_rsi and st.sidebar.checkbox('└ RSI 다이버전스 표시')
     show_macd = st.sidebar.checkbox('MACD')
     show_stoch = st.sidebar.checkbox('스토캐스틱 (Stochastic)')
     show_squeeze = st.sidebar.checkbox('스퀴즈 모멘텀 (Squeeze Momentum)', value=True)
@@ -91,9 +113,12 @@ def display():
     # 사용자의 모든 입력을 딕셔너리로 묶어 반환
     return {
         'ticker': ticker,
+        'timeframe': timeframe,
         'selected_ma_periods': selected_ma_periods,
+        'ribbon': ribbon,
         'show_bbands': show_bbands,
         'show_rsi': show_rsi,
+        'show_rsi_div': show_rsi_div,
         'show_macd': show_macd,
         'show_stoch': show_stoch,
         'show_squeeze': show_squeeze